@@ -0,0 +1,94 @@
+"""단계별 스크립트의 import 비용 측정 (python -X importtime)
+
+모듈 최상위 설정 코드(.env·rawdata 읽기 등)의 영향을 빼기 위해 모듈을 직접 import하지 않고,
+각 파일의 최상위 import 문만 뽑아 새 인터프리터에서 -X importtime으로 실행합니다.
+사용법: python benchmark_import_time.py [상위 N개]
+"""
+import ast
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STEP_FILES = [
+    'step1_ou_stock_parody_collection.py',
+    'step2_ou_stock_parody_card.py',
+    'step3_ou_stock_parody_video.py',
+    'step4_ou_stock_parody_final.py',
+    'common_utils.py',
+    os.path.join('youtube_uploader', 'upload_to_youtube.py'),
+]
+
+
+def top_level_imports(path):
+    """파일의 최상위 import / from ... import 문을 소스 그대로 반환"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source)
+    return [
+        ast.get_source_segment(source, node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def run_importtime(statements):
+    """import 문들을 새 인터프리터에서 실행하고 -X importtime 출력(stderr)을 반환
+
+    설치되지 않은 패키지가 있어도 나머지를 측정할 수 있도록 문장마다 try로 감쌉니다.
+    """
+    code = '\n'.join(
+        f"try:\n    {stmt}\nexcept Exception as e:\n    print('[실패]', {' '.join(stmt.split())!r}, e)"
+        for stmt in statements
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    return result.stdout, result.stderr
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력을 [(모듈명, 자기 시간 us, 누적 시간 us, 깊이)] 목록으로 변환"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main():
+    top_n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+
+    # 인터프리터 기본 기동 비용 (site 등)
+    _, baseline_err = run_importtime([])
+    baseline = sum(self_us for _, self_us, _, _ in parse_importtime(baseline_err))
+    print(f"[기준] 빈 인터프리터 import 합계: {baseline / 1000:.1f}ms")
+
+    summary = []
+    for step_file in STEP_FILES:
+        statements = top_level_imports(os.path.join(BASE_DIR, step_file))
+        stdout, stderr = run_importtime(statements)
+        rows = parse_importtime(stderr)
+        total = sum(self_us for _, self_us, _, _ in rows) - baseline
+        summary.append((step_file, total))
+
+        print(f"\n=== {step_file}: import {total / 1000:.1f}ms (기준 제외) ===")
+        for line in stdout.splitlines():
+            if line.startswith('[실패]'):
+                print(f"  {line}")
+        # 최상위(깊이 0) 모듈 중 누적 시간이 큰 순서
+        top_level = sorted((r for r in rows if r[3] == 0), key=lambda r: r[2], reverse=True)[:top_n]
+        for name, _, cumulative_us, _ in top_level:
+            print(f"  {cumulative_us / 1000:>9.1f}ms  {name}")
+
+    print("\n[요약] 단계별 import 비용")
+    for step_file, total in summary:
+        print(f"  {total / 1000:>9.1f}ms  {step_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""묶음 크기(K)별 패러디 생성 토큰·지연 비교
+
+실제 RSS 뉴스와 Claude API를 사용하므로 호출 비용이 발생합니다.
+사용법: python benchmark_parody_group_size.py [뉴스 수] [K 목록]
+예시: python benchmark_parody_group_size.py 6 1,3,6
+"""
+import os
+import sys
+import time
+
+import step1_ou_stock_parody_collection as step1
+
+
+def run_once(jobs, total, current_date, group_size):
+    """K=group_size로 jobs를 생성하고 (텔레메트리 기록 목록, 소요 시간, 기본 데이터 대체 수) 반환"""
+    step1.llm_telemetry = step1.LLMTelemetry(
+        os.path.join('.cache', f'benchmark_group_{group_size}.jsonl')
+    )
+    start = time.perf_counter()
+    if group_size == 1:
+        parodies = []
+        for i, news in jobs:
+            parody_data, succeeded = step1.generate_parody(
+                i, total, news, step1.build_parody_prompt(i, news, current_date), [], current_date
+            )
+            parodies.append((parody_data, succeeded))
+        fallbacks = sum(1 for _, ok in parodies if not ok)
+    else:
+        _, succeeded = step1.generate_parodies_grouped(jobs, total, current_date, group_size)
+        fallbacks = succeeded.count(False)
+    return step1.llm_telemetry.records, time.perf_counter() - start, fallbacks
+
+
+def main():
+    news_count = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    group_sizes = [int(k) for k in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 3, 6]
+
+    # 같은 입력을 매번 실제로 호출하도록 응답 캐시·중복 재생성은 끔
+    step1.llm_cache.enabled = False
+    step1.PARODY_DEDUP_ROUNDS = 0
+
+    raw_config = step1.parse_rawdata()
+    rss_urls = raw_config.get('RSS_URL 지정', [])
+    if isinstance(rss_urls, str):
+        rss_urls = [rss_urls]
+    news_list = step1.rank_news_locally(step1.fetch_news(rss_urls, min_news=news_count))[:news_count]
+    if not news_list:
+        print("[오류] 벤치마크에 사용할 뉴스를 가져오지 못했습니다.")
+        sys.exit(1)
+    jobs = list(enumerate(news_list))
+    current_date = step1.get_today_kst().strftime('%Y-%m-%d')
+
+    rows = []
+    for group_size in group_sizes:
+        print(f"\n===== K={group_size} ({len(jobs)}건) =====")
+        records, elapsed, fallbacks = run_once(jobs, len(jobs), current_date, group_size)
+        ok = [r for r in records if r['status'] == 'ok']
+        latencies = [r['latency_s'] for r in ok if r['latency_s'] is not None]
+        rows.append({
+            'K': group_size,
+            'requests': len(records),
+            'input': sum(r['input_tokens'] + r['cache_read_tokens'] + r['cache_write_tokens'] for r in records),
+            'output': sum(r['output_tokens'] for r in records),
+            'p50': step1._percentile(latencies, 50),
+            'wall': elapsed,
+            'cost': sum(r['cost_usd'] for r in records),
+            'fallbacks': fallbacks,
+        })
+
+    print(f"\n[벤치마크] 뉴스 {len(jobs)}건, 모델 {step1.CLAUDE_MODEL}")
+    print(f"  {'K':>3}{'요청':>6}{'입력토큰':>10}{'출력토큰':>10}{'p50':>9}{'전체':>9}{'비용(USD)':>11}{'대체':>6}")
+    for row in rows:
+        p50 = f"{row['p50']:.2f}s" if row['p50'] is not None else "-"
+        print(
+            f"  {row['K']:>3}{row['requests']:>6}{row['input']:>10}{row['output']:>10}"
+            f"{p50:>9}{row['wall']:>8.1f}s{row['cost']:>11.4f}{row['fallbacks']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,118 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import os
 from dotenv import load_dotenv
 import json
+import csv
+import glob
+import sqlite3
+import hashlib
+import threading
+import time
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 # .env 파일에서 환경 변수를 로드
 load_dotenv()
 
+# 프로세스 전체에서 재사용하는 gspread 클라이언트/워크시트 캐시
+_gsheet_lock = threading.Lock()
+_gsheet_clients = {}     # 인증정보 키 -> client
+_gsheet_worksheets = {}  # (인증정보 키, sheet_id, worksheet_name) -> worksheet
+# 인증/시트 열기에 걸린 누적 시간(초)과 횟수
+GSHEET_TIMINGS = {'auth_seconds': 0.0, 'auth_count': 0, 'open_seconds': 0.0, 'open_count': 0, 'cache_hits': 0}
+
+
+def _load_gsheet_credentials(scope):
+    """인증 정보를 읽어 (캐시 키, credentials)를 반환"""
+    # oauth2client는 무거우므로 실제로 인증할 때만 import
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    # GitHub Actions Secret에 저장된 환경 변수를 우선적으로 확인
+    credentials_json_str = os.getenv('GOOGLE_CREDENTIALS_JSON')
+    if credentials_json_str and credentials_json_str.strip():
+        print("[DEBUG] 환경변수(GOOGLE_CREDENTIALS_JSON)에서 인증 정보를 사용합니다.")
+        creds_key = 'env:' + hashlib.sha256(credentials_json_str.encode('utf-8')).hexdigest()
+        creds_dict = json.loads(credentials_json_str)
+        return creds_key, ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
+    credentials_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'service_account.json'))
+    print("[DEBUG] service_account.json 파일에서 인증 정보를 사용합니다. 경로:", credentials_path)
+    if not os.path.exists(credentials_path):
+         raise FileNotFoundError(f"로컬 실행을 위한 '{credentials_path}' 파일을 찾을 수 없습니다.")
+    creds_key = f'file:{credentials_path}:{os.path.getmtime(credentials_path)}'
+    return creds_key, ServiceAccountCredentials.from_json_keyfile_name(credentials_path, scope)
+
+
+def _credentials_cache_key():
+    """인증 정보를 파싱하지 않고 캐시 키만 계산"""
+    credentials_json_str = os.getenv('GOOGLE_CREDENTIALS_JSON')
+    if credentials_json_str and credentials_json_str.strip():
+        return 'env:' + hashlib.sha256(credentials_json_str.encode('utf-8')).hexdigest()
+    credentials_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'service_account.json'))
+    if not os.path.exists(credentials_path):
+        return None
+    return f'file:{credentials_path}:{os.path.getmtime(credentials_path)}'
+
+
+def invalidate_gsheet_cache(sheet_id=None):
+    """캐시된 클라이언트/워크시트를 비웁니다. sheet_id를 주면 해당 시트의 워크시트만 비웁니다."""
+    with _gsheet_lock:
+        if sheet_id is None:
+            _gsheet_clients.clear()
+            _gsheet_worksheets.clear()
+            return
+        for key in [k for k in _gsheet_worksheets if k[1] == sheet_id]:
+            del _gsheet_worksheets[key]
+
+
+def get_gsheet_timings():
+    """get_gsheet의 인증/열기 누적 시간과 캐시 적중 횟수를 반환"""
+    with _gsheet_lock:
+        return dict(GSHEET_TIMINGS)
+
+
 def get_gsheet(sheet_id, worksheet_name=None):
-    """구글 시트와 연결하여 워크시트 객체를 반환합니다. sheet_id는 구글 시트의 ID, worksheet_name은 탭 이름입니다."""
+    """구글 시트와 연결하여 워크시트 객체를 반환합니다. sheet_id는 구글 시트의 ID, worksheet_name은 탭 이름입니다.
+
+    인증된 클라이언트와 워크시트는 프로세스 안에서 캐시합니다.
+    access token 갱신은 gspread가 변환한 google-auth 인증 세션(AuthorizedSession)이 요청 때 알아서 합니다.
+    """
     
     scope = 'https://spreadsheets.google.com/feeds https://www.googleapis.com/auth/drive'
 
-    creds = None
-    # GitHub Actions Secret에 저장된 환경 변수를 우선적으로 확인
-    credentials_json_str = os.getenv('GOOGLE_CREDENTIALS_JSON')
     try:
-        if credentials_json_str and credentials_json_str.strip():
-            print("[DEBUG] 환경변수(GOOGLE_CREDENTIALS_JSON)에서 인증 정보를 사용합니다.")
-            creds_dict = json.loads(credentials_json_str)
-            creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-        else:
-            credentials_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'service_account.json'))
-            print("[DEBUG] service_account.json 파일에서 인증 정보를 사용합니다. 경로:", credentials_path)
-            if not os.path.exists(credentials_path):
-                 raise FileNotFoundError(f"로컬 실행을 위한 '{credentials_path}' 파일을 찾을 수 없습니다.")
-            creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_path, scope)
-        client = gspread.authorize(creds)  # type: ignore
-        if worksheet_name:
-            sheet = client.open_by_key(sheet_id).worksheet(worksheet_name)
-        else:
-            sheet = client.open_by_key(sheet_id).sheet1
-        return sheet
+        with _gsheet_lock:
+            creds_key = _credentials_cache_key()
+            cached = _gsheet_clients.get(creds_key) if creds_key else None
+
+            ws_key = (creds_key, sheet_id, worksheet_name)
+            if cached and ws_key in _gsheet_worksheets:
+                GSHEET_TIMINGS['cache_hits'] += 1
+                return _gsheet_worksheets[ws_key]
+
+            if cached:
+                client = cached
+            else:
+                auth_start = time.perf_counter()
+                import gspread  # 시트를 쓰지 않는 실행(CSV/SQLite 저장소)에서는 import하지 않음
+                creds_key, creds = _load_gsheet_credentials(scope)
+                client = gspread.authorize(creds)  # type: ignore
+                auth_elapsed = time.perf_counter() - auth_start
+                GSHEET_TIMINGS['auth_seconds'] += auth_elapsed
+                GSHEET_TIMINGS['auth_count'] += 1
+                _gsheet_clients[creds_key] = client
+                ws_key = (creds_key, sheet_id, worksheet_name)
+                print(f"[DEBUG] 구글 인증 완료 ({auth_elapsed * 1000:.0f}ms)")
+
+            open_start = time.perf_counter()
+            if worksheet_name:
+                sheet = client.open_by_key(sheet_id).worksheet(worksheet_name)
+            else:
+                sheet = client.open_by_key(sheet_id).sheet1
+            open_elapsed = time.perf_counter() - open_start
+            GSHEET_TIMINGS['open_seconds'] += open_elapsed
+            GSHEET_TIMINGS['open_count'] += 1
+            _gsheet_worksheets[ws_key] = sheet
+            print(f"[DEBUG] 구글 시트 열기 완료 ({open_elapsed * 1000:.0f}ms)")
+            return sheet
     except FileNotFoundError as e:
         print(e)
         raise
@@ -49,4 +128,249 @@ def get_today_kst():
         return datetime.now(pytz.timezone('Asia/Seoul'))
     except ImportError:
         # pytz가 없으면 UTC+9로 계산
-        return datetime.utcnow() + timedelta(hours=9) 
\ No newline at end of file
+        return datetime.utcnow() + timedelta(hours=9) 
+
+# --- 패러디 행 저장소 (구글 시트 / 로컬 CSV / 로컬 SQLite) ---
+# PARODY_STORAGE 환경변수로 선택합니다: gsheet(기본), csv, sqlite
+PARODY_COLUMNS = [
+    'date', 'original_title', 'parody_title', 'setup',
+    'punchline', 'humor_lesson', 'disclaimer', 'source_url'
+]
+PARODY_WORKSHEET_NAME = 'today_stock_parody'
+PARODY_CSV_DIR = os.getenv('PARODY_CSV_DIR', 'csv_data')
+PARODY_SQLITE_PATH = os.getenv('PARODY_SQLITE_PATH', os.path.join('csv_data', 'parody_rows.sqlite3'))
+# 바뀐 셀이 전체의 이 비율을 넘으면 셀 단위 대신 전체 범위를 한 번에 씁니다
+SHEET_FULL_WRITE_RATIO = 0.5
+
+
+def _column_letter(col):
+    """1부터 시작하는 열 번호를 A1 표기 열 문자로 변환"""
+    letters = ''
+    while col > 0:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(ord('A') + rem) + letters
+    return letters
+
+
+def _a1_range(first_row, first_col, last_row, last_col):
+    return f"{_column_letter(first_col)}{first_row}:{_column_letter(last_col)}{last_row}"
+
+
+def build_sheet_sync_updates(current_values, new_values):
+    """현재 시트 값과 새 값을 비교해 batch_update용 범위 목록을 만든다
+
+    - 바뀐 셀이 적으면 바뀐 셀만 개별 범위로 보냅니다.
+    - 많이 바뀌었으면 헤더~마지막 행을 한 범위로 보냅니다.
+    - 새 데이터보다 아래에 남은 이전 행은 빈 문자열로 덮어 같은 요청에서 지웁니다.
+    반환: (updates, 보낸 셀 수)
+    """
+    width = max([len(r) for r in new_values] + [len(r) for r in current_values] + [1])
+
+    def cell(values, r, c):
+        if r < len(values) and c < len(values[r]):
+            return values[r][c]
+        return ''
+
+    changed = [
+        (r, c)
+        for r in range(len(new_values))
+        for c in range(width)
+        if str(cell(new_values, r, c)) != str(cell(current_values, r, c))
+    ]
+    updates = []
+    cell_count = 0
+    total_cells = len(new_values) * width
+    if changed and len(changed) > total_cells * SHEET_FULL_WRITE_RATIO:
+        block = [list(r) + [''] * (width - len(r)) for r in new_values]
+        updates.append({'range': _a1_range(1, 1, len(new_values), width), 'values': block})
+        cell_count += total_cells
+    else:
+        for r, c in changed:
+            updates.append({
+                'range': _a1_range(r + 1, c + 1, r + 1, c + 1),
+                'values': [[cell(new_values, r, c)]],
+            })
+        cell_count += len(changed)
+
+    # 이전 실행보다 행이 줄었으면 남은 꼬리 행을 비움
+    stale_rows = [
+        r for r in range(len(new_values), len(current_values))
+        if any(str(v) for v in current_values[r])
+    ]
+    if stale_rows:
+        first, last = stale_rows[0], stale_rows[-1]
+        updates.append({
+            'range': _a1_range(first + 1, 1, last + 1, width),
+            'values': [[''] * width for _ in range(first, last + 1)],
+        })
+        cell_count += (last - first + 1) * width
+    return updates, cell_count
+
+
+def sheet_values_to_records(values):
+    """첫 행을 헤더로 시트 값(2차원 목록)을 dict 목록으로 변환 (셀 값은 문자열 그대로, 빈 행은 제외)"""
+    if not values:
+        return []
+    header = values[0]
+    records = []
+    for row in values[1:]:
+        if not any(str(cell).strip() for cell in row):
+            continue
+        row = list(row) + [''] * (len(header) - len(row))
+        records.append(dict(zip(header, row)))
+    return records
+
+
+def parody_to_row(parody_data):
+    return [parody_data.get(field, '') for field in PARODY_COLUMNS]
+
+
+class GSheetParodyStorage:
+    """구글 시트 탭에 패러디 행을 저장/조회 (바뀐 셀만 한 번의 batch_update로 기록)"""
+
+    name = 'gsheet'
+
+    def __init__(self, sheet_id=None, worksheet_name=PARODY_WORKSHEET_NAME):
+        self.sheet_id = sheet_id or os.getenv('GSHEET_ID')
+        self.worksheet_name = worksheet_name
+
+    def save(self, parody_data_list):
+        print("📊 구글 시트에 데이터 저장 중...")
+        sheet = get_gsheet(self.sheet_id, self.worksheet_name)
+
+        new_values = [PARODY_COLUMNS] + [parody_to_row(p) for p in parody_data_list]
+        try:
+            current_values = sheet.get_all_values()
+        except Exception as e:
+            # 현재 값을 못 읽으면 전체를 다시 쓰고 시트 끝까지 비움
+            print(f"   - 기존 데이터 읽기 실패, 전체 다시 쓰기: {e}")
+            current_values = [[None] * len(PARODY_COLUMNS)] * max(sheet.row_count, len(new_values))
+
+        updates, expected_cells = build_sheet_sync_updates(current_values, new_values)
+        if not updates:
+            print(f"✅ 구글 시트 변경 없음: {len(parody_data_list)}개 패러디 데이터가 이미 최신입니다")
+            return True
+
+        print(f"   - 변경 범위 {len(updates)}개, 셀 {expected_cells}개 전송")
+        response = sheet.batch_update(updates, value_input_option='RAW') or {}
+
+        # 응답의 갱신 셀 수로 저장 확인 (다시 읽지 않음)
+        updated_cells = response.get('totalUpdatedCells', 0)
+        if updated_cells >= expected_cells:
+            print(f"✅ 구글 시트 저장 완료: 총 {len(parody_data_list)}개 패러디 데이터 (갱신 셀 {updated_cells}개)")
+            return True
+        print(f"⚠️ 저장 확인 실패: 예상 셀 {expected_cells}개, 응답 {updated_cells}개")
+        return False
+
+    def load(self):
+        # get_all_records()는 숫자처럼 보이는 셀을 숫자로 바꾸므로 원본 문자열 그대로 읽음
+        values = get_gsheet(self.sheet_id, self.worksheet_name).get_all_values()
+        return sheet_values_to_records(values)
+
+
+class CsvParodyStorage:
+    """csv_data/ 폴더의 최신 CSV 한 개에 패러디 행을 저장/조회"""
+
+    name = 'csv'
+
+    def __init__(self, csv_dir=PARODY_CSV_DIR):
+        self.csv_dir = csv_dir
+        self.last_path = None
+
+    def save(self, parody_data_list):
+        # 현재 날짜와 시간으로 파일명 생성
+        timestamp = get_today_kst().strftime('%Y%m%d_%H%M%S')
+        os.makedirs(self.csv_dir, exist_ok=True)
+        csv_path = os.path.join(self.csv_dir, f"{timestamp}_gsni.csv")
+
+        # 기존 CSV 파일 모두 삭제 (새로운 파일만 생성)
+        print("🧹 기존 CSV 파일 정리 중...")
+        csv_files = glob.glob(os.path.join(self.csv_dir, '*.csv'))
+        if len(csv_files) > 0:
+            deleted_count = 0
+            for old_file in csv_files:
+                try:
+                    os.remove(old_file)
+                    print(f"   - 기존 CSV 파일 삭제: {os.path.basename(old_file)}")
+                    deleted_count += 1
+                except Exception as e:
+                    print(f"   - 파일 삭제 실패: {os.path.basename(old_file)} ({e})")
+            print(f"   - 총 {deleted_count}개 기존 CSV 파일 삭제 완료")
+        else:
+            print("   - 삭제할 기존 CSV 파일이 없습니다")
+
+        with open(csv_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=PARODY_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            for parody_data in parody_data_list:
+                writer.writerow(parody_data)
+
+        self.last_path = csv_path
+        print(f"📄 CSV 파일 저장 완료: {csv_path}")
+        return True
+
+    def load(self):
+        csv_files = glob.glob(os.path.join(self.csv_dir, '*_gsni.csv'))
+        if not csv_files:
+            raise FileNotFoundError(f"'{self.csv_dir}' 폴더에 패러디 CSV 파일이 없습니다.")
+        latest = max(csv_files)  # 파일명이 타임스탬프로 시작하므로 이름순 = 시간순
+        with open(latest, newline='', encoding='utf-8-sig') as csvfile:
+            return list(csv.DictReader(csvfile))
+
+
+class SqliteParodyStorage:
+    """로컬 SQLite 파일에 마지막 실행의 패러디 행을 저장/조회"""
+
+    name = 'sqlite'
+
+    def __init__(self, path=PARODY_SQLITE_PATH):
+        self.path = path
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        columns = ', '.join(f'{c} TEXT' for c in PARODY_COLUMNS)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS parody_rows (position INTEGER PRIMARY KEY, {columns})")
+        return conn
+
+    def save(self, parody_data_list):
+        placeholders = ', '.join('?' for _ in range(len(PARODY_COLUMNS) + 1))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM parody_rows")
+                conn.executemany(
+                    f"INSERT INTO parody_rows (position, {', '.join(PARODY_COLUMNS)}) VALUES ({placeholders})",
+                    [[i] + [str(v) for v in parody_to_row(p)] for i, p in enumerate(parody_data_list)],
+                )
+        finally:
+            conn.close()
+        print(f"🗄️ SQLite 저장 완료: {self.path} ({len(parody_data_list)}개 행)")
+        return True
+
+    def load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"패러디 SQLite 파일을 찾을 수 없습니다: {self.path}")
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"SELECT {', '.join(PARODY_COLUMNS)} FROM parody_rows ORDER BY position").fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(PARODY_COLUMNS, row)) for row in rows]
+
+
+PARODY_STORAGE_BACKENDS = {
+    'gsheet': GSheetParodyStorage,
+    'csv': CsvParodyStorage,
+    'sqlite': SqliteParodyStorage,
+}
+
+
+def get_parody_storage(backend=None, **kwargs):
+    """PARODY_STORAGE(gsheet/csv/sqlite) 설정에 맞는 저장소 객체를 반환"""
+    backend = (backend or os.getenv('PARODY_STORAGE', 'gsheet')).strip().lower()
+    if backend not in PARODY_STORAGE_BACKENDS:
+        raise ValueError(f"지원하지 않는 PARODY_STORAGE 값입니다: {backend} (gsheet/csv/sqlite 중 선택)")
+    return PARODY_STORAGE_BACKENDS[backend](**kwargs)
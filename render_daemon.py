@@ -0,0 +1,256 @@
+"""카드/영상 재렌더링용 상주 서비스 (localhost HTTP)
+
+수동 재렌더링·당일 수정 때마다 인터프리터 기동, 폰트 8개 로드, 카드 템플릿 로드,
+구글 인증, Anthropic 클라이언트 생성을 반복하지 않도록 한 프로세스에 띄워 두고 작업만 받습니다.
+
+사용법:
+  python render_daemon.py serve            # 서비스 시작 (기본)
+  python render_daemon.py cards            # 저장소 행으로 카드 전체 렌더링
+  python render_daemon.py card 7           # 7번 카드만 다시 렌더링
+  python render_daemon.py video            # 현재 카드로 영상 다시 제작
+  python render_daemon.py collect          # 1단계(수집·패러디 생성) 실행
+  python render_daemon.py status           # 상주 상태·작업 지연 조회
+
+HTTP 엔드포인트 (JSON 본문, 모든 응답에 latency_ms 포함):
+  POST /cards   {"rows": [...]}               rows 생략 시 저장소(PARODY_STORAGE)에서 불러옴
+  POST /card    {"index": 7, "row": {...}}    row 생략 시 저장소를 다시 읽어 당일 수정 내용 반영
+  POST /video   {"card_paths": [...]}         card_paths 생략 시 parody_card 폴더 사용
+  POST /collect {"resume": false}
+  GET  /status
+"""
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+RENDER_DAEMON_HOST = os.getenv('RENDER_DAEMON_HOST', '127.0.0.1')
+try:
+    RENDER_DAEMON_PORT = int(os.getenv('RENDER_DAEMON_PORT', '8765'))
+except ValueError:
+    RENDER_DAEMON_PORT = 8765
+
+
+class RenderService:
+    """폰트·템플릿·인증 클라이언트를 상주시키고 작업을 하나씩 실행 (작업별 지연 기록)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()  # 카드/영상 파일을 같이 쓰므로 작업은 한 번에 하나씩
+        self.rows = None  # 마지막으로 불러오거나 렌더링한 패러디 행 (카드 수 계산에 사용)
+        self.jobs = []
+        self.started_at = time.time()
+        self.warm = {}
+
+    def warm_up(self):
+        """무거운 import와 리소스 로드를 미리 해 두고 단계별 소요 시간을 기록"""
+        def timed(name, fn):
+            start = time.perf_counter()
+            try:
+                fn()
+                self.warm[name] = round((time.perf_counter() - start) * 1000, 1)
+                print(f"[워밍업] {name}: {self.warm[name]:.0f}ms")
+            except Exception as e:
+                self.warm[name] = None
+                print(f"[워밍업] {name} 실패 (작업 시 다시 시도): {e}")
+
+        def load_card_resources():
+            import step2_ou_stock_parody_card as step2
+            step2.load_fonts()
+            step2.load_card_template()
+
+        def load_video_stage():
+            import step3_ou_stock_parody_video  # noqa: F401
+
+        def load_storage():
+            from common_utils import get_parody_storage
+            storage = get_parody_storage()
+            # gsheet 저장소면 인증·워크시트가 common_utils 캐시에 남음
+            self.rows = list(storage.load())
+
+        def load_claude_client():
+            import step1_ou_stock_parody_collection as step1
+            step1.get_claude_client()
+
+        timed('card_resources', load_card_resources)
+        timed('video_stage', load_video_stage)
+        timed('storage', load_storage)
+        timed('claude_client', load_claude_client)
+
+    def _load_rows(self):
+        from common_utils import get_parody_storage
+        self.rows = list(get_parody_storage().load())
+        return self.rows
+
+    def render_cards(self, rows=None):
+        import step2_ou_stock_parody_card as step2
+        if rows is None:
+            rows = self._load_rows()
+        card_paths = step2.render_cards(rows)
+        self.rows = rows
+        return {'card_paths': card_paths}
+
+    def render_card(self, index, row=None, total=None):
+        """index는 1부터 시작하는 카드 번호 (파일명 parody_card_{index:02d}.png와 동일)
+
+        row를 생략하면 시트·CSV에서 고친 내용이 반영되도록 저장소를 다시 읽습니다
+        (gsheet 인증·워크시트는 캐시되어 있어 읽기 한 번).
+        """
+        import step2_ou_stock_parody_card as step2
+        index = int(index)
+        if row is None:
+            rows = self._load_rows()
+            if not 1 <= index <= len(rows):
+                raise ValueError(f"카드 번호 범위 밖: {index} (1~{len(rows)})")
+            row = rows[index - 1]
+        elif self.rows is not None and 1 <= index <= len(self.rows):
+            self.rows[index - 1] = row
+        total = int(total or (len(self.rows) if self.rows else index))
+        os.makedirs('parody_card', exist_ok=True)
+        return {'card_path': step2.render_card(row, index - 1, total)}
+
+    def build_video(self, card_paths=None):
+        import step3_ou_stock_parody_video as step3
+        return {'video_path': step3.run_video_stage(card_paths)}
+
+    def collect(self, resume=False):
+        import step1_ou_stock_parody_collection as step1
+        try:
+            rows = step1.run_collection_stage(resume=resume)
+        except SystemExit as e:
+            raise RuntimeError(f"1단계 실패 (종료 코드: {e.code})")
+        self.rows = rows
+        return {'count': len(rows or [])}
+
+    def run_job(self, name, fn, *args, **kwargs):
+        """작업을 직렬로 실행하고 결과에 지연(ms)을 붙여 반환"""
+        with self.lock:
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                result['ok'] = True
+            except Exception as e:
+                result = {'ok': False, 'error': str(e)}
+            latency_ms = round((time.perf_counter() - start) * 1000, 1)
+            result['latency_ms'] = latency_ms
+            self.jobs.append({'job': name, 'ok': result['ok'], 'latency_ms': latency_ms, 'at': time.time()})
+            del self.jobs[:-100]
+            print(f"[작업] {name}: {'성공' if result['ok'] else '실패'} ({latency_ms:.0f}ms)")
+            return result
+
+    def status(self):
+        return {
+            'ok': True,
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'warm_up_ms': self.warm,
+            'cached_rows': len(self.rows) if self.rows is not None else None,
+            'recent_jobs': self.jobs[-20:],
+        }
+
+
+def make_handler(service):
+    class RenderRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/status':
+                self._send(200, service.status())
+            else:
+                self._send(404, {'ok': False, 'error': f"알 수 없는 경로: {self.path}"})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                params = json.loads(self.rfile.read(length) or b'{}')
+            except (ValueError, json.JSONDecodeError) as e:
+                self._send(400, {'ok': False, 'error': f"잘못된 요청 본문: {e}"})
+                return
+
+            if self.path == '/cards':
+                result = service.run_job('cards', service.render_cards, params.get('rows'))
+            elif self.path == '/card':
+                if 'index' not in params:
+                    self._send(400, {'ok': False, 'error': "index가 필요합니다."})
+                    return
+                result = service.run_job(f"card {params['index']}", service.render_card,
+                                         params['index'], params.get('row'), params.get('total'))
+            elif self.path == '/video':
+                result = service.run_job('video', service.build_video, params.get('card_paths'))
+            elif self.path == '/collect':
+                result = service.run_job('collect', service.collect, bool(params.get('resume')))
+            else:
+                self._send(404, {'ok': False, 'error': f"알 수 없는 경로: {self.path}"})
+                return
+            self._send(200 if result['ok'] else 500, result)
+
+        def log_message(self, format, *args):
+            pass  # 작업 로그는 RenderService.run_job에서 출력
+
+    return RenderRequestHandler
+
+
+def serve():
+    service = RenderService()
+    print("=== 렌더링 서비스 워밍업 ===")
+    service.warm_up()
+    server = HTTPServer((RENDER_DAEMON_HOST, RENDER_DAEMON_PORT), make_handler(service))
+    print(f"=== 렌더링 서비스 대기 중: http://{RENDER_DAEMON_HOST}:{RENDER_DAEMON_PORT} ===")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n렌더링 서비스를 종료합니다.")
+    finally:
+        server.server_close()
+
+
+def send_job(method, path, payload=None):
+    """실행 중인 서비스에 작업을 보내고 JSON 응답을 반환"""
+    url = f"http://{RENDER_DAEMON_HOST}:{RENDER_DAEMON_PORT}{path}"
+    data = json.dumps(payload or {}).encode('utf-8') if method == 'POST' else None
+    request = urllib.request.Request(url, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read() or b'{}')
+
+
+def main():
+    args = sys.argv[1:]
+    command = args[0] if args else 'serve'
+    if command == 'serve':
+        serve()
+        return
+    try:
+        if command == 'cards':
+            result = send_job('POST', '/cards')
+        elif command == 'card' and len(args) > 1:
+            result = send_job('POST', '/card', {'index': int(args[1])})
+        elif command == 'video':
+            result = send_job('POST', '/video')
+        elif command == 'collect':
+            result = send_job('POST', '/collect', {'resume': '--resume' in args})
+        elif command == 'status':
+            result = send_job('GET', '/status')
+        else:
+            print(__doc__)
+            sys.exit(1)
+    except urllib.error.URLError as e:
+        print(f"[오류] 렌더링 서비스에 연결할 수 없습니다 ({e.reason}). 'python render_daemon.py serve'로 먼저 실행하세요.")
+        sys.exit(1)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if not result.get('ok'):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,22 +2,29 @@ import os
 import sys
 import feedparser
 import requests
+import requests.adapters
 from datetime import datetime, timedelta
-from anthropic import Anthropic, APIStatusError
+from anthropic import Anthropic, APIStatusError, APIConnectionError
 from dotenv import load_dotenv
-from common_utils import get_gsheet, get_today_kst
+from common_utils import (
+    get_gsheet_timings, get_today_kst,
+    get_parody_storage, CsvParodyStorage, PARODY_COLUMNS,
+)
 import json
+import hashlib
+import html
 import re
 from pathlib import Path
 import time
+import random
+import threading
+import math
+import calendar
+from email.utils import parsedate_to_datetime
 from zoneinfo import ZoneInfo
-from anthropic.types import MessageParam
-import csv
-import glob
-from google.oauth2.credentials import Credentials
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from anthropic.types import Message, MessageParam
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 
 # .env 파일의 절대 경로를 지정하여 로드
 env_path = Path('.') / '.env'
@@ -28,6 +35,42 @@ CLAUDE_API_KEY = os.getenv('CLAUDE_API_KEY')
 if not CLAUDE_API_KEY:
     raise ValueError("CLAUDE_API_KEY 환경 변수가 설정되지 않았습니다.")
 
+# Claude 호출 공통 설정 (동기 호출·배치 요청 모두 동일하게 사용)
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+CLAUDE_MAX_TOKENS = 2000
+CLAUDE_TEMPERATURE = 0.8
+# 로컬 가짜 API 서버 등으로 요청을 돌릴 때 사용 (미설정 시 SDK 기본값/ANTHROPIC_BASE_URL)
+CLAUDE_BASE_URL = os.getenv('CLAUDE_BASE_URL') or None
+
+_claude_client = None
+_claude_batch_client = None
+_claude_client_lock = threading.Lock()
+# Message Batches 제출·조회는 safe_api_call을 거치지 않으므로 SDK 자체 재시도를 유지
+try:
+    CLAUDE_BATCH_MAX_RETRIES = int(os.getenv('CLAUDE_BATCH_MAX_RETRIES', '5'))
+except ValueError:
+    CLAUDE_BATCH_MAX_RETRIES = 5
+
+
+def get_claude_client():
+    """프로세스 내에서 공유하는 Anthropic 클라이언트 (스레드 안전, 커넥션 재사용)"""
+    global _claude_client
+    with _claude_client_lock:
+        if _claude_client is None:
+            # 재시도는 safe_api_call의 공유 레이트 리미터가 담당하므로 SDK 자체 재시도는 끔
+            _claude_client = Anthropic(api_key=CLAUDE_API_KEY, base_url=CLAUDE_BASE_URL, max_retries=0)
+        return _claude_client
+
+
+def get_claude_batch_client():
+    """Message Batches 호출용 클라이언트 (일시적 5xx·연결 오류는 SDK가 백오프 재시도, 커넥션은 공유)"""
+    global _claude_batch_client
+    client = get_claude_client()
+    with _claude_client_lock:
+        if _claude_batch_client is None:
+            _claude_batch_client = client.with_options(max_retries=CLAUDE_BATCH_MAX_RETRIES)
+        return _claude_batch_client
+
 # 한국 시간대 정의
 KST = ZoneInfo("Asia/Seoul")
 
@@ -55,8 +98,7 @@ def parse_rawdata(file_path='asset/rawdata.txt'):
         print(f"설정 파일({file_path})을 찾을 수 없습니다. 기본값으로 진행합니다.")
     return config
 
-# 구글 시트 설정 (step2·youtube_uploader와 동일 탭)
-WORKSHEET_NAME = 'today_stock_parody'
+# 구글 시트 설정 (탭 이름은 common_utils.PARODY_WORKSHEET_NAME)
 SHEET_ID = os.getenv('GSHEET_ID')
 if not SHEET_ID:
     raise ValueError("GSHEET_ID 환경 변수가 설정되지 않았습니다.")
@@ -68,20 +110,144 @@ RSS_USER_AGENT = (
 )
 
 
-def fetch_rss_feed(rss_url, max_retries=3):
-    """연합뉴스 RSS를 브라우저 UA로 가져와 파싱 (GitHub Actions·로컬 공통)"""
-    headers = {
-        'User-Agent': RSS_USER_AGENT,
-        'Accept': 'application/rss+xml, application/xml, text/xml, */*',
-        'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
-    }
+RSS_HEADERS = {
+    'User-Agent': RSS_USER_AGENT,
+    'Accept': 'application/rss+xml, application/xml, text/xml, */*',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+}
+
+# 여러 피드를 동시에 받을 때의 최대 병렬 수
+RSS_MAX_WORKERS = 8
+
+_rss_session = None
+_rss_session_lock = threading.Lock()
+
+
+def get_rss_session():
+    """RSS 수집용 keep-alive 세션 (프로세스 내 공유, 커넥션 재사용)"""
+    global _rss_session
+    with _rss_session_lock:
+        if _rss_session is None:
+            session = requests.Session()
+            session.headers.update(RSS_HEADERS)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=RSS_MAX_WORKERS, pool_maxsize=RSS_MAX_WORKERS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _rss_session = session
+        return _rss_session
+
+
+# RSS 캐시 설정 (URL별 ETag/Last-Modified 및 파싱 결과 저장)
+RSS_CACHE_DIR = os.getenv('RSS_CACHE_DIR', os.path.join('.cache', 'rss'))
+# 캐시가 이 시간(초) 이내면 네트워크 요청 없이 바로 사용 (0이면 항상 조건부 요청으로 재검증)
+try:
+    RSS_CACHE_TTL = float(os.getenv('RSS_CACHE_TTL', '0'))
+except ValueError:
+    RSS_CACHE_TTL = 0
+# 캐시에 저장하는 entry 필드 (fetch_news에서 사용하는 값만)
+RSS_CACHE_FIELDS = ('title', 'link', 'summary', 'published')  # published_parsed는 published에서 다시 계산
+
+
+def _rss_cache_path(rss_url):
+    key = hashlib.sha1(rss_url.encode('utf-8')).hexdigest()
+    return os.path.join(RSS_CACHE_DIR, f"{key}.json")
+
+
+def load_rss_cache(rss_url):
+    """URL에 대한 RSS 캐시를 읽어 반환 (없거나 손상되면 None)"""
+    path = _rss_cache_path(rss_url)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get('url') != rss_url or not cache.get('entries'):
+        return None
+    return cache
+
+
+def _write_rss_cache(rss_url, cache):
+    """캐시 dict를 임시 파일에 쓴 뒤 교체 (동시 수집 중에도 파일이 깨지지 않도록)"""
+    path = _rss_cache_path(rss_url)
+    try:
+        os.makedirs(RSS_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[RSS] 캐시 저장 실패 ({rss_url}): {e}")
+
+
+def save_rss_cache(rss_url, feed, etag=None, last_modified=None):
+    """파싱된 feed와 검증 헤더(ETag/Last-Modified)를 캐시에 저장"""
+    entries = [
+        {field: entry.get(field) for field in RSS_CACHE_FIELDS if entry.get(field) is not None}
+        for entry in feed.entries
+    ]
+    _write_rss_cache(rss_url, {
+        'url': rss_url,
+        'etag': etag,
+        'last_modified': last_modified,
+        'fetched_at': time.time(),
+        'entries': entries,
+    })
+
+
+def touch_rss_cache(rss_url, cache):
+    """304 응답 시 캐시의 수집 시각만 갱신"""
+    cache['fetched_at'] = time.time()
+    _write_rss_cache(rss_url, cache)
+
+
+def feed_from_cache(cache):
+    """캐시된 entries를 feedparser 결과와 같은 형태로 복원"""
+    return feedparser.FeedParserDict(
+        entries=[feedparser.FeedParserDict(entry) for entry in cache['entries']],
+        bozo=False,
+    )
+
+
+def fetch_rss_feed(rss_url, max_retries=3, stats=None):
+    """연합뉴스 RSS를 브라우저 UA로 가져와 파싱 (GitHub Actions·로컬 공통)
+
+    stats에 dict를 넘기면 마지막 응답 크기(bytes), 시도 횟수(attempts), 캐시 사용 여부(cache)를 기록합니다.
+    캐시가 있으면 If-None-Match/If-Modified-Since로 조건부 요청을 보내고, 304이면 캐시된 파싱 결과를 재사용합니다.
+    """
+    session = get_rss_session()
     last_error = None
+    if stats is None:
+        stats = {}
+    stats.setdefault('bytes', 0)
+    stats.setdefault('attempts', 0)
+    stats['cache'] = 'miss'
+
+    cache = load_rss_cache(rss_url)
+    if cache and RSS_CACHE_TTL > 0 and time.time() - cache.get('fetched_at', 0) < RSS_CACHE_TTL:
+        stats['cache'] = 'ttl'
+        print(f"[RSS] {rss_url} 캐시 사용 (TTL {RSS_CACHE_TTL:.0f}초 이내): entries={len(cache['entries'])}")
+        return feed_from_cache(cache)
+
+    conditional_headers = {}
+    if cache:
+        if cache.get('etag'):
+            conditional_headers['If-None-Match'] = cache['etag']
+        if cache.get('last_modified'):
+            conditional_headers['If-Modified-Since'] = cache['last_modified']
 
     for attempt in range(max_retries):
+        stats['attempts'] = attempt + 1
         try:
-            resp = requests.get(rss_url, headers=headers, timeout=30)
+            resp = session.get(rss_url, headers=conditional_headers, timeout=30)
             size = len(resp.content)
-            print(f"[RSS] 시도 {attempt + 1}/{max_retries}: HTTP {resp.status_code}, {size} bytes")
+            stats['bytes'] = size
+            print(f"[RSS] {rss_url} 시도 {attempt + 1}/{max_retries}: HTTP {resp.status_code}, {size} bytes")
+
+            if resp.status_code == 304 and cache:
+                stats['cache'] = '304'
+                print(f"[RSS] {rss_url} 변경 없음(304), 캐시된 entries={len(cache['entries'])} 재사용")
+                touch_rss_cache(rss_url, cache)
+                return feed_from_cache(cache)
 
             if resp.status_code != 200:
                 last_error = f"HTTP {resp.status_code}"
@@ -98,22 +264,23 @@ def fetch_rss_feed(rss_url, max_retries=3):
 
             resp.encoding = resp.apparent_encoding or 'utf-8'
             feed = feedparser.parse(resp.content)
-            print(f"[RSS] 파싱: entries={len(feed.entries)}, bozo={feed.bozo}")
+            print(f"[RSS] {rss_url} 파싱: entries={len(feed.entries)}, bozo={feed.bozo}")
             if feed.bozo:
                 print(f"[RSS] 파싱 경고: {feed.bozo_exception}")
             if feed.entries:
+                save_rss_cache(rss_url, feed, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
                 return feed
             last_error = 'entries 0건'
         except requests.RequestException as e:
             last_error = str(e)
-            print(f"[RSS] 요청 오류: {e}")
+            print(f"[RSS] 요청 오류 ({rss_url}): {e}")
 
         if attempt < max_retries - 1:
             delay = 2 ** attempt
             print(f"[RSS] {delay}초 후 재시도...")
             time.sleep(delay)
 
-    print("[RSS] requests 실패, feedparser(agent=UA) 폴백 시도...")
+    print(f"[RSS] requests 실패, feedparser(agent=UA) 폴백 시도... ({rss_url})")
     feed = feedparser.parse(rss_url, agent=RSS_USER_AGENT)
     print(f"[RSS] 폴백 파싱: entries={len(feed.entries)}, bozo={feed.bozo}")
     if not feed.entries:
@@ -121,13 +288,236 @@ def fetch_rss_feed(rss_url, max_retries=3):
     return feed
 
 
-def fetch_news(rss_url, days=1, min_news=20):
-    """RSS 피드에서 뉴스를 가져오고 중복 제거"""
-    feed = fetch_rss_feed(rss_url)
+def fetch_rss_feeds(rss_urls):
+    """설정된 모든 RSS 피드를 공유 세션으로 동시에 수집
+
+    실패한 피드는 건너뛰고, 성공한 피드만 설정 순서대로 [(url, feed)] 목록으로 반환합니다.
+    모든 피드가 실패하면 RuntimeError를 발생시킵니다.
+    """
+    results = {}
+    report = {}
+
+    def fetch_one(url):
+        stats = {}
+        started = time.perf_counter()
+        try:
+            feed = fetch_rss_feed(url, stats=stats)
+            error = None
+        except Exception as e:
+            feed = None
+            error = e
+        stats['latency'] = time.perf_counter() - started
+        return url, feed, error, stats
+
+    max_workers = max(1, min(RSS_MAX_WORKERS, len(rss_urls)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for url, feed, error, stats in executor.map(fetch_one, rss_urls):
+            report[url] = (feed, error, stats)
+            if feed is not None:
+                results[url] = feed
+
+    print(f"[RSS] 피드별 수집 결과 ({len(results)}/{len(rss_urls)} 성공)")
+    for url in rss_urls:
+        feed, error, stats = report[url]
+        status = f"entries={len(feed.entries)}" if feed is not None else f"실패: {error}"
+        print(f"   - {url}: {stats['latency']:.2f}s, {stats.get('bytes', 0)} bytes, 시도 {stats.get('attempts', 0)}회, 캐시 {stats.get('cache', 'miss')}, {status}")
+
+    if not results:
+        errors = "; ".join(f"{url}: {report[url][1]}" for url in rss_urls)
+        raise RuntimeError(f"모든 RSS 피드 수집 실패 ({errors})")
+    return [(url, results[url]) for url in rss_urls if url in results]
+
+
+def entry_timestamp(entry):
+    """RSS entry의 발행 시각을 epoch 초로 반환 (알 수 없으면 None)"""
+    parsed = entry.get('published_parsed')
+    if parsed:
+        return calendar.timegm(parsed)
+    published = entry.get('published')
+    if published:
+        try:
+            return parsedate_to_datetime(published).timestamp()
+        except (TypeError, ValueError, IndexError):
+            return None
+    return None
+
+
+# 같은 기사로 볼 제목 유사도 (변형 표기 제거 후 문자 3-gram Jaccard)
+try:
+    NEWS_CLUSTER_THRESHOLD = float(os.getenv('NEWS_CLUSTER_THRESHOLD', '0.6'))
+except ValueError:
+    NEWS_CLUSTER_THRESHOLD = 0.6
+
+# 연합뉴스 기사 ID (예: https://www.yna.co.kr/view/AKR20250620012345002?input=1195m)
+YNA_ARTICLE_ID_RE = re.compile(r'(AKR\d{8,})', re.IGNORECASE)
+# 같은 기사의 속보/종합 변형 표기: (종합), (종합2보), (2보), [속보], (상보), (재송) 등
+NEWS_TITLE_VARIANT_RE = re.compile(r'[\(\[]\s*(?:속보|종합\s*\d*\s*보?|\d+\s*보|상보|재송|일문일답|영상|사진)\s*[\)\]]')
+# 종합 기사 표기만: (종합), (종합2보) 등 (종합소득세 같은 본문 단어는 제외)
+NEWS_TITLE_COMPREHENSIVE_RE = re.compile(r'[\(\[]\s*종합\s*\d*\s*보?\s*[\)\]]')
+
+
+def canonical_article_key(link):
+    """기사 링크를 비교용 키로 정규화 (연합뉴스는 AKR 기사 ID, 그 외는 쿼리·프래그먼트 제거 URL)"""
+    if not link:
+        return ''
+    match = YNA_ARTICLE_ID_RE.search(link)
+    if match:
+        return match.group(1).upper()
+    return re.sub(r'[?#].*$', '', link.strip()).rstrip('/').lower()
+
+
+def strip_title_variants(title):
+    """제목에서 (종합)·(2보)·[속보] 같은 변형 표기를 제거"""
+    return re.sub(r'\s+', ' ', NEWS_TITLE_VARIANT_RE.sub(' ', title)).strip()
+
+
+def _news_completeness(news):
+    """클러스터 대표를 고를 때의 점수 (요약이 길고 종합 기사일수록 높음)"""
+    title = news['title']
+    score = len(news.get('summary') or '')
+    if NEWS_TITLE_COMPREHENSIVE_RE.search(title):
+        score += 1000
+    if news.get('published_ts'):
+        score += news['published_ts'] / 1e9  # 동점이면 더 늦은(갱신된) 기사
+    return score
+
+
+def cluster_near_duplicate_news(news_list, threshold=None):
+    """같은 기사의 변형(종합/2보/살짝 바뀐 제목)을 묶어 클러스터마다 가장 완전한 기사 하나만 남김
+
+    AKR 기사 ID가 같거나, 변형 표기를 뗀 제목의 유사도가 threshold 이상이면 같은 클러스터입니다.
+    결과 순서는 각 클러스터가 처음 등장한 순서를 따릅니다.
+    """
+    threshold = NEWS_CLUSTER_THRESHOLD if threshold is None else threshold
+    clusters = []  # {'members': [...], 'keys': set, 'shingles': [...]}
+    for news in news_list:
+        key = canonical_article_key(news.get('link'))
+        shingles = char_shingles(strip_title_variants(news['title']))
+        target = None
+        for cluster in clusters:
+            if key and key in cluster['keys']:
+                target = cluster
+                break
+            if any(jaccard_similarity(shingles, other) >= threshold for other in cluster['shingles']):
+                target = cluster
+                break
+        if target is None:
+            clusters.append({'members': [news], 'keys': {key} if key else set(), 'shingles': [shingles]})
+        else:
+            target['members'].append(news)
+            if key:
+                target['keys'].add(key)
+            target['shingles'].append(shingles)
+
+    merged = [cluster for cluster in clusters if len(cluster['members']) > 1]
+    sizes = sorted((len(cluster['members']) for cluster in clusters), reverse=True)
+    print(f"[디버그] 유사 기사 클러스터링: {len(news_list)}건 → {len(clusters)}개 클러스터 (묶인 클러스터 {len(merged)}개, 크기 분포 {sizes[:10]})")
+    for cluster in merged:
+        best = max(cluster['members'], key=_news_completeness)
+        others = [news['title'][:25] for news in cluster['members'] if news is not best]
+        print(f"   - {len(cluster['members'])}건 → 대표: {best['title'][:30]}... (제외: {others})")
+    return [max(cluster['members'], key=_news_completeness) for cluster in clusters]
+
+
+# --- RSS 입력 전처리 (마크업·상용구 제거, 토큰 예산에 맞춰 자르기) ---
+try:
+    NEWS_SUMMARY_TOKEN_BUDGET = int(os.getenv('NEWS_SUMMARY_TOKEN_BUDGET', '150'))
+    NEWS_TITLE_TOKEN_BUDGET = int(os.getenv('NEWS_TITLE_TOKEN_BUDGET', '40'))
+except ValueError:
+    NEWS_SUMMARY_TOKEN_BUDGET, NEWS_TITLE_TOKEN_BUDGET = 150, 40
+
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+# 연합뉴스 요약에 반복되는 상용구 (발신지, 기자 바이라인, 사진 설명, 저작권 문구 등)
+# 바이라인은 '홍길동 기자 =' 또는 '홍길동 기자 hong@...'처럼 명시적인 형태만 지움 (본문 보존)
+NEWS_SUMMARY_BOILERPLATE_RE = re.compile(
+    r'\([^()]{1,20}=연합뉴스\)'
+    r'|[가-힣]{2,4}\s?(?:기자|특파원)\s*(?:=|[\w.+-]+@[\w-]+\.[\w.]+)'
+    r'|\[[^\[\]]*(?:자료사진|제공|사진|그래픽)[^\[\]]*\]'
+    r'|<저작권자[^>]*>'
+    r'|무단\s*전재[^.]*금지'
+    r'|[\w.+-]+@[\w-]+\.[\w.]+'
+)
+
+
+def estimate_tokens(text):
+    """로컬 토큰 수 추정 (한글 등 비ASCII는 글자당 약 0.9토큰, ASCII는 4글자당 약 1토큰)"""
+    text = str(text or '')
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return math.ceil(non_ascii * 0.9 + (len(text) - non_ascii) / 4)
+
+
+def clean_news_text(text):
+    """HTML 태그·엔티티를 풀고 상용구를 지운 뒤 공백을 정리"""
+    text = html.unescape(HTML_TAG_RE.sub(' ', str(text or '')))
+    text = NEWS_SUMMARY_BOILERPLATE_RE.sub(' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def truncate_to_tokens(text, budget):
+    """추정 토큰 수가 budget을 넘으면 가능한 한 문장 경계에서 자르고 '…'를 붙임 ('…'까지 budget 안에 맞춤)"""
+    if budget <= 0 or estimate_tokens(text) <= budget:
+        return text
+    used = estimate_tokens('…')  # 붙일 '…' 몫을 먼저 빼 둠
+    end = 0
+    for ch in text:
+        used += 0.9 if ord(ch) > 127 else 0.25
+        if math.ceil(used) > budget:
+            break
+        end += 1
+    cut = text[:end]
+    sentence_end = max(cut.rfind('. '), cut.rfind('다.'), cut.rfind('…'))
+    if sentence_end >= len(cut) // 2:
+        cut = cut[:sentence_end + (2 if cut[sentence_end:sentence_end + 2] == '다.' else 1)]
+    return cut.rstrip() + '…'
+
+
+class InputTokenStats:
+    """전처리 전후 추정 토큰 수 누적 (필드별)"""
+
+    def __init__(self):
+        self.before = {}
+        self.after = {}
+        self._lock = threading.Lock()
+
+    def add(self, field, raw, cleaned):
+        with self._lock:
+            self.before[field] = self.before.get(field, 0) + estimate_tokens(raw)
+            self.after[field] = self.after.get(field, 0) + estimate_tokens(cleaned)
+
+    def summary(self):
+        if not self.before:
+            return "입력 전처리: 처리한 항목 없음"
+        parts = []
+        for field in self.before:
+            before, after = self.before[field], self.after[field]
+            parts.append(f"{field} {before}→{after} (-{before - after})")
+        saved = sum(self.before.values()) - sum(self.after.values())
+        return f"입력 전처리 추정 토큰: {', '.join(parts)}, 총 {saved}토큰 절감"
+
+
+input_token_stats = InputTokenStats()
+
+
+def preprocess_summary(summary):
+    """RSS 요약을 정리하고 NEWS_SUMMARY_TOKEN_BUDGET에 맞춰 자름"""
+    cleaned = truncate_to_tokens(clean_news_text(summary), NEWS_SUMMARY_TOKEN_BUDGET)
+    input_token_stats.add('요약', summary, cleaned)
+    return cleaned
+
+
+def fetch_news(rss_urls, days=1, min_news=20, history=None):
+    """RSS 피드(들)에서 뉴스를 가져오고 중복 제거
+
+    history(ParodyHistoryStore)를 넘기면 이전 실행일에 이미 패러디한 기사는 제외합니다.
+    """
+    if isinstance(rss_urls, str):
+        rss_urls = [rss_urls]
+    feeds = fetch_rss_feeds(rss_urls)
+    entries = [entry for _, feed in feeds for entry in feed.entries]
     news_list = []
     today = get_today_kst().astimezone(KST).date()
     
-    print(f"[디버그] feed.entries 개수: {len(feed.entries)}")
+    print(f"[디버그] feed.entries 개수: {len(entries)} (피드 {len(feeds)}개)")
     print(f"[디버그] 수집 기준일(KST): {today}")
     
     # 중복 제거를 위한 set
@@ -135,11 +525,12 @@ def fetch_news(rss_url, days=1, min_news=20):
     seen_links = set()
     
     filtered_count = 0
-    for entry in feed.entries:
+    history_skipped = 0
+    for entry in entries:
         # 수집·시트 기록일은 실행일(KST)로 통일
         published_date = today
 
-        title = entry.title.strip()
+        title = html.unescape(HTML_TAG_RE.sub('', entry.title)).strip()
         link = entry.link.strip() if hasattr(entry, 'link') else ''
         
         # 중복 제거 (제목과 링크 모두 확인)
@@ -151,19 +542,26 @@ def fetch_news(rss_url, days=1, min_news=20):
         # 중복 체크용 set에 추가
         seen_titles.add(title)
         seen_links.add(link)
+
+        # 이전 실행에서 이미 다룬 기사 제외
+        if history is not None and history.is_covered(title, link):
+            history_skipped += 1
+            continue
         
-        summary = entry.summary if hasattr(entry, 'summary') else ''
+        summary = preprocess_summary(entry.summary if hasattr(entry, 'summary') else '')
         published = published_date.strftime('%Y-%m-%d')
         
         news_item = {
             'title': title,
             'summary': summary,
             'published': published,
+            'published_ts': entry_timestamp(entry),  # 기사 발행 시각 (로컬 순위의 최신성 점수용)
             'link': link
         }
         news_list.append(news_item)
     
-    print(f"[디버그] 수집 뉴스: {len(news_list)}건, 중복 제외: {filtered_count}건")
+    print(f"[디버그] 수집 뉴스: {len(news_list)}건, 중복 제외: {filtered_count}건, 이전 패러디 제외: {history_skipped}건")
+    news_list = cluster_near_duplicate_news(news_list)
     
     # 최소 뉴스 수가 부족하면 경고만 출력
     if len(news_list) < min_news:
@@ -173,18 +571,122 @@ def fetch_news(rss_url, days=1, min_news=20):
     
     return news_list
 
-def rank_news_by_importance_with_claude(news_list):
-    """Claude AI를 사용하여 뉴스 목록을 중요도에 따라 순위 매기기"""
-    client = Anthropic(api_key=CLAUDE_API_KEY)
+# --- 로컬 사전 순위 (LLM 순위 전 후보 축소 및 API 장애 시 대체 순위) ---
+# (키워드 목록, 가중치): 제목에 키워드가 하나라도 있으면 카테고리 가중치를 한 번 더함
+NEWS_KEYWORD_WEIGHTS = [
+    (('금리', '기준금리', '한국은행', '한은', '연준', 'Fed', 'FOMC', '파월', '양적완화', '긴축'), 3.0),
+    (('환율', '달러', '원화', '원/달러', '엔화', '위안'), 2.5),
+    (('반도체', '삼성전자', 'SK하이닉스', '하이닉스', 'HBM', '엔비디아', 'AI', '인공지능'), 2.5),
+    (('외국인', '기관', '순매수', '순매도', '매수세', '매도세', '공매도'), 2.0),
+    (('유가', '물가', 'CPI', '인플레', '소비자물가', 'GDP', '경기'), 2.0),
+    (('코스피', '코스닥', '증시', '나스닥', 'S&P', '다우', '뉴욕증시'), 1.5),
+    (('세법', '세금', '규제', '정책', '정부', '부동산', '밸류업', '금투세'), 1.5),
+    (('자동차', '2차전지', '배터리', '바이오', '플랫폼', '조선', '방산', '원전'), 1.5),
+    (('실적', '영업이익', '어닝', '신고가', '급등', '급락', '폭등', '폭락', '최고', '최저'), 1.5),
+    (('비트코인', '코인', '암호화폐', '가상자산'), 1.5),
+]
+# 한글 키워드 뒤에 붙어도 같은 단어로 보는 조사·접미어 (그 밖의 글자가 이어지면 다른 단어: 경기도, 유가증권 등)
+NEWS_KEYWORD_SUFFIX = (
+    '은|는|이|가|을|를|의|에|에서|에도|엔|로|으로|와|과|만|까지|부터|보다|처럼|발|주|株|세|'
+    '인하|인상|동결|하락|상승|급등|급락|둔화|회복|전망|우려'
+)
+
+
+def _keyword_pattern(keyword):
+    """키워드가 단어 단위로만 맞도록 경계 조건을 붙인 정규식 조각
+
+    - 영문/숫자로 끝나면 뒤에 영문이 이어지지 않아야 함 (AI ≠ OpenAI·AIDS, 숫자·조사는 허용: HBM3E, S&P500, AI가)
+    - 한글로 끝나면 조사·접미어(NEWS_KEYWORD_SUFFIX)까지만 허용
+    - 앞쪽도 같은 종류의 글자가 붙어 있지 않아야 함
+    """
+    pattern = re.escape(keyword)
+    if re.match(r'[A-Za-z0-9]', keyword):
+        pattern = r'(?<![A-Za-z0-9])' + pattern
+    elif re.match(r'[가-힣]', keyword):
+        pattern = r'(?<![가-힣])' + pattern
+    if re.search(r'[A-Za-z0-9]$', keyword):
+        pattern += r'(?![A-Za-z])'
+    elif re.search(r'[가-힣]$', keyword):
+        pattern += rf'(?:{NEWS_KEYWORD_SUFFIX})?(?![가-힣])'
+    return pattern
+
+
+# 카테고리별 키워드를 하나의 정규식으로 미리 컴파일 (대소문자 무시)
+NEWS_KEYWORD_PATTERNS = [
+    (re.compile('|'.join(_keyword_pattern(k) for k in keywords), re.IGNORECASE), weight)
+    for keywords, weight in NEWS_KEYWORD_WEIGHTS
+]
+# 패러디 소재로 쓰기 어려운 정형 기사 (표, 게시판, 인사, 부고 등)
+NEWS_BOILERPLATE_MARKERS = ('[표]', '[게시판]', '[인사]', '[부고]', '[증시신상품]', '[코스피 마감]', '[코스닥 마감]', '[그래픽]', '[포토]')
+# 최신성 점수가 절반으로 줄어드는 시간(시간 단위)
+NEWS_RECENCY_HALF_LIFE_HOURS = 12
+
+# LLM 순위에 넘길 후보 수 (로컬 점수 상위 N건, 0이면 전체)
+try:
+    LOCAL_PRERANK_LIMIT = int(os.getenv('LOCAL_PRERANK_LIMIT', '40'))
+except ValueError:
+    LOCAL_PRERANK_LIMIT = 40
+
+
+def score_news_locally(news, now_ts=None):
+    """키워드 가중치·최신성·제목 특징으로 뉴스 중요도를 빠르게 추정"""
+    title = news['title']
+    score = 0.0
+    for pattern, weight in NEWS_KEYWORD_PATTERNS:
+        if pattern.search(title):
+            score += weight
+
+    if any(marker in title for marker in NEWS_BOILERPLATE_MARKERS):
+        score -= 5.0
+    if '속보' in title:
+        score += 1.0
+    if re.search(r'\d+(\.\d+)?\s*(%|원|달러|조|억)', title):
+        score += 0.5  # 구체적 수치가 있는 제목은 패러디 소재로 좋음
+    if len(title) < 12:
+        score -= 0.5
+
+    published_ts = news.get('published_ts')
+    if published_ts:
+        now_ts = time.time() if now_ts is None else now_ts
+        age_hours = max(0.0, (now_ts - published_ts) / 3600)
+        score += 2.0 * math.pow(0.5, age_hours / NEWS_RECENCY_HALF_LIFE_HOURS)
+    return score
+
+
+def rank_news_locally(news_list):
+    """로컬 점수 내림차순으로 정렬한 뉴스 목록 (동점은 피드 순서 유지)"""
+    now_ts = time.time()
+    scores = [score_news_locally(news, now_ts) for news in news_list]
+    order = sorted(range(len(news_list)), key=lambda i: -scores[i])
+    return [news_list[i] for i in order]
+
+
+def rank_news_by_importance_with_claude(news_list, card_count=20):
+    """Claude AI를 사용하여 뉴스 목록을 중요도에 따라 순위 매기기
+
+    로컬 점수 상위 LOCAL_PRERANK_LIMIT건만 후보로 보내 정확히 card_count개의 ID를 요청하고,
+    API 실패나 응답 파싱 실패 시에는 로컬 순위를 그대로 반환합니다.
+    """
+    client = get_claude_client()
+
+    locally_ranked = rank_news_locally(news_list)
+    if LOCAL_PRERANK_LIMIT > 0:
+        candidates = locally_ranked[:max(LOCAL_PRERANK_LIMIT, card_count)]
+    else:
+        candidates = locally_ranked
+    pick_count = min(card_count, len(candidates))
+    print(f"  - 로컬 사전 순위: 전체 {len(news_list)}건 중 후보 {len(candidates)}건을 Claude에 전달")
 
     formatted_news = ""
-    for i, news in enumerate(news_list):
-        formatted_news += f"ID: {i}\n제목: {news['title']}\n\n"
+    for i, news in enumerate(candidates):
+        title = truncate_to_tokens(news['title'], NEWS_TITLE_TOKEN_BUDGET)
+        input_token_stats.add('랭킹 제목', news['title'], title)
+        formatted_news += f"ID: {i}\n제목: {title}\n\n"
 
     prompt = f"""
 당신은 대한민국 최고의 금융 뉴스 큐레이터입니다.
-다음은 오늘과 어제 수집된 주식/증권 관련 뉴스 전체 목록입니다.
-이 중에서 '독자들이 많이 읽을 수 있고, 관심을 가질 만한 뉴스'를 20개 골라, 가장 중요한 순서대로 ID만 쉼표로 구분해 출력하세요.
+다음은 오늘과 어제 수집된 주식/증권 관련 뉴스 후보 목록입니다.
+이 중에서 '독자들이 많이 읽을 수 있고, 관심을 가질 만한 뉴스'를 {pick_count}개 골라, 가장 중요한 순서대로 ID만 쉼표로 구분해 출력하세요.
 
 ## 🌟 중요도 판단 기준 (아래 기준 + 대중적 관심도/화제성/바이럴 가능성까지 고려)
 
@@ -205,10 +707,10 @@ def rank_news_by_importance_with_claude(news_list):
 {formatted_news}
 
 ## 💻 출력 형식
-- 다른 설명 없이, 가장 중요도가 높은 뉴스 20개 ID를 **쉼표(,)로만 구분**하여 한 줄로 출력
+- 다른 설명 없이, 가장 중요도가 높은 뉴스 {pick_count}개 ID를 **쉼표(,)로만 구분**하여 한 줄로 출력
 - 예시: 5,12,3,1,8,2,7,11,0,4
 
-가장 중요한 20개 뉴스의 ID를 순서대로 작성하세요:
+가장 중요한 {pick_count}개 뉴스의 ID를 순서대로 작성하세요:
 """
 
     try:
@@ -216,41 +718,50 @@ def rank_news_by_importance_with_claude(news_list):
             client, 
             [MessageParam(role="user", content=prompt)],
             max_retries=5,
-            base_delay=3
+            base_delay=3,
+            caller="ranking",
+            max_tokens=max_tokens_for('ranking'),
+            stop_when=stop_after_ids(pick_count)
         )
     except Exception as e:
         print(f"  ! Claude API 호출 실패: {e}")
-        print("  ! 원래 순서대로 뉴스를 반환합니다.")
-        return news_list
+        print("  ! 로컬 사전 순위대로 뉴스를 반환합니다.")
+        return locally_ranked
     response_block = response.content[0]
     response_text = getattr(response_block, 'text', None) or getattr(response_block, 'content', None) or str(response_block)
     response_text = response_text.strip()
     
-    try:
-        ranked_ids = [int(id_str.strip()) for id_str in response_text.split(',')]
-        valid_ranked_ids = [id_val for id_val in ranked_ids if 0 <= id_val < len(news_list)]
-        
-        ranked_news = [news_list[i] for i in valid_ranked_ids]
-        unranked_news_ids = set(range(len(news_list))) - set(valid_ranked_ids)
-        unranked_news = [news_list[i] for i in unranked_news_ids]
+    # 숫자만 골라 읽음 (조기 종료 시 '4, 1, 7,'처럼 끝에 구분자가 남음)
+    ranked_ids = [int(id_str) for id_str in re.findall(r'\d+', response_text)]
+    valid_ranked_ids = []
+    for id_val in ranked_ids:
+        if 0 <= id_val < len(candidates) and id_val not in valid_ranked_ids:
+            valid_ranked_ids.append(id_val)
+    if not valid_ranked_ids:
+        print("  ! AI 순위 응답 파싱 실패. 로컬 사전 순위대로 반환합니다.")
+        return locally_ranked
 
-        return ranked_news + unranked_news
-    except ValueError:
-        print("  ! AI 순위 응답 파싱 실패. 원래 순서대로 반환합니다.")
-        return news_list
+    ranked_news = [candidates[i] for i in valid_ranked_ids]
+    # 나머지는 로컬 순위 순서로 뒤에 붙임
+    ranked_ids_set = {id(news) for news in ranked_news}
+    unranked_news = [news for news in locally_ranked if id(news) not in ranked_ids_set]
 
-def create_parody_with_claude(news_content, original_prompt, existing_content, retry_context=None):
-    """Claude AI를 사용하여 패러디 생성 (전체 콘텐츠 중복 방지 및 자동 복구 기능 포함)"""
-    client = Anthropic(api_key=CLAUDE_API_KEY)
-    
+    return ranked_news + unranked_news
+
+def build_parody_messages(original_prompt, existing_content, retry_context=None):
+    """패러디 요청 메시지 목록을 구성 (중복 방지 규칙·JSON 오류 재요청 포함)
+
+    existing_content에는 유사도 인덱스에서 충돌한 패러디만 전달되므로 프롬프트 크기가 카드 수와 무관합니다.
+    고정된 금지 패턴·다양화 규칙은 모든 카드에 적용되도록 PARODY_SYSTEM(캐시되는 공통 지침)에 있습니다.
+    """
     # 강화된 중복 방지를 위한 프롬프트 추가
     if existing_content:
         duplication_warning = (
             "\n\n## 🚨 (매우 중요) 절대적 중복 방지 규칙\n"
-            "- 아래는 이미 생성된 모든 패러디 콘텐츠입니다.\n"
+            "- 아래는 방금 생성한 결과와 너무 비슷한, 이미 생성된 패러디 콘텐츠입니다.\n"
             "- 절대로 아래와 유사한 제목, 표현, 패턴, 스타일을 사용하지 마세요.\n"
             "- 완전히 새롭고 창의적인 콘텐츠를 만들어야 합니다.\n\n"
-            "### 📜 이미 생성된 콘텐츠 목록:\n"
+            "### 📜 겹친 콘텐츠:\n"
         )
         
         for i, content in enumerate(existing_content):
@@ -260,21 +771,6 @@ def create_parody_with_claude(news_content, original_prompt, existing_content, r
             duplication_warning += f"Punchline: {content.get('punchline', '')}\n"
             duplication_warning += f"Lesson: {content.get('humor_lesson', '')}\n"
         
-        duplication_warning += (
-            "\n\n## ❌ 절대 금지 패턴들\n"
-            "- '월급은 그대로인데' 표현 금지\n"
-            "- '개미들 이럴 줄이야' 표현 금지\n"
-            "- '동료: ○○ 나: △△ 동료: 우리 회사도...' 대화 패턴 금지\n"
-            "- '계단으로 오르고 창문/엘리베이터로' 표현 금지\n"
-            "- '천문학적', '천정부지' 등 과장 표현 반복 금지\n"
-            "- '또 뚝!', '또 쾅!' 등 의성어 반복 금지\n\n"
-            "## ✅ 필수 다양화 요구사항\n"
-            "- 제목: 숫자형/질문형/감탄형/비교형 등 완전히 다른 스타일 사용\n"
-            "- Setup: 출근/점심/퇴근/주말/휴가 등 다양한 상황 설정\n"
-            "- Punchline: 독백/상황극/밈/패러디/인터뷰 등 형식 변화\n"
-            "- Lesson: 실용조언/명언/유머/격언 등 톤앤매너 변화\n"
-        )
-        
         original_prompt += duplication_warning
 
     messages = [MessageParam(role="user", content=original_prompt)]
@@ -292,132 +788,183 @@ def create_parody_with_claude(news_content, original_prompt, existing_content, r
             messages.append(MessageParam(role="assistant", content=retry_context['malformed_json']))
         messages.append(MessageParam(role="user", content=user_message))
 
+    return messages
+
+def create_parody_with_claude(original_prompt, existing_content, retry_context=None, caller="parody"):
+    """Claude AI를 사용하여 패러디 생성 (중복 방지 및 자동 복구 기능 포함)"""
+    client = get_claude_client()
+    messages = build_parody_messages(original_prompt, existing_content, retry_context)
+
     try:
-        response = safe_api_call(client, messages, max_retries=5, base_delay=3)
+        # 재시도(잘린/깨진 응답 수정)는 여유 있게 전체 한도로 요청
+        max_tokens = CLAUDE_MAX_TOKENS if retry_context else max_tokens_for('parody')
+        response = safe_api_call(
+            client, messages, max_retries=5, base_delay=3, system=PARODY_SYSTEM, caller=caller,
+            max_tokens=max_tokens, stop_when=stop_after_json_object, **parody_request_options()
+        )
     except Exception as e:
         print(f"  ! Claude API 호출 실패: {e}")
         raise e
     
     return response.content
 
-def save_to_gsheet(parody_data_list):
-    """패러디 데이터를 구글 시트에 저장 (시트 초기화 후 저장)"""
+def save_parody_rows(storage, parody_data_list):
+    """설정된 저장소(구글 시트/CSV/SQLite)에 패러디 데이터를 저장"""
     try:
-        print("📊 구글 시트에 데이터 저장 중...")
-        sheet = get_gsheet(SHEET_ID, WORKSHEET_NAME)
-        
-        # 시트 초기화
-        sheet.clear()
-        print("   - 기존 데이터 삭제 완료")
-        
-        # 헤더 추가
-        headers = [
-            'date', 'original_title', 'parody_title', 'setup', 
-            'punchline', 'humor_lesson', 'disclaimer', 'source_url'
-        ]
-        sheet.append_row(headers)
-        print("   - 헤더 추가 완료")
-        
-        # 데이터 추가 (배치 처리로 변경)
-        all_rows = []
-        for i, parody_data in enumerate(parody_data_list, 1):
-            row = [
-                parody_data.get('date', ''),
-                parody_data.get('original_title', ''),
-                parody_data.get('parody_title', ''),
-                parody_data.get('setup', ''),
-                parody_data.get('punchline', ''),
-                parody_data.get('humor_lesson', ''),
-                parody_data.get('disclaimer', ''),
-                parody_data.get('source_url', '')
-            ]
-            all_rows.append(row)
-            print(f"   - {i}/{len(parody_data_list)} 행 준비 완료")
-        
-        # 배치로 한 번에 추가
-        if all_rows:
-            sheet.append_rows(all_rows)
-            print(f"   - 배치 데이터 추가 완료: {len(all_rows)}개 행")
-        
-        # 저장 확인
-        time.sleep(2)  # 저장 완료 대기
-        actual_rows = sheet.get_all_values()
-        print(f"   - 실제 저장된 행 수: {len(actual_rows)}개")
-        
-        if len(actual_rows) >= len(parody_data_list) + 1:  # 헤더 + 데이터
-            print(f"✅ 구글 시트 저장 완료: 총 {len(parody_data_list)}개 패러디 데이터")
-            return True
-        else:
-            print(f"⚠️ 저장 확인 실패: 예상 {len(parody_data_list) + 1}개, 실제 {len(actual_rows)}개")
-            return False
-        
+        return storage.save(parody_data_list)
     except Exception as e:
-        print(f"❌ 구글 시트 저장 실패: {e}")
-        print("💡 service_account.json 파일과 GSHEET_ID를 확인해주세요.")
+        print(f"❌ {storage.name} 저장소 저장 실패: {e}")
+        if storage.name == 'gsheet':
+            print("💡 service_account.json 파일과 GSHEET_ID를 확인해주세요.")
         return False
 
+
+# --- 실행 간 기사 이력 (이미 패러디한 기사를 다음 날 다시 고르지 않도록) ---
+PARODY_HISTORY_PATH = os.getenv('PARODY_HISTORY_PATH', os.path.join('history', 'parody_history.sqlite3'))
+try:
+    PARODY_HISTORY_RETENTION_DAYS = int(os.getenv('PARODY_HISTORY_RETENTION_DAYS', '730'))
+except ValueError:
+    PARODY_HISTORY_RETENTION_DAYS = 730
+
+
+def title_fingerprint(title):
+    """변형 표기·공백·문장부호를 제거한 제목의 해시 (같은 기사 판별용)"""
+    normalized = _normalize_for_dedup(strip_title_variants(title or ''))
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest() if normalized else ''
+
+
+class ParodyHistoryStore:
+    """실행별로 다룬 기사(AKR ID/정규화 링크, 제목 지문)와 생성된 패러디를 기록하는 SQLite 저장소
+
+    조회용 키는 처음 한 번 메모리 set으로 읽어 기사당 O(1)로 확인합니다.
+    오늘 기록은 제외하므로 같은 날 재실행해도 같은 기사를 다시 고를 수 있습니다.
+    """
+
+    def __init__(self, path=PARODY_HISTORY_PATH, retention_days=PARODY_HISTORY_RETENTION_DAYS, today=None):
+        self.path = path
+        self.retention_days = retention_days
+        self.today = today or get_today_kst().strftime('%Y-%m-%d')
+        self._conn = None
+        self._article_keys = None
+        self._fingerprints = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS stories ("
+                " article_key TEXT NOT NULL,"
+                " run_date TEXT NOT NULL,"
+                " link TEXT,"
+                " title TEXT,"
+                " title_fp TEXT,"
+                " parody_json TEXT,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (article_key, run_date));"
+                "CREATE INDEX IF NOT EXISTS idx_stories_title_fp ON stories (title_fp);"
+                "CREATE INDEX IF NOT EXISTS idx_stories_run_date ON stories (run_date);"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _load(self):
+        if self._article_keys is not None:
+            return
+        self._article_keys, self._fingerprints = set(), set()
+        try:
+            rows = self._connect().execute(
+                "SELECT article_key, title_fp FROM stories WHERE run_date < ?", (self.today,)
+            )
+            for article_key, title_fp in rows:
+                self._article_keys.add(article_key)
+                if title_fp:
+                    self._fingerprints.add(title_fp)
+            print(f"[이력] 이전 실행 기사 {len(self._article_keys)}건 로드 ({self.path})")
+        except sqlite3.Error as e:
+            print(f"[이력] 이력 DB 읽기 실패, 이력 없이 진행합니다: {e}")
+
+    def is_covered(self, title, link):
+        """이전 실행일에 이미 다룬 기사인지 확인"""
+        self._load()
+        article_key = canonical_article_key(link)
+        if article_key and article_key in self._article_keys:
+            return True
+        fingerprint = title_fingerprint(title)
+        return bool(fingerprint) and fingerprint in self._fingerprints
+
+    def record(self, parody_data_list):
+        """이번 실행에서 만든 패러디를 원본 기사 키와 함께 기록"""
+        now = time.time()
+        rows = []
+        for parody_data in parody_data_list:
+            if is_fallback_parody(parody_data):
+                continue  # API 오류로 만든 기본 데이터는 다룬 기사로 치지 않음
+            link = parody_data.get('source_url', '')
+            title = parody_data.get('original_title', '')
+            article_key = canonical_article_key(link) or title_fingerprint(title)
+            if not article_key:
+                continue
+            rows.append((
+                article_key, self.today, link, title, title_fingerprint(title),
+                json.dumps(parody_data, ensure_ascii=False), now,
+            ))
+        try:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO stories "
+                "(article_key, run_date, link, title, title_fp, parody_json, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            print(f"[이력] 이번 실행 기사 {len(rows)}건 기록")
+        except sqlite3.Error as e:
+            print(f"[이력] 이력 기록 실패: {e}")
+
+    def compact(self):
+        """보관 기간이 지난 기록을 지우고, 지운 것이 있으면 파일을 정리(VACUUM)"""
+        if self.retention_days <= 0:
+            return
+        cutoff = (get_today_kst() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        try:
+            conn = self._connect()
+            deleted = conn.execute("DELETE FROM stories WHERE run_date < ?", (cutoff,)).rowcount
+            conn.commit()
+            if deleted > 0:
+                conn.execute("VACUUM")
+                print(f"[이력] 보관 기간({self.retention_days}일) 지난 기록 {deleted}건 정리")
+        except sqlite3.Error as e:
+            print(f"[이력] 이력 정리 실패: {e}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
 def save_to_csv(parody_data_list):
-    """패러디 데이터를 CSV 파일로 저장"""
-    try:
-        # 현재 날짜와 시간으로 파일명 생성
-        now = get_today_kst()
-        timestamp = now.strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_gsni.csv"
-        
-        # CSV 파일 경로 설정
-        csv_dir = "csv_data"
-        os.makedirs(csv_dir, exist_ok=True)
-        csv_path = os.path.join(csv_dir, filename)
-        
-        # 기존 CSV 파일 모두 삭제 (새로운 파일만 생성)
-        print("🧹 기존 CSV 파일 정리 중...")
-        csv_files = glob.glob(os.path.join(csv_dir, '*.csv'))
-        if len(csv_files) > 0:
-            deleted_count = 0
-            for old_file in csv_files:
-                try:
-                    os.remove(old_file)
-                    print(f"   - 기존 CSV 파일 삭제: {os.path.basename(old_file)}")
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"   - 파일 삭제 실패: {os.path.basename(old_file)} ({e})")
-            print(f"   - 총 {deleted_count}개 기존 CSV 파일 삭제 완료")
-        else:
-            print("   - 삭제할 기존 CSV 파일이 없습니다")
-        
-        # 구글 시트 초기화는 save_to_gsheet 함수에서 처리
-        
-        # CSV 파일 생성
-        with open(csv_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            fieldnames = [
-                'date', 'original_title', 'parody_title', 'setup', 
-                'punchline', 'humor_lesson', 'disclaimer', 'source_url'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            # 헤더 작성
-            writer.writeheader()
-            
-            # 데이터 작성
-            for parody_data in parody_data_list:
-                writer.writerow(parody_data)
-        
-        print(f"📄 CSV 파일 저장 완료: {csv_path}")
-        return csv_path
-        
-    except Exception as e:
-        print(f"❌ CSV 파일 저장 실패: {e}")
-        return None
+    """패러디 데이터를 CSV 파일로 저장 (기존 CSV는 삭제)"""
+    storage = CsvParodyStorage()
+    if save_parody_rows(storage, parody_data_list):
+        return storage.last_path
+    return None
 
 def upload_to_google_drive(csv_path, folder_id):
     """CSV 파일을 Google Drive에 업로드"""
     try:
+        # Google API 클라이언트는 import 비용이 커서 업로드할 때만 불러옴 (실패해도 None 반환)
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
+        from googleapiclient.http import MediaFileUpload
+
         # Google Drive API 인증 (Service Account 사용)
         creds = None
         service_account_path = 'service_account.json'
         
         if os.path.exists(service_account_path):
-            from google.oauth2 import service_account
             SCOPES = ['https://www.googleapis.com/auth/drive.file']
             creds = service_account.Credentials.from_service_account_file(
                 service_account_path, scopes=SCOPES)
@@ -453,174 +1000,922 @@ def upload_to_google_drive(csv_path, folder_id):
         print(f"❌ Google Drive 업로드 실패: {e}")
         return None
 
-def safe_api_call(client, messages, max_retries=3, base_delay=2):
-    """API 호출을 안전하게 수행하는 함수 (재시도 로직 포함)"""
-    for attempt in range(max_retries):
-        try:
-            response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=2000,
-                temperature=0.8,
-                system="",
-                messages=messages
+# LLM 응답 캐시 설정 (같은 입력으로 재실행 시 Claude 호출 생략)
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join('.cache', 'llm_cache.sqlite3'))
+try:
+    LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', str(24 * 60 * 60)))  # 초
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '500'))
+except ValueError:
+    LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES = 24 * 60 * 60, 500
+# 1이면 캐시를 읽지도 쓰지도 않음
+LLM_CACHE_BYPASS = os.getenv('LLM_CACHE_BYPASS', '').strip().lower() in ('1', 'true', 'yes')
+
+
+class LLMResponseCache:
+    """모델·temperature·max_tokens·system·messages 해시를 키로 하는 SQLite 응답 캐시
+
+    TTL이 지난 항목과 최대 개수를 넘는 오래된(마지막 사용 기준) 항목은 저장 시 정리합니다.
+    SQLite 오류가 나면 캐시만 끄고 파이프라인은 계속 진행합니다.
+    """
+
+    def __init__(self, path, ttl, max_entries, enabled=True):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model, temperature, max_tokens, system, messages, **extra):
+        """요청 파라미터 해시 (extra에는 tools 등 선택 파라미터, None 값은 키에 넣지 않음)"""
+        request = {
+            'model': model,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'system': system,
+            'messages': messages,
+        }
+        request.update({name: value for name, value in extra.items() if value is not None})
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
             )
-            return response
-        except APIStatusError as e:
-            # 529 = 과부하(Overloaded), 429 = Rate Limit 등 재시도 가능 오류
-            if attempt < max_retries - 1:
-                delay = base_delay * (2 ** attempt)
-                msg = "API 과부하" if getattr(e, "status_code", None) == 529 else "API 오류"
-                print(f"  ! {msg} (시도 {attempt + 1}/{max_retries}). {delay}초 후 재시도...")
-                time.sleep(delay)
-            else:
-                print(f"  ! 최대 재시도 횟수 초과. API 오류로 인한 실패.")
-                raise e
-        except Exception as e:
-            print(f"  ! 예상치 못한 오류: {e}")
-            raise e
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
 
-def main():
-    try:
-        print("[1/5] 연합뉴스 증권 RSS에서 중요도 순으로 뉴스 선별 중...")
-        raw_config = parse_rawdata()
-        if not raw_config:
-            print("[오류] 설정 파일(asset/rawdata.txt)을 읽을 수 없습니다. 프로그램을 종료합니다.")
-            sys.exit(1)
-        
-        # 카드뉴스 개수 설정 가져오기
-        card_count_config = raw_config.get('카드뉴스개수', ['카드뉴스 개수 : 최대 20개.'])
-        card_count_str = card_count_config[0] if isinstance(card_count_config, list) else card_count_config
-        card_count = 20  # 기본값
-        
-        # "카드뉴스 개수 : 최대 X개." 형식에서 숫자 추출
-        import re
-        count_match = re.search(r'최대 (\d+)개', card_count_str)
-        if count_match:
-            card_count = int(count_match.group(1))
-            print(f"[설정] 카드뉴스 개수: {card_count}개")
-        else:
-            print(f"[설정] 카드뉴스 개수 파싱 실패, 기본값 {card_count}개 사용")
-        
-        rss_urls = raw_config.get('RSS_URL 지정', [])
-        if isinstance(rss_urls, str):
-            rss_urls = [rss_urls]
-        if not rss_urls:
-            print("[오류] asset/rawdata.txt 파일에서 'RSS_URL 지정'을 찾을 수 없습니다.")
-            sys.exit(1)
-        rss_url = rss_urls[0]  # 연합뉴스 증권 RSS
+    def _disable(self, error):
+        print(f"  ! LLM 캐시 오류로 캐시를 끕니다: {error}")
+        self.enabled = False
+
+    def get(self, key):
+        """캐시된 Message를 반환 (없거나 만료·손상 시 None)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT response FROM llm_cache WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - self.ttl),
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+            except sqlite3.Error as e:
+                self._disable(e)
+                return None
         try:
-            all_news = fetch_news(rss_url, min_news=5)
-        except RuntimeError as e:
-            print(f"\n[오류] 연합뉴스 RSS 수집 실패: {e}")
-            sys.exit(1)
-        if not all_news:
-            print("\n[오류] 연합뉴스 RSS에서 뉴스를 가져오지 못했습니다. 프로그램을 종료합니다.")
-            sys.exit(1)
-        print(f"\n[2/5] Claude 4.0 Sonnet이 독자들이 가장 관심을 가질 만한 뉴스 {card_count}개를 직접 선정합니다...")
-        ranked_news = rank_news_by_importance_with_claude(all_news)
-        top_news = ranked_news[:card_count]
-        print(f"\n[2.5/5] 총 {len(top_news)}개 뉴스 선별 완료! 패러디 생성을 시작합니다.")
-        print(f"\n[3/5] Claude 4.0 Sonnet이 중요도 상위 {len(top_news)}개 뉴스로 패러디 생성 중...")
-        parody_data_list = []
-        today_str = get_today_kst().strftime('%Y-%m-%d')
-        existing_content = []  # 전체 콘텐츠 추적
-        processed_titles = set()  # 처리된 제목 추적
-        
-        for i, news in enumerate(top_news):
-            # 중복 뉴스 제목 체크
-            if news['title'] in processed_titles:
-                print(f"  - [{i+1}/{len(top_news)}] 중복 뉴스 건너뜀: {news['title'][:30]}...")
-                continue
-                
-            processed_titles.add(news['title'])
-            
-            news_content = f"제목: {news['title']}\n내용: {news['summary']}\n링크: {news['link']}"
-            current_date = today_str
-            original_title_safe = news['title'].replace('"', "'")
-            news_link = news['link']
-            news_title = news['title']
-            news_summary = news['summary']
-            
-            # 다양성을 위한 동적 스타일 지정
-            style_index = i % 6
-            style_instructions = [
-                "숫자 충격형 스타일: 구체적 수치와 함께 놀라움 표현",
-                "질문형 스타일: 궁금증을 유발하는 질문으로 제목 구성", 
-                "비교/대조형 스타일: A vs B 또는 과거와 현재 비교",
-                "상황극형 스타일: 특정 상황이나 장면을 연상시키는 제목",
-                "밈/트렌드형 스타일: 최신 인터넷 문화나 밈 활용",
-                "현실 풍자형 스타일: 직장인/개미 현실을 위트있게 풍자"
-            ]
-            
-            setup_styles = [
-                "출근길 지하철에서 뉴스 보는 상황",
-                "점심시간 동료들과 대화하는 상황", 
-                "퇴근 후 집에서 주식 확인하는 상황",
-                "주말 카페에서 투자 고민하는 상황",
-                "회사 화장실에서 몰래 주식 보는 상황",
-                "새벽에 해외 증시 확인하는 상황"
-            ]
-            
-            punchline_styles = [
-                "내적 독백 형식으로 솔직한 심경 표현",
-                "가족/친구와의 대화 형식",
-                "SNS 댓글이나 메시지 형식",
-                "뉴스 인터뷰 패러디 형식", 
-                "광고나 홍보 문구 패러디",
-                "영화/드라마 대사 패러디"
-            ]
-            
-            parody_prompt = f"""
-당신은 조회수 급상승을 목표로 하는 증권 뉴스 패러디 전문가입니다.
+            response = Message.model_validate_json(row[0])
+        except ValueError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return response
 
-【핵심 미션】
-- 30-50대 직장인 타겟, 90초 숏폼 콘텐츠
-- 바이럴 요소 극대화, 독창성과 차별성 확보
-- 기존 뻔한 패턴 완전 탈피
+    def put(self, key, response):
+        if not self.enabled:
+            return
+        try:
+            serialized = response.model_dump_json()
+        except AttributeError:
+            return
+        with self._lock:
+            try:
+                conn = self._connect()
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, serialized, now, now),
+                )
+                self.writes += 1
+                self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error as e:
+                self._disable(e)
 
-【이번 콘텐츠 스타일 지정】
-- 제목 스타일: {style_instructions[style_index]}
-- Setup 상황: {setup_styles[style_index]}  
-- Punchline 형식: {punchline_styles[style_index]}
+    def _evict(self, conn, now):
+        cur = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        self.evictions += max(cur.rowcount, 0)
+        count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self.max_entries:
+            cur = conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+            self.evictions += max(cur.rowcount, 0)
 
-【제목 작성 원칙】
-- 20자 이내, 클릭 욕구 폭발시키는 킬링 타이틀
-- 지정된 스타일에 맞춰 완전히 새로운 접근
-- 구체적 숫자/상황/감정 포함하되 뻔한 표현 금지
+    def summary(self):
+        if not self.enabled and not (self.hits or self.misses):
+            return "LLM 캐시 사용 안 함"
+        return f"LLM 캐시: 히트 {self.hits}건, 미스 {self.misses}건, 저장 {self.writes}건, 정리 {self.evictions}건"
 
-【카드뉴스 구조】
-- parody_title: 지정 스타일의 20자 이내 독창적 제목
-- setup: 지정 상황에 맞는 현실적이고 공감되는 한 줄
-- punchline: 지정 형식의 위트있고 반전있는 35자 이내 멘트
-- humor_lesson: 실용적 투자 조언이나 인생 격언 (기존 뻔한 격언 금지)
-- disclaimer: '면책조항:패러디/특정기관,개인과 무관/투자조언아님/재미목적'
-- source_url: 원본 뉴스 링크
 
-【새로운 표현 패턴 예시】
-제목: "삼성 20% 급등, 이재용 마법?"
-      "4조달러 엔비디아, 한국 GDP 넘었다"
-      "파월 해임설? 개미들 '우리도 해임되고파'"
-      "코인 법안 통과, 라면도 암호화폐로?"
+llm_cache = LLMResponseCache(LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES, enabled=not LLM_CACHE_BYPASS)
 
-Setup: "지하철에서 삼성 뉴스 보자마자 주식 앱 켰다"
-       "점심시간, 동료가 '엔비디아 뭐냐'고 물어봤다"  
-       "퇴근 후 집에서 코인 뉴스에 화들짝했다"
+
+class PromptCacheStats:
+    """호출별 입력/출력 토큰과 프롬프트 캐시 읽기·쓰기 토큰 누적 (스레드 안전)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, response, label=""):
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        input_tokens = getattr(usage, 'input_tokens', 0) or 0
+        output_tokens = getattr(usage, 'output_tokens', 0) or 0
+        cache_read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        cache_write = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.cache_read_tokens += cache_read
+            self.cache_write_tokens += cache_write
+        prefix = f"[{label}] " if label else ""
+        print(f"    - {prefix}토큰: 입력 {input_tokens}, 출력 {output_tokens}, 캐시 읽기 {cache_read}, 캐시 쓰기 {cache_write}")
+
+    def summary(self):
+        return (
+            f"Claude 토큰 합계 ({self.calls}회 호출): 입력 {self.input_tokens}, 출력 {self.output_tokens}, "
+            f"프롬프트 캐시 읽기 {self.cache_read_tokens}, 캐시 쓰기 {self.cache_write_tokens}"
+        )
+
+
+prompt_cache_stats = PromptCacheStats()
+
+
+# --- 호출별 LLM 텔레메트리 (JSONL + 실행 종료 시 요약표) ---
+LLM_TELEMETRY_PATH = os.getenv('LLM_TELEMETRY_PATH', os.path.join('.cache', 'llm_telemetry.jsonl'))
+# 100만 토큰당 USD 단가 (기본값: Claude Sonnet 4 공개 가격)
+try:
+    CLAUDE_PRICE_INPUT = float(os.getenv('CLAUDE_PRICE_INPUT', '3.0'))
+    CLAUDE_PRICE_OUTPUT = float(os.getenv('CLAUDE_PRICE_OUTPUT', '15.0'))
+    CLAUDE_PRICE_CACHE_WRITE = float(os.getenv('CLAUDE_PRICE_CACHE_WRITE', '3.75'))
+    CLAUDE_PRICE_CACHE_READ = float(os.getenv('CLAUDE_PRICE_CACHE_READ', '0.30'))
+except ValueError:
+    CLAUDE_PRICE_INPUT, CLAUDE_PRICE_OUTPUT, CLAUDE_PRICE_CACHE_WRITE, CLAUDE_PRICE_CACHE_READ = 3.0, 15.0, 3.75, 0.30
+CLAUDE_BATCH_DISCOUNT = 0.5  # Message Batches API는 절반 가격
+
+
+def _percentile(values, pct):
+    """최근접 순위 방식 백분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LLMTelemetry:
+    """safe_api_call 호출마다 호출자·지연·토큰·재시도·상태를 JSONL로 기록하고 요약표를 만든다 (스레드 안전)"""
+
+    def __init__(self, path=LLM_TELEMETRY_PATH):
+        self.path = path
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.records = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_cost(input_tokens, output_tokens, cache_read, cache_write, batch=False):
+        cost = (
+            input_tokens * CLAUDE_PRICE_INPUT
+            + output_tokens * CLAUDE_PRICE_OUTPUT
+            + cache_write * CLAUDE_PRICE_CACHE_WRITE
+            + cache_read * CLAUDE_PRICE_CACHE_READ
+        ) / 1_000_000
+        return cost * CLAUDE_BATCH_DISCOUNT if batch else cost
+
+    def record(self, caller, status, latency, response=None, ttft=None, retries=0, retry_delays=None, error=None, batch=False, early_stop=False, hedged=False):
+        usage = getattr(response, 'usage', None) if response is not None else None
+        input_tokens = (getattr(usage, 'input_tokens', 0) or 0) if usage else 0
+        output_tokens = (getattr(usage, 'output_tokens', 0) or 0) if usage else 0
+        cache_read = (getattr(usage, 'cache_read_input_tokens', 0) or 0) if usage else 0
+        cache_write = (getattr(usage, 'cache_creation_input_tokens', 0) or 0) if usage else 0
+        record = {
+            'run_id': self.run_id,
+            'ts': time.time(),
+            'caller': caller or 'unknown',
+            'model': CLAUDE_MODEL,
+            'status': status,
+            'latency_s': round(latency, 3) if latency is not None else None,
+            'ttft_s': round(ttft, 3) if ttft is not None else None,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'cache_read_tokens': cache_read,
+            'cache_write_tokens': cache_write,
+            'retries': retries,
+            'retry_delays_s': list(retry_delays or []),
+            'batch': batch,
+            'early_stop': early_stop,
+            'hedged': hedged,
+            'cost_usd': round(self.estimate_cost(input_tokens, output_tokens, cache_read, cache_write, batch), 6),
+        }
+        if error is not None:
+            record['error'] = str(error)[:300]
+        with self._lock:
+            self.records.append(record)
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            except OSError as e:
+                print(f"[텔레메트리] 기록 실패: {e}")
+
+    def summary(self):
+        """호출 종류(ranking/parody 등)별 호출 수, p50/p95 지연, 토큰, 예상 비용 표"""
+        with self._lock:
+            records = list(self.records)
+        if not records:
+            return "[텔레메트리] 기록된 LLM 호출이 없습니다."
+        groups = {}
+        for record in records:
+            groups.setdefault(record['caller'].split('-')[0], []).append(record)
+        groups['합계'] = records
+
+        def fmt(value):
+            return f"{value:.2f}s" if value is not None else "-"
+
+        lines = [
+            f"[텔레메트리] LLM 호출 요약 ({self.path})",
+            f"  {'구분':<10}{'호출':>6}{'실패':>6}{'재시도':>7}{'p50':>9}{'p95':>9}{'입력':>10}{'출력':>9}{'캐시읽기':>10}{'비용(USD)':>11}",
+        ]
+        for name, items in groups.items():
+            latencies = [r['latency_s'] for r in items if r['latency_s'] is not None and r['status'] == 'ok']
+            failures = sum(1 for r in items if r['status'] not in ('ok', 'cache_hit'))
+            lines.append(
+                f"  {name:<10}{len(items):>6}{failures:>6}{sum(r['retries'] for r in items):>7}"
+                f"{fmt(_percentile(latencies, 50)):>9}{fmt(_percentile(latencies, 95)):>9}"
+                f"{sum(r['input_tokens'] for r in items):>10}{sum(r['output_tokens'] for r in items):>9}"
+                f"{sum(r['cache_read_tokens'] for r in items):>10}{sum(r['cost_usd'] for r in items):>11.4f}"
+            )
+        return '\n'.join(lines)
+
+
+llm_telemetry = LLMTelemetry()
+
+
+# --- 프로세스 공유 레이트 리미터 (분당 요청 수 / 분당 입력 토큰 수) ---
+try:
+    CLAUDE_RPM_LIMIT = int(os.getenv('CLAUDE_RPM_LIMIT', '50'))
+    CLAUDE_ITPM_LIMIT = int(os.getenv('CLAUDE_ITPM_LIMIT', '30000'))
+except ValueError:
+    CLAUDE_RPM_LIMIT, CLAUDE_ITPM_LIMIT = 50, 30000
+# 재시도해도 소용없는 오류 (요청 자체가 잘못됨 / 인증·권한 문제)
+NON_RETRYABLE_STATUS = {400, 401, 403, 404, 413, 422}
+RETRY_MAX_DELAY = 60
+
+
+class TokenBucket:
+    """분당 capacity만큼 채워지는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, capacity):
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def reserve(self, amount):
+        """amount만큼 예약하고, 토큰이 찰 때까지 기다려야 할 초를 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            amount = min(float(amount), self.capacity)
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens * 60.0 / self.capacity
+
+    def adjust(self, delta):
+        """예상치와 실제 사용량 차이 반영 (delta > 0 이면 더 썼음)"""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+    def set_capacity(self, capacity, remaining=None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.capacity = float(capacity)
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+            self.tokens = min(self.tokens, self.capacity)
+
+
+class ClaudeRateLimiter:
+    """동기/병렬 경로가 함께 쓰는 Claude 호출 제한기
+
+    - 호출 전 요청·입력 토큰 버킷에서 예약하고 필요한 만큼 기다립니다.
+    - 응답 헤더(anthropic-ratelimit-*)로 한도와 남은 양을 갱신합니다.
+    - 429/529의 retry-after는 모든 스레드가 함께 기다리도록 전역 일시정지로 반영합니다.
+    """
+
+    def __init__(self, rpm=CLAUDE_RPM_LIMIT, itpm=CLAUDE_ITPM_LIMIT):
+        self.requests = TokenBucket(rpm)
+        self.input_tokens = TokenBucket(itpm)
+        self.paused_until = 0.0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, estimated_tokens):
+        wait = max(self.requests.reserve(1), self.input_tokens.reserve(estimated_tokens))
+        with self._lock:
+            wait = max(wait, self.paused_until - time.monotonic())
+        if wait > 0:
+            with self._lock:
+                self.waited += wait
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        self.input_tokens.adjust(actual_tokens - estimated_tokens)
+
+    def update_from_headers(self, headers):
+        if not headers:
+            return
+        def header_int(name):
+            try:
+                return int(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+        rpm = header_int('anthropic-ratelimit-requests-limit')
+        if rpm:
+            self.requests.set_capacity(rpm, header_int('anthropic-ratelimit-requests-remaining'))
+        itpm = header_int('anthropic-ratelimit-input-tokens-limit')
+        if itpm:
+            self.input_tokens.set_capacity(itpm, header_int('anthropic-ratelimit-input-tokens-remaining'))
+
+
+claude_rate_limiter = ClaudeRateLimiter()
+
+
+def estimate_request_tokens(system, messages):
+    """요청 입력 토큰 대략 추정 (estimate_tokens 사용)"""
+    text = json.dumps(system, ensure_ascii=False, default=str) + json.dumps(messages, ensure_ascii=False, default=str)
+    return max(1, estimate_tokens(text))
+
+
+# --- 스트리밍 조기 종료와 호출 종류별 max_tokens ---
+# 1이면 스트리밍으로 받으며, 완성된 JSON 객체/필요한 ID 수가 도착하면 바로 끊음
+CLAUDE_STREAMING = os.getenv('CLAUDE_STREAMING', '').strip().lower() in ('1', 'true', 'yes')
+# 측정 기록이 부족할 때 쓰는 호출 종류별 출력 토큰 한도 (묶음은 뉴스 1건당)
+MAX_TOKENS_DEFAULTS = {'ranking': 256, 'parody': 1024, 'group': 1024}
+MAX_TOKENS_MIN_SAMPLES = 20
+MAX_TOKENS_HEADROOM = 1.5
+# 하루 동안 고정할 측정 한도 (max_tokens가 캐시 키에 들어가므로 같은 날 재실행 시 캐시가 그대로 맞도록)
+MAX_TOKENS_BUDGETS_PATH = os.getenv('MAX_TOKENS_BUDGETS_PATH', os.path.join('.cache', 'max_tokens_budgets.json'))
+_max_tokens_budgets = {}
+_max_tokens_lock = threading.Lock()
+
+
+def _measured_telemetry(field, path=LLM_TELEMETRY_PATH, limit=2000, first_attempt_only=False, skip_early_stop=False):
+    """텔레메트리 JSONL의 최근 성공 호출에서 호출 종류별 field 값 목록을 읽음
+
+    first_attempt_only면 재시도 없이 끝난 호출만 사용합니다 (지연 = 한 번의 요청 시간).
+    skip_early_stop이면 스트리밍 조기 종료 호출을 뺍니다 (출력 토큰 수가 추정값이므로).
+    헤지된 호출도 포함합니다. 기록된 지연은 헤지 임계값보다 길어 원래 요청 지연의 하한이므로,
+    빼면 느린 호출만 빠져 백분위가 계속 내려갑니다.
+    """
+    samples = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            lines = f.readlines()[-limit:]
+    except OSError:
+        return samples
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get('status') != 'ok' or record.get('batch') or not record.get(field):
+            continue
+        if first_attempt_only and record.get('retries'):
+            continue
+        if skip_early_stop and record.get('early_stop'):
+            continue
+        samples.setdefault(record.get('caller', '').split('-')[0], []).append(record[field])
+    return samples
+
+
+def _measure_max_tokens_budgets():
+    """텔레메트리의 출력 토큰 p95 x 1.5 (표본이 부족한 종류는 기본값)"""
+    samples = _measured_telemetry('output_tokens', skip_early_stop=True)
+    budgets = {}
+    for name, default in MAX_TOKENS_DEFAULTS.items():
+        measured = samples.get('parody' if name == 'group' else name, [])
+        if len(measured) >= MAX_TOKENS_MIN_SAMPLES:
+            # 캐시 키가 자주 바뀌지 않도록 128 단위로 올림
+            budgets[name] = math.ceil(_percentile(measured, 95) * MAX_TOKENS_HEADROOM / 128) * 128
+        else:
+            budgets[name] = default
+    return budgets
+
+
+def load_max_tokens_budgets(today, path=MAX_TOKENS_BUDGETS_PATH):
+    """오늘 이미 정한 측정 한도가 있으면 그대로, 없으면 새로 측정해 파일에 저장"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('date') == today:
+            return saved['budgets']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    budgets = _measure_max_tokens_budgets()
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'date': today, 'budgets': budgets}, f)
+    except OSError as e:
+        print(f"  ! max_tokens 한도 저장 실패 (다음 실행에서 다시 측정): {e}")
+    return budgets
+
+
+def max_tokens_for(call_type, items=1):
+    """호출 종류별 max_tokens (CLAUDE_MAX_TOKENS_<종류> > 측정 p95 x 1.5 > 기본값)
+
+    측정 한도는 날짜(KST)별로 저장해 같은 날 재실행해도 바뀌지 않습니다.
+    묶음(group) 요청은 뉴스 1건당 패러디 한도를 items배 합니다.
+    """
+    with _max_tokens_lock:
+        if not _max_tokens_budgets:
+            measured = load_max_tokens_budgets(get_today_kst().strftime('%Y-%m-%d'))
+            for name, default in MAX_TOKENS_DEFAULTS.items():
+                budget = measured.get(name, default)
+                try:
+                    budget = int(os.getenv(f'CLAUDE_MAX_TOKENS_{name.upper()}', str(budget)))
+                except ValueError:
+                    pass
+                _max_tokens_budgets[name] = max(128, min(budget, CLAUDE_MAX_TOKENS))
+            print(f"[설정] 호출 종류별 max_tokens: {_max_tokens_budgets}")
+    return _max_tokens_budgets.get(call_type, CLAUDE_MAX_TOKENS) * max(1, items)
+
+
+def first_complete_json(text, opener='{'):
+    """text에서 처음 나오는 opener({ 또는 [)부터 괄호가 닫힌 JSON 값을 찾아 파싱 결과를 반환 (아직 미완성이면 None)"""
+    closer = '}' if opener == '{' else ']'
+    start = text.find(opener)
+    if start == -1:
+        return None
+    depth, in_string, escaped = 0, False, False
+    for pos in range(start, len(text)):
+        ch = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == opener:
+            depth += 1
+        elif ch == closer:
+            depth -= 1
+            if depth == 0:
+                try:
+                    return json.loads(text[start:pos + 1])
+                except json.JSONDecodeError:
+                    return None
+    return None
+
+
+def stop_after_json_object(text):
+    return first_complete_json(text, '{') is not None
+
+
+def stop_after_json_array(text):
+    return first_complete_json(text, '[') is not None
+
+
+def stop_after_ids(count):
+    """쉼표로 구분된 ID가 count개 완성되면(뒤에 구분자가 온 숫자) 멈추는 조건"""
+    def stop_when(text):
+        return len(re.findall(r'\d+(?=\D)', text)) >= count
+    return stop_when
+
+
+def stream_message(client, stop_when, cancel_event=None, **request):
+    """스트리밍으로 메시지를 받고 stop_when(누적 텍스트)이 참이 되면 바로 끊음
+
+    반환: (message, 응답 헤더, 첫 토큰까지 걸린 초, 조기 종료 여부)
+    조기 종료 시 message는 그때까지의 스냅샷입니다. 출력 토큰 수는 message_delta 전에 끊겨
+    채워지지 않으므로 받은 텍스트로 추정해 넣습니다 (비용 집계용).
+    stop_when이 None이면 끝까지 받습니다. cancel_event가 설정되면(헤지 요청에서 진 쪽)
+    도구 호출 응답이라도 다음 이벤트에서 바로 연결을 끊습니다.
+    """
+    start = time.perf_counter()
+    ttft = None
+    text = ''
+    early_stop = False
+    with client.messages.stream(**request) as stream:
+        headers = getattr(getattr(stream, 'response', None), 'headers', None)
+        for event in stream:
+            if cancel_event is not None and cancel_event.is_set():
+                early_stop = True
+                break
+            if getattr(event, 'type', None) != 'text':
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            text += event.text
+            if stop_when is not None and stop_when(text):
+                early_stop = True
+                break
+        message = stream.current_message_snapshot if early_stop else stream.get_final_message()
+    usage = getattr(message, 'usage', None)
+    if early_stop and usage is not None:
+        usage.output_tokens = max(usage.output_tokens or 0, estimate_tokens(text))
+    return message, headers, ttft, early_stop
+
+
+# --- 요청 헤징 (느린 호출에 같은 요청을 하나 더 보내 먼저 온 결과 사용) ---
+CLAUDE_HEDGE = os.getenv('CLAUDE_HEDGE', '').strip().lower() in ('1', 'true', 'yes')
+try:
+    CLAUDE_HEDGE_PERCENTILE = float(os.getenv('CLAUDE_HEDGE_PERCENTILE', '90'))
+    CLAUDE_HEDGE_DEFAULT_DELAY = float(os.getenv('CLAUDE_HEDGE_DEFAULT_DELAY', '30'))
+    CLAUDE_HEDGE_MAX_FRACTION = float(os.getenv('CLAUDE_HEDGE_MAX_FRACTION', '0.2'))
+except ValueError:
+    CLAUDE_HEDGE_PERCENTILE, CLAUDE_HEDGE_DEFAULT_DELAY, CLAUDE_HEDGE_MAX_FRACTION = 90, 30, 0.2
+CLAUDE_HEDGE_MIN_SAMPLES = 5
+
+
+class RequestHedger:
+    """호출 종류별 지연 백분위수를 넘기면 같은 요청을 한 번 더 보내고 먼저 성공한 결과를 쓴다
+
+    - 지연 표본: 이번 실행에서 원래 요청이 끝날 때까지 걸린 시간 + 텔레메트리 기록
+      (헤지 요청이 이기면 그 시점까지의 시간을 원래 요청 지연의 하한으로 넣음)
+    - 헤지 예산: 전체 요청 수 x CLAUDE_HEDGE_MAX_FRACTION (최소 1회)
+    - 먼저 성공한 쪽을 쓰고 진 쪽은 cancel_event로 스트리밍 연결을 끊습니다.
+    - 절감 시간은 헤지 요청이 이긴 시점보다 오래 걸린 과거 표본의 중앙값으로 추정합니다.
+    """
+
+    def __init__(self, enabled=CLAUDE_HEDGE):
+        self.enabled = enabled
+        self.requests = 0
+        self.fired = 0
+        self.won = 0
+        self.saved_seconds = 0.0
+        self.samples = None
+        self._lock = threading.Lock()
+
+    def _record_sample(self, call_type, latency):
+        with self._lock:
+            self.samples.setdefault(call_type, []).append(latency)
+
+    def estimate_saving(self, call_type, elapsed):
+        """elapsed초에도 안 끝난 원래 요청이 더 걸렸을 시간 (더 느린 표본이 없으면 0으로 보수적 추정)"""
+        with self._lock:
+            slower = [latency for latency in self.samples.get(call_type, []) if latency > elapsed]
+        if not slower:
+            return 0.0
+        return _percentile(slower, 50) - elapsed
+
+    def delay_for(self, call_type):
+        with self._lock:
+            if self.samples is None:
+                self.samples = _measured_telemetry('latency_s', first_attempt_only=True)
+            latencies = list(self.samples.get(call_type, []))
+        if len(latencies) < CLAUDE_HEDGE_MIN_SAMPLES:
+            return CLAUDE_HEDGE_DEFAULT_DELAY
+        return _percentile(latencies, CLAUDE_HEDGE_PERCENTILE)
+
+    def _take_budget(self):
+        with self._lock:
+            if self.fired >= max(1, int(self.requests * CLAUDE_HEDGE_MAX_FRACTION)):
+                return False
+            self.fired += 1
+            return True
+
+    def run(self, call_type, request_fn):
+        """request_fn(cancel_event)을 실행하고 (결과, 헤지 여부)를 반환"""
+        with self._lock:
+            self.requests += 1
+        start = time.perf_counter()
+        if not self.enabled:
+            return request_fn(None), False
+
+        delay = self.delay_for(call_type)
+        pool = ThreadPoolExecutor(max_workers=2)
+        events = [threading.Event(), threading.Event()]
+        sampled = []  # 원래 요청 지연 표본은 한 번만 기록
+
+        def sample_primary(latency):
+            with self._lock:
+                if sampled:
+                    return
+                sampled.append(latency)
+            self._record_sample(call_type, latency)
+
+        def record_primary(future):
+            # 끊긴 원래 요청은 지연이 아니라 끊은 시각이므로 제외
+            if future.exception() is None and not events[0].is_set():
+                sample_primary(time.perf_counter() - start)
+
+        try:
+            primary = pool.submit(request_fn, events[0])
+            primary.add_done_callback(record_primary)
+            done, _ = wait([primary], timeout=delay)
+            if done or not self._take_budget():
+                return primary.result(), False
+
+            print(f"  - 응답 지연({delay:.1f}s 초과), 헤지 요청 추가 전송")
+            backup = pool.submit(request_fn, events[1])
+            futures = {primary: 0, backup: 1}
+            last_error = None
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                winner = futures[future]
+                events[1 - winner].set()  # 진 쪽 스트리밍 중단
+                if winner == 1:
+                    elapsed = time.perf_counter() - start
+                    saving = self.estimate_saving(call_type, elapsed)
+                    sample_primary(elapsed)
+                    with self._lock:
+                        self.won += 1
+                        self.saved_seconds += saving
+                return result, True
+            raise last_error
+        finally:
+            pool.shutdown(wait=False)
+
+    def summary(self):
+        if not self.enabled:
+            return "요청 헤징: 꺼짐 (CLAUDE_HEDGE=1로 켜기)"
+        return (
+            f"요청 헤징: {self.requests}회 요청 중 {self.fired}회 발동, 헤지 요청이 먼저 도착 {self.won}회, "
+            f"절감 추정 {self.saved_seconds:.1f}s (백분위 p{CLAUDE_HEDGE_PERCENTILE:g}, 예산 {CLAUDE_HEDGE_MAX_FRACTION:.0%})"
+        )
+
+
+request_hedger = RequestHedger()
+
+
+def retry_after_seconds(error):
+    """APIStatusError 응답의 retry-after 헤더(초)를 읽어 반환, 없으면 None"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get('retry-after')))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base_delay, retry_after=None):
+    """retry-after가 있으면 그만큼(+약간의 지터), 없으면 지터를 섞은 지수 백오프"""
+    if retry_after is not None:
+        return min(RETRY_MAX_DELAY, retry_after + random.uniform(0, 1))
+    delay = min(RETRY_MAX_DELAY, base_delay * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
+
+
+def safe_api_call(client, messages, max_retries=3, base_delay=2, use_cache=True, system="", tools=None, tool_choice=None, caller="", max_tokens=None, stop_when=None):
+    """API 호출을 안전하게 수행하는 함수 (재시도 로직 및 응답 캐시 포함)
+
+    system에는 문자열이나 cache_control이 붙은 블록 목록을 넘길 수 있습니다.
+    tools/tool_choice를 넘기면 도구 호출로 출력 구조를 강제합니다.
+    caller(예: "ranking", "parody-3")는 텔레메트리 기록에 사용됩니다.
+    max_tokens를 생략하면 CLAUDE_MAX_TOKENS를 사용합니다.
+    CLAUDE_STREAMING이 켜져 있고 stop_when(누적 텍스트 -> bool)을 넘기면 스트리밍으로 받다가 조건이 맞으면 바로 끊습니다.
+    """
+    max_tokens = max_tokens or CLAUDE_MAX_TOKENS
+    options = {}
+    if tools is not None:
+        options['tools'] = tools
+    if tool_choice is not None:
+        options['tool_choice'] = tool_choice
+
+    cache_key = None
+    if use_cache and llm_cache.enabled:
+        cache_key = LLMResponseCache.make_key(CLAUDE_MODEL, CLAUDE_TEMPERATURE, max_tokens, system, messages, **options)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            print("  - LLM 캐시 히트 (Claude 호출 생략)")
+            llm_telemetry.record(caller, 'cache_hit', 0.0)
+            return cached
+
+    call_start = time.perf_counter()
+    retry_delays = []
+    estimated_tokens = estimate_request_tokens(system, messages)
+    for attempt in range(max_retries):
+        try:
+            request = dict(
+                model=CLAUDE_MODEL,
+                max_tokens=max_tokens,
+                temperature=CLAUDE_TEMPERATURE,
+                system=system,
+                messages=messages,
+                **options
+            )
+
+            def send(cancel_event):
+                claude_rate_limiter.acquire(estimated_tokens)
+                # 도구 호출(구조화 출력)은 텍스트 조기 종료 대상이 아님
+                stream_stop = stop_when if CLAUDE_STREAMING and tools is None else None
+                # 헤지 중인 요청(cancel_event 있음)은 진 쪽을 끊을 수 있도록 항상 스트리밍
+                if stream_stop is not None or cancel_event is not None:
+                    message, headers, first_token, stopped = stream_message(client, stream_stop, cancel_event, **request)
+                    claude_rate_limiter.update_from_headers(headers)
+                    return message, first_token, stopped
+                raw_response = client.messages.with_raw_response.create(**request)
+                claude_rate_limiter.update_from_headers(raw_response.headers)
+                return raw_response.parse(), None, False
+
+            (response, ttft, early_stop), hedged = request_hedger.run((caller or 'unknown').split('-')[0], send)
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                # 캐시 읽기 토큰은 분당 입력 토큰 한도에 포함되지 않으므로 빼고 정산
+                actual_tokens = sum(
+                    getattr(usage, name, 0) or 0
+                    for name in ('input_tokens', 'cache_creation_input_tokens')
+                )
+                claude_rate_limiter.settle(estimated_tokens, actual_tokens)
+            prompt_cache_stats.record(response)
+            llm_telemetry.record(
+                caller, 'ok', time.perf_counter() - call_start, response, ttft=ttft,
+                retries=attempt, retry_delays=retry_delays, early_stop=early_stop, hedged=hedged,
+            )
+            if cache_key is not None:
+                llm_cache.put(cache_key, response)
+            return response
+        except (APIStatusError, APIConnectionError) as e:
+            status_code = getattr(e, 'status_code', None)
+            # 400 등 요청 자체 오류는 재시도하지 않고 바로 실패
+            if status_code in NON_RETRYABLE_STATUS or attempt >= max_retries - 1:
+                if status_code in NON_RETRYABLE_STATUS:
+                    print(f"  ! 재시도 불가 API 오류 ({status_code}): {e}")
+                else:
+                    print(f"  ! 최대 재시도 횟수 초과. API 오류로 인한 실패.")
+                llm_telemetry.record(
+                    caller, f"api_error_{status_code or 'connection'}", time.perf_counter() - call_start,
+                    retries=attempt, retry_delays=retry_delays, error=e,
+                )
+                raise e
+            # 429 = Rate Limit, 529 = 과부하(Overloaded), 5xx/연결 오류는 재시도
+            retry_after = retry_after_seconds(e)
+            delay = backoff_delay(attempt, base_delay, retry_after)
+            if retry_after is not None or status_code in (429, 529):
+                claude_rate_limiter.pause(delay)  # 다른 스레드도 함께 대기
+            msg = "API 과부하" if status_code == 529 else ("요청 한도 초과" if status_code == 429 else "API 오류")
+            print(f"  ! {msg} (시도 {attempt + 1}/{max_retries}). {delay:.1f}초 후 재시도...")
+            retry_delays.append(round(delay, 2))
+            time.sleep(delay)
+        except Exception as e:
+            print(f"  ! 예상치 못한 오류: {e}")
+            llm_telemetry.record(
+                caller, 'error', time.perf_counter() - call_start,
+                retries=attempt, retry_delays=retry_delays, error=e,
+            )
+            raise e
+
+# --- 패러디 스타일 (카드 순번 % 6 으로 선택) ---
+STYLE_INSTRUCTIONS = [
+    "숫자 충격형 스타일: 구체적 수치와 함께 놀라움 표현",
+    "질문형 스타일: 궁금증을 유발하는 질문으로 제목 구성", 
+    "비교/대조형 스타일: A vs B 또는 과거와 현재 비교",
+    "상황극형 스타일: 특정 상황이나 장면을 연상시키는 제목",
+    "밈/트렌드형 스타일: 최신 인터넷 문화나 밈 활용",
+    "현실 풍자형 스타일: 직장인/개미 현실을 위트있게 풍자"
+]
+
+SETUP_STYLES = [
+    "출근길 지하철에서 뉴스 보는 상황",
+    "점심시간 동료들과 대화하는 상황", 
+    "퇴근 후 집에서 주식 확인하는 상황",
+    "주말 카페에서 투자 고민하는 상황",
+    "회사 화장실에서 몰래 주식 보는 상황",
+    "새벽에 해외 증시 확인하는 상황"
+]
+
+PUNCHLINE_STYLES = [
+    "내적 독백 형식으로 솔직한 심경 표현",
+    "가족/친구와의 대화 형식",
+    "SNS 댓글이나 메시지 형식",
+    "뉴스 인터뷰 패러디 형식", 
+    "광고나 홍보 문구 패러디",
+    "영화/드라마 대사 패러디"
+]
+
+DISCLAIMER_TEXT = "면책조항:패러디/특정기관,개인과 무관/투자조언아님/재미목적"
+
+# 동시에 생성할 패러디 수 (1이면 기존처럼 한 건씩 순차 생성)
+try:
+    PARODY_CONCURRENCY = max(1, int(os.getenv('PARODY_CONCURRENCY', '1')))
+except ValueError:
+    PARODY_CONCURRENCY = 1
+
+# 1이면 Message Batches API로 일괄 생성 (야간 정기 실행용, 지연보다 비용·한도 여유 우선)
+PARODY_BATCH = os.getenv('PARODY_BATCH', '').strip().lower() in ('1', 'true', 'yes')
+try:
+    PARODY_BATCH_POLL_INTERVAL = float(os.getenv('PARODY_BATCH_POLL_INTERVAL', '30'))
+    PARODY_BATCH_TIMEOUT = float(os.getenv('PARODY_BATCH_TIMEOUT', '7200'))
+except ValueError:
+    PARODY_BATCH_POLL_INTERVAL, PARODY_BATCH_TIMEOUT = 30, 7200
+
+# 한 요청에 묶어 보낼 뉴스 수 K (1이면 뉴스마다 한 요청)
+try:
+    PARODY_GROUP_SIZE = max(1, int(os.getenv('PARODY_GROUP_SIZE', '1')))
+except ValueError:
+    PARODY_GROUP_SIZE = 1
+
+# 유사 패러디를 다시 생성하는 최대 횟수
+PARODY_DEDUP_ROUNDS = 2
+
+# 필드별 문자 3-gram Jaccard 유사도가 이 값 이상이면 중복으로 판단
+try:
+    PARODY_SIMILARITY_THRESHOLD = float(os.getenv('PARODY_SIMILARITY_THRESHOLD', '0.5'))
+except ValueError:
+    PARODY_SIMILARITY_THRESHOLD = 0.5
+
+
+# 모든 카드에 공통인 패러디 지침 (system 블록으로 보내 프롬프트 캐시 대상이 됨)
+PARODY_SYSTEM_PROMPT = f"""
+당신은 조회수 급상승을 목표로 하는 증권 뉴스 패러디 전문가입니다.
+
+【핵심 미션】
+- 30-50대 직장인 타겟, 90초 숏폼 콘텐츠
+- 바이럴 요소 극대화, 독창성과 차별성 확보
+- 기존 뻔한 패턴 완전 탈피
+
+【제목 작성 원칙】
+- 20자 이내, 클릭 욕구 폭발시키는 킬링 타이틀
+- 지정된 스타일에 맞춰 완전히 새로운 접근
+- 구체적 숫자/상황/감정 포함하되 뻔한 표현 금지
+
+【카드뉴스 구조】
+- parody_title: 지정 스타일의 20자 이내 독창적 제목
+- setup: 지정 상황에 맞는 현실적이고 공감되는 한 줄
+- punchline: 지정 형식의 위트있고 반전있는 35자 이내 멘트
+- humor_lesson: 실용적 투자 조언이나 인생 격언 (기존 뻔한 격언 금지)
+- disclaimer: '{DISCLAIMER_TEXT}'
+- source_url: 원본 뉴스 링크
+
+【새로운 표현 패턴 예시】
+제목: "삼성 20% 급등, 이재용 마법?"
+      "4조달러 엔비디아, 한국 GDP 넘었다"
+      "파월 해임설? 개미들 '우리도 해임되고파'"
+      "코인 법안 통과, 라면도 암호화폐로?"
+
+Setup: "지하철에서 삼성 뉴스 보자마자 주식 앱 켰다"
+       "점심시간, 동료가 '엔비디아 뭐냐'고 물어봤다"  
+       "퇴근 후 집에서 코인 뉴스에 화들짝했다"
 
 Punchline: "나: (속마음) '이제 월급보다 주식이 더 중요해...'"
            "아내: '또 주식해?' 나: '이건 투자야!' 아내: '망하면 이혼이야!'"
            "댓글: '대박! 나도 사고싶다' → 답글: '이미 늦었어요 ㅠㅠ'"
 
 【출력 예시】
+- date, original_title, source_url은 입력 메시지에 지정된 값을 그대로 사용
 ```json
 {{
-  "date": "{current_date}",
-  "original_title": "{original_title_safe}",
+  "date": "2025-06-20",
+  "original_title": "삼성전자, 외국인 매수세에 20% 급등",
   "parody_title": "삼성 20% 폭등! 이재용 마법 실화?",
   "setup": "지하철 2호선에서 삼성 뉴스 보자마자 주식 앱을 켰다.",
   "punchline": "나: (속마음) '드디어 내 삼성전자가...' 옆 아저씨: '뭘 그렇게 웃어?' 나: '로또 당첨됐어요!'",
   "humor_lesson": "투자의 핵심은 타이밍이 아니라 인내심이다. 급등도 좋지만 장기 관점을 잃지 말자.",
-  "disclaimer": "면책조항:패러디/특정기관,개인과 무관/투자조언아님/재미목적",
-  "source_url": "{news_link}"
+  "disclaimer": "{DISCLAIMER_TEXT}",
+  "source_url": "https://www.yna.co.kr/view/AKR20250620000000000"
 }}
 ```
 
@@ -631,6 +1926,50 @@ Punchline: "나: (속마음) '이제 월급보다 주식이 더 중요해...'"
 - 모든 필드를 빈 값 없이 창의적으로 채우기
 - 뻔한 패턴/표현/구조 완전 배제
 
+【절대 금지 패턴들】
+- '월급은 그대로인데' 표현 금지
+- '개미들 이럴 줄이야' 표현 금지
+- '동료: ○○ 나: △△ 동료: 우리 회사도...' 대화 패턴 금지
+- '계단으로 오르고 창문/엘리베이터로' 표현 금지
+- '천문학적', '천정부지' 등 과장 표현 반복 금지
+- '또 뚝!', '또 쾅!' 등 의성어 반복 금지
+
+【필수 다양화 요구사항】
+- 제목: 숫자형/질문형/감탄형/비교형 등 완전히 다른 스타일 사용
+- Setup: 출근/점심/퇴근/주말/휴가 등 다양한 상황 설정
+- Punchline: 독백/상황극/밈/패러디/인터뷰 등 형식 변화
+- Lesson: 실용조언/명언/유머/격언 등 톤앤매너 변화
+"""
+
+PARODY_SYSTEM = [
+    {"type": "text", "text": PARODY_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+]
+
+
+def build_parody_prompt(i, news, current_date):
+    """i번째 뉴스에 대한 패러디 요청(카드별로 바뀌는 부분만)을 생성
+
+    공통 지침은 PARODY_SYSTEM으로 따로 보내므로 여기에는 스타일 지정과 입력 뉴스만 담습니다.
+    """
+    original_title_safe = news['title'].replace('"', "'")
+    news_link = news['link']
+    news_title = news['title']
+    news_summary = news['summary']
+
+    # 다양성을 위한 동적 스타일 지정
+    style_index = i % 6
+
+    return f"""
+【이번 콘텐츠 스타일 지정】
+- 제목 스타일: {STYLE_INSTRUCTIONS[style_index]}
+- Setup 상황: {SETUP_STYLES[style_index]}  
+- Punchline 형식: {PUNCHLINE_STYLES[style_index]}
+
+【고정 필드 값】
+- date: "{current_date}"
+- original_title: "{original_title_safe}"
+- source_url: "{news_link}"
+
 아래는 입력 뉴스입니다.
 - 제목: {news_title}
 - 요약: {news_summary}
@@ -638,109 +1977,941 @@ Punchline: "나: (속마음) '이제 월급보다 주식이 더 중요해...'"
 
 지정된 스타일과 상황에 맞춰, 기존과 완전히 차별화된 독창적 패러디를 생성하세요.
 """
-            print(f"  - [{i+1}/{len(top_news)}] Claude 4.0 Sonnet 패러디 생성 중... (스타일: {style_instructions[style_index][:15]}...)")
-            response_text = ""
-            error = None
-            for attempt in range(3):  # 재시도 횟수 증가
+
+
+def build_default_parody(news, current_date):
+    """API 실패 시 사용할 기본 패러디 데이터 (날짜는 오늘 날짜로 강제 설정)"""
+    return {
+        'date': current_date,  # 수집 일자 (오늘)
+        'original_title': news['title'].replace('"', "'"),
+        'parody_title': f"API 오류 - {news['title'][:20]}...",
+        'setup': "API 서버 과부하로 인한 기본 설정",
+        'punchline': "서버가 복구되면 다시 시도해주세요",
+        'humor_lesson': "투자보다 중요한 것은 인내심입니다",
+        'disclaimer': DISCLAIMER_TEXT,
+        'source_url': news['link']
+    }
+
+
+def is_fallback_parody(parody_data):
+    """API 실패·JSON 없음으로 채운 기본 패러디인지 확인 (build_default_parody / parse_parody_response 기본 구조)"""
+    return str(parody_data.get('parody_title', '')).startswith('API 오류')
+
+
+PARODY_FIELDS = tuple(PARODY_COLUMNS)  # 저장소 열 순서와 동일
+# 모델이 반드시 채워야 하는 창작 필드 (나머지는 입력값으로 보정 가능)
+PARODY_CREATIVE_FIELDS = ('parody_title', 'setup', 'punchline', 'humor_lesson')
+
+# 도구(JSON 스키마) 호출로 출력 구조를 강제
+PARODY_TOOL = {
+    "name": "submit_parody",
+    "description": "완성된 증권 뉴스 패러디 카드 한 장을 제출합니다.",
+    "input_schema": {
+        "type": "object",
+        "properties": {field: {"type": "string"} for field in PARODY_FIELDS},
+        "required": list(PARODY_FIELDS),
+    },
+}
+PARODY_TOOL_CHOICE = {"type": "tool", "name": PARODY_TOOL["name"]}
+
+# 1이면 텍스트 JSON 대신 도구 호출(스키마 강제)로 패러디를 받음
+PARODY_STRUCTURED = os.getenv('PARODY_STRUCTURED', '').strip().lower() in ('1', 'true', 'yes')
+
+
+def parody_request_options():
+    """패러디 요청에 추가할 선택 파라미터 (구조화 출력 모드에서만 tools/tool_choice)"""
+    if PARODY_STRUCTURED:
+        return {"tools": [PARODY_TOOL], "tool_choice": PARODY_TOOL_CHOICE}
+    return {}
+
+
+# 여러 뉴스를 한 요청으로 묶을 때 쓰는 도구 (story_id별 패러디 배열)
+PARODY_GROUP_TOOL = {
+    "name": "submit_parodies",
+    "description": "여러 뉴스의 증권 뉴스 패러디 카드를 story_id별로 한 번에 제출합니다.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "parodies": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "story_id": {"type": "integer"},
+                        **{field: {"type": "string"} for field in PARODY_FIELDS},
+                    },
+                    "required": ["story_id"] + list(PARODY_FIELDS),
+                },
+            },
+        },
+        "required": ["parodies"],
+    },
+}
+
+
+def parody_group_request_options():
+    """묶음 요청용 선택 파라미터 (구조화 출력 모드에서만 tools/tool_choice)"""
+    if PARODY_STRUCTURED:
+        return {"tools": [PARODY_GROUP_TOOL], "tool_choice": {"type": "tool", "name": PARODY_GROUP_TOOL["name"]}}
+    return {}
+
+
+class ParodyParseStats:
+    """패러디 응답 파싱 결과 집계 (바로 성공·로컬 복구·복구 실패·재요청, 스레드 안전)"""
+
+    def __init__(self):
+        self.responses = 0
+        self.structured = 0
+        self.direct = 0
+        self.repaired = 0
+        self.failed = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def add(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            if name in ('structured', 'direct', 'repaired', 'failed'):
+                self.responses += 1
+
+    def summary(self):
+        if not self.responses:
+            return "패러디 응답 파싱: 처리한 응답 없음"
+        rate = lambda n: f"{n / self.responses * 100:.0f}%"
+        return (
+            f"패러디 응답 파싱 ({self.responses}건): 구조화 출력 {self.structured}, 바로 성공 {self.direct}, "
+            f"로컬 복구 {self.repaired} ({rate(self.repaired)}), 복구 실패 {self.failed}, "
+            f"재요청 {self.retries} ({rate(self.retries)})"
+        )
+
+
+parody_parse_stats = ParodyParseStats()
+
+
+def _strip_trailing_comma(out):
+    """출력 버퍼 끝의 공백과 쉼표 제거 (}나 ] 앞의 trailing comma 복구)"""
+    while out and out[-1] in (' ', '\t', '\r', '\n'):
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+
+
+def repair_json_text(text):
+    """자주 나오는 JSON 오류를 로컬에서 고쳐 문자열로 반환
+
+    - 코드 블록 표시, 객체 앞뒤의 설명 문장
+    - 따옴표 대신 쓴 스마트 따옴표(“ ” „)
+    - 값 안의 이스케이프되지 않은 따옴표와 줄바꿈 등 제어 문자
+    - } / ] 앞의 trailing comma
+    - 중간에 잘린 객체 (열린 문자열·괄호 닫기, 값 없는 키 제거)
+    """
+    text = text.strip()
+    start = text.find('{')
+    if start == -1:
+        return text
+    text = text[start:]
+    text = text.replace('“', '"').replace('”', '"').replace('„', '"')
+
+    out = []
+    stack = []
+    in_string = False
+    escaped = False
+    for pos, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                out.append(ch)
+                escaped = False
+            elif ch == '\\':
+                out.append(ch)
+                escaped = True
+            elif ch == '"':
+                # 다음 의미 있는 문자가 구조 문자면 문자열 끝, 아니면 값 안의 따옴표
+                rest = text[pos + 1:].lstrip()
+                if not rest or rest[0] in ',:}]':
+                    out.append(ch)
+                    in_string = False
+                else:
+                    out.append('\\"')
+            elif ch == '\n':
+                out.append('\\n')
+            elif ch == '\r':
+                out.append('\\r')
+            elif ch == '\t':
+                out.append('\\t')
+            elif ord(ch) < 0x20:
+                out.append(f'\\u{ord(ch):04x}')
+            else:
+                out.append(ch)
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            out.append(ch)
+        elif ch in '}]':
+            _strip_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                break  # 최상위 객체가 끝나면 뒤의 설명 문장은 무시
+        else:
+            out.append(ch)
+
+    # 잘린 객체 마무리
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    repaired = ''.join(out).rstrip()
+    if stack:
+        repaired = re.sub(r':\s*$', ': ""', repaired)  # 키까지만 온 경우 빈 값
+        repaired = re.sub(r'([,{])\s*"(?:[^"\\]|\\.)*"\s*$', r'\1', repaired)  # 값 없는 키 제거
+        repaired = repaired.rstrip().rstrip(',')
+        repaired += ''.join(reversed(stack))
+    return repaired
+
+
+def _extract_json_text(response_text):
+    """응답 텍스트에서 JSON 객체 부분을 추출 (닫는 괄호가 없으면 잘린 객체를 그대로 반환, JSON이 없으면 None)"""
+    # JSON 파싱 개선
+    json_match = re.search(r'```json\n(\{.*?\})\n```', response_text, re.DOTALL)
+    if json_match:
+        return json_match.group(1)
+    start_index = response_text.find('{')
+    end_index = response_text.rfind('}')
+    if start_index != -1 and end_index != -1 and start_index < end_index:
+        return response_text[start_index:end_index+1]
+    if start_index != -1:
+        return response_text[start_index:]
+    return None
+
+
+def normalize_parody_fields(parody_data, news, current_date):
+    """고정 필드를 입력값으로 보정하고 창작 필드 누락 시 ValueError 발생"""
+    if not isinstance(parody_data, dict):
+        raise ValueError(f"패러디 응답이 JSON 객체가 아닙니다: {type(parody_data).__name__}")
+    # 날짜를 강제로 오늘 날짜로 설정 (수집 일자 통일)
+    parody_data['date'] = current_date
+    fixed_values = {
+        'original_title': news['title'].replace('"', "'"),
+        'disclaimer': DISCLAIMER_TEXT,
+        'source_url': news['link'],
+    }
+    for field, value in fixed_values.items():
+        if not str(parody_data.get(field) or '').strip():
+            parody_data[field] = value
+    missing = [field for field in PARODY_CREATIVE_FIELDS if not str(parody_data.get(field) or '').strip()]
+    if missing:
+        raise ValueError(f"필수 필드 누락: {', '.join(missing)}")
+    return parody_data
+
+
+def parse_parody_response(response_text, news, current_date):
+    """Claude 응답 텍스트에서 패러디 JSON을 추출해 dict로 반환 (로컬 복구까지 실패하면 예외 발생)"""
+    original_title_safe = news['title'].replace('"', "'")
+    news_link = news['link']
+
+    json_text = _extract_json_text(response_text)
+    if json_text is None:
+        # JSON이 없는 경우 기본 구조 생성 (날짜는 오늘 날짜로 강제 설정)
+        json_text = f'{{"date": "{current_date}", "original_title": "{original_title_safe}", "parody_title": "API 오류로 인한 기본 제목", "setup": "API 호출 중 오류가 발생했습니다.", "punchline": "다시 시도해주세요.", "humor_lesson": "API 서버가 과부하 상태일 수 있습니다.", "disclaimer": "{DISCLAIMER_TEXT}", "source_url": "{news_link}"}}'
+
+    try:
+        parody_data = json.loads(json_text)
+        stat = 'direct'
+    except json.JSONDecodeError as e:
+        try:
+            parody_data = json.loads(repair_json_text(json_text))
+            stat = 'repaired'
+            print(f"    - JSON 로컬 복구 성공 (원래 오류: {e})")
+        except json.JSONDecodeError:
+            parody_parse_stats.add('failed')
+            raise e
+    try:
+        parody_data = normalize_parody_fields(parody_data, news, current_date)
+    except ValueError:
+        parody_parse_stats.add('failed')
+        raise
+    parody_parse_stats.add(stat)
+    return parody_data
+
+
+def response_blocks_text(blocks):
+    """응답 content 블록의 원문 (도구 호출이면 입력 JSON, 아니면 첫 텍스트 블록)"""
+    for block in blocks:
+        if getattr(block, 'type', None) == 'tool_use':
+            return json.dumps(getattr(block, 'input', None) or {}, ensure_ascii=False)
+    response_block = blocks[0]
+    return getattr(response_block, 'text', None) or getattr(response_block, 'content', None) or str(response_block)
+
+
+def parody_from_blocks(blocks, news, current_date):
+    """응답 content 블록에서 패러디 dict를 만듦 (도구 호출 결과 우선, 없으면 텍스트 파싱)"""
+    for block in blocks:
+        if getattr(block, 'type', None) == 'tool_use':
+            try:
+                parody_data = normalize_parody_fields(dict(getattr(block, 'input', None) or {}), news, current_date)
+            except ValueError:
+                parody_parse_stats.add('failed')
+                raise
+            parody_parse_stats.add('structured')
+            return parody_data
+    return parse_parody_response(response_blocks_text(blocks), news, current_date)
+
+
+# --- 실행 저널 (중단된 실행을 --resume으로 이어서 진행) ---
+STEP1_JOURNAL_DIR = os.getenv('STEP1_JOURNAL_DIR', os.path.join('.cache', 'journal'))
+
+
+class RunJournal:
+    """step1 실행 저널 (JSON Lines, 추가 전용)
+
+    랭킹 결과와 성공한 패러디를 한 줄씩 기록하고 매번 fsync합니다.
+    마지막 줄이 쓰다 만 상태(개행 없음/JSON 깨짐)면 읽을 때 버리고 그 앞까지로 파일을 자릅니다.
+    같은 순번의 패러디가 여러 번 기록되면 마지막 기록을 사용합니다.
+    """
+
+    def __init__(self, run_date, directory=STEP1_JOURNAL_DIR):
+        self.path = os.path.join(directory, f'step1_{run_date}.jsonl')
+        self.ranking = None
+        self.parodies = {}  # top_news 내 순번 -> parody_data
+        self.done = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        good_length = 0
+        skipped = 0
+        for line in raw.split(b'\n')[:-1]:  # 마지막 조각은 개행이 없으므로 미완성 기록
+            good_length += len(line) + 1
+            try:
+                record = json.loads(line.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                skipped += 1
+                continue
+            kind = record.get('type')
+            if kind == 'ranking':
+                self.ranking = record['top_news']
+                self.parodies = {}
+            elif kind == 'parody':
+                self.parodies[int(record['index'])] = record['parody']
+            elif kind == 'done':
+                self.done = True
+        if good_length < len(raw):
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_length)
+            print(f"[저널] 미완성 마지막 기록 {len(raw) - good_length}바이트를 잘라냈습니다.")
+        if skipped:
+            print(f"[저널] 읽을 수 없는 기록 {skipped}줄을 건너뛰었습니다.")
+
+    def start(self, resume):
+        """resume이면 기존 저널을 읽어 이어서 기록하고, 아니면 새 저널을 시작"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if resume:
+            self._load()
+            if self.done:
+                print("[저널] 이전 실행이 이미 완료되어 새로 시작합니다.")
+                self.ranking, self.parodies, self.done = None, {}, False
+            elif self.ranking is not None:
+                print(f"[저널] 이어서 실행: 랭킹 {len(self.ranking)}건, 완료된 패러디 {len(self.parodies)}건 ({self.path})")
+                return
+            else:
+                print("[저널] 이어서 실행할 기록이 없어 새로 시작합니다.")
+        with open(self.path, 'w', encoding='utf-8'):
+            pass
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def record_ranking(self, top_news):
+        self.ranking = top_news
+        self._append({'type': 'ranking', 'top_news': top_news})
+
+    def record_parody(self, i, parody_data):
+        self.parodies[i] = parody_data
+        self._append({'type': 'parody', 'index': i, 'parody': parody_data})
+
+    def record_done(self):
+        self.done = True
+        self._append({'type': 'done'})
+
+
+run_journal = None  # main()에서 설정
+
+
+def journal_parody(i, parody_data):
+    """저널이 켜져 있으면 성공한 패러디를 기록 (기본 데이터는 기록하지 않아 재실행 시 다시 생성)"""
+    if run_journal is not None and not is_fallback_parody(parody_data):
+        try:
+            run_journal.record_parody(i, parody_data)
+        except OSError as e:
+            print(f"[저널] 기록 실패: {e}")
+
+
+def generate_parody(i, total, news, parody_prompt, existing_content, current_date):
+    """뉴스 한 건의 패러디를 생성 (JSON 오류 시 최대 3회 재시도, 최종 실패 시 기본 데이터)
+
+    반환값: (parody_data, 성공 여부)
+    """
+    print(f"  - [{i+1}/{total}] Claude 4.0 Sonnet 패러디 생성 중... (스타일: {STYLE_INSTRUCTIONS[i % 6][:15]}...)")
+    response_text = ""
+    error = None
+    for attempt in range(3):  # 재시도 횟수 증가
+        try:
+            retry_context = None
+            if attempt > 0:
+                retry_context = {"malformed_json": response_text, "error_message": str(error)}
+            
+            # API 호출 전 잠시 대기 (API 부하 분산)
+            if attempt > 0:
+                time.sleep(2)
+            
+            if attempt > 0:
+                parody_parse_stats.add('retries')
+            
+            parody_result_blocks = create_parody_with_claude(
+                parody_prompt, existing_content, retry_context, caller=f"parody-{i+1}"
+            )
+            response_text = response_blocks_text(parody_result_blocks)
+            parody_data = parody_from_blocks(parody_result_blocks, news, current_date)
+            journal_parody(i, parody_data)
+            print(f"    - [{i+1}/{total}] 성공!")
+            return parody_data, True
+        except Exception as e:
+            error = e
+            print(f"    ! [{i+1}/{total}] 패러디 생성 실패 (시도 {attempt + 1}/3): {e}")
+
+    print(f"    - [{i+1}/{total}] 최종 실패: {error}")
+    print(f"    - [{i+1}/{total}] 기본 패러디 데이터로 대체")
+    return build_default_parody(news, current_date), False
+
+
+def _normalize_for_dedup(text):
+    """중복 비교용 정규화 (공백·문장부호 제거, 소문자)"""
+    return re.sub(r'[\W_]+', '', str(text or '')).lower()
+
+
+def char_shingles(text, n=3):
+    """정규화한 텍스트의 문자 n-gram 집합 (한글은 형태소 분석 없이도 유사도 비교가 잘 됨)"""
+    normalized = _normalize_for_dedup(text)
+    if len(normalized) <= n:
+        return {normalized} if normalized else set()
+    return {normalized[k:k + n] for k in range(len(normalized) - n + 1)}
+
+
+def jaccard_similarity(a, b):
+    """두 shingle 집합의 Jaccard 유사도"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ParodySimilarityIndex:
+    """당일 생성된 패러디의 필드별 shingle을 보관하고, 새 패러디와 겹치는 항목을 찾는 로컬 인덱스"""
+
+    FIELDS = PARODY_CREATIVE_FIELDS
+
+    def __init__(self, threshold=None):
+        self.threshold = PARODY_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.items = []  # (parody_data, {field: shingles})
+
+    def _shingles(self, parody_data):
+        return {field: char_shingles(parody_data.get(field, '')) for field in self.FIELDS}
+
+    def find_conflict(self, parody_data):
+        """유사도가 임계값 이상인 기존 패러디를 (parody_data, 필드명, 유사도)로 반환, 없으면 None"""
+        shingles = self._shingles(parody_data)
+        best = None
+        for existing, existing_shingles in self.items:
+            for field in self.FIELDS:
+                score = jaccard_similarity(shingles[field], existing_shingles[field])
+                if score >= self.threshold and (best is None or score > best[2]):
+                    best = (existing, field, score)
+        return best
+
+    def add(self, parody_data):
+        self.items.append((parody_data, self._shingles(parody_data)))
+
+
+def find_duplicate_parodies(parody_data_list, succeeded):
+    """앞선 패러디와 유사한 항목을 {인덱스: 겹친 패러디}로 반환 (기본 데이터는 제외)"""
+    index = ParodySimilarityIndex()
+    duplicates = {}
+    for idx, parody_data in enumerate(parody_data_list):
+        if not succeeded[idx]:
+            continue
+        conflict = index.find_conflict(parody_data)
+        if conflict:
+            duplicates[idx] = conflict[0]
+            continue
+        index.add(parody_data)
+    return duplicates
+
+
+def generate_unique_parody(i, total, news, parody_prompt, index, current_date):
+    """패러디를 생성하고 인덱스에서 유사 항목이 발견되면 그 항목만 알려주고 다시 생성"""
+    conflicts = []
+    for dedup_round in range(PARODY_DEDUP_ROUNDS + 1):
+        parody_data, succeeded = generate_parody(i, total, news, parody_prompt, conflicts, current_date)
+        if not succeeded:
+            return parody_data, succeeded
+        conflict = index.find_conflict(parody_data)
+        if conflict is None:
+            break
+        existing, field, score = conflict
+        if dedup_round == PARODY_DEDUP_ROUNDS:
+            print(f"    - [{i+1}/{total}] 유사 패러디가 남아있지만 재생성 한도 초과로 그대로 사용 ({field}, 유사도 {score:.2f})")
+            break
+        print(f"    - [{i+1}/{total}] 기존 패러디와 유사 ({field}, 유사도 {score:.2f}), 재생성 {dedup_round + 1}/{PARODY_DEDUP_ROUNDS}")
+        conflicts = [existing]
+    index.add(parody_data)
+    return parody_data, True
+
+
+def _run_parody_jobs(targets, jobs, prompts, existing_by_target, parody_data_list, succeeded, total, current_date, concurrency):
+    """targets에 해당하는 jobs를 스레드 풀로 생성해 parody_data_list/succeeded의 같은 위치에 채움"""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(
+                generate_parody, jobs[k][0], total, jobs[k][1], prompts[k],
+                existing_by_target.get(k, []), current_date
+            ): k
+            for k in targets
+        }
+        for future in as_completed(futures):
+            k = futures[future]
+            parody_data_list[k], succeeded[k] = future.result()
+
+
+def resolve_duplicate_parodies(jobs, prompts, parody_data_list, succeeded, total, current_date, concurrency):
+    """한꺼번에 생성된 결과에서 유사 항목을 찾아, 충돌한 패러디 하나만 알려주고 다시 생성"""
+    for dedup_round in range(PARODY_DEDUP_ROUNDS):
+        duplicates = find_duplicate_parodies(parody_data_list, succeeded)
+        if not duplicates:
+            break
+        print(f"  - 유사 패러디 {len(duplicates)}건 재생성 (라운드 {dedup_round + 1}/{PARODY_DEDUP_ROUNDS})")
+        existing_by_target = {k: [conflict] for k, conflict in duplicates.items()}
+        _run_parody_jobs(list(duplicates), jobs, prompts, existing_by_target, parody_data_list, succeeded, total, current_date, concurrency)
+
+
+def generate_parodies_concurrently(jobs, total, current_date, concurrency):
+    """여러 뉴스의 패러디를 스레드 풀로 동시에 생성 (입력 순서 유지)
+
+    jobs는 (top_news 내 순번, news) 목록입니다. 동시 생성 중에는 서로의 결과를 볼 수 없으므로
+    생성이 끝난 뒤 유사도 검사를 하고, 겹치는 항목만 충돌한 패러디 하나를 알려주고 다시 생성합니다.
+    반환: (패러디 목록, 항목별 성공 여부 목록)
+    """
+    prompts = [build_parody_prompt(i, news, current_date) for i, news in jobs]
+    parody_data_list = [None] * len(jobs)
+    succeeded = [False] * len(jobs)
+
+    print(f"  - 동시 생성 모드: 최대 {concurrency}건 병렬 호출")
+    # 첫 건을 먼저 보내 공통 지침(PARODY_SYSTEM)의 프롬프트 캐시를 만든 뒤 나머지를 병렬로 보냄
+    _run_parody_jobs([0], jobs, prompts, {}, parody_data_list, succeeded, total, current_date, concurrency)
+    _run_parody_jobs(range(1, len(jobs)), jobs, prompts, {}, parody_data_list, succeeded, total, current_date, concurrency)
+    resolve_duplicate_parodies(jobs, prompts, parody_data_list, succeeded, total, current_date, concurrency)
+    return parody_data_list, succeeded
+
+
+def build_parody_group_prompt(group, current_date):
+    """여러 뉴스((순번, news) 목록)를 한 요청으로 묶은 패러디 요청을 생성
+
+    뉴스별 부분은 build_parody_prompt와 같고, story_id로 구분해 JSON 배열로 받습니다.
+    """
+    sections = [
+        f"=== story_id: {i} ===\n{build_parody_prompt(i, news, current_date).strip()}"
+        for i, news in group
+    ]
+    story_ids = ', '.join(str(i) for i, _ in group)
+    return (
+        f"이번 요청에서는 아래 {len(group)}개 뉴스를 한 번에 처리합니다.\n"
+        "각 뉴스마다 지정된 스타일로 서로 겹치지 않는 패러디를 하나씩 만드세요.\n\n"
+        + "\n\n".join(sections)
+        + "\n\n【묶음 출력 형식】\n"
+        "- 뉴스마다 위 JSON 구조 객체 하나에 \"story_id\"(정수) 필드를 추가하세요.\n"
+        f"- 전체를 하나의 JSON 배열로 ```json ... ``` 코드 블록 안에 출력하세요. (story_id: {story_ids})\n"
+    )
+
+
+def _extract_json_array_text(response_text):
+    """응답 텍스트에서 JSON 배열 부분을 추출 (없으면 None)"""
+    json_match = re.search(r'```json\n(\[.*?\])\n```', response_text, re.DOTALL)
+    if json_match:
+        return json_match.group(1)
+    start_index = response_text.find('[')
+    end_index = response_text.rfind(']')
+    if start_index != -1 and end_index != -1 and start_index < end_index:
+        return response_text[start_index:end_index+1]
+    return None
+
+
+def parse_parody_group_response(blocks, group, current_date):
+    """묶음 응답에서 story_id별 패러디를 꺼내 요소마다 따로 검증하고 {순번: parody_data}로 반환
+
+    누락되거나 검증에 실패한 요소는 결과에서 빠지므로 호출한 쪽에서 개별 재요청합니다.
+    """
+    news_by_id = dict(group)
+    items, stat = None, 'structured'
+    for block in blocks:
+        if getattr(block, 'type', None) == 'tool_use':
+            items = (getattr(block, 'input', None) or {}).get('parodies')
+            break
+    if items is None:
+        json_text = _extract_json_array_text(response_blocks_text(blocks))
+        if json_text is None:
+            raise ValueError("묶음 응답에서 JSON 배열을 찾지 못했습니다.")
+        try:
+            items, stat = json.loads(json_text), 'direct'
+        except json.JSONDecodeError:
+            items, stat = json.loads(repair_json_text(json_text)), 'repaired'
+    if not isinstance(items, list):
+        raise ValueError(f"묶음 응답이 JSON 배열이 아닙니다: {type(items).__name__}")
+
+    results = {}
+    for item in items:
+        try:
+            story_id = int(item.pop('story_id'))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            parody_parse_stats.add('failed')
+            continue
+        if story_id not in news_by_id or story_id in results:
+            continue
+        try:
+            results[story_id] = normalize_parody_fields(item, news_by_id[story_id], current_date)
+            parody_parse_stats.add(stat)
+        except ValueError as e:
+            parody_parse_stats.add('failed')
+            print(f"    ! story_id {story_id} 검증 실패: {e}")
+    return results
+
+
+def generate_parody_group(group, total, current_date):
+    """뉴스 여러 건을 한 요청으로 생성해 {순번: parody_data}로 반환 (실패하면 빈 dict)"""
+    first = group[0][0]
+    labels = ', '.join(str(i + 1) for i, _ in group)
+    print(f"  - [{labels}/{total}] Claude 4.0 Sonnet 묶음 패러디 생성 중... ({len(group)}건)")
+    try:
+        response = safe_api_call(
+            get_claude_client(),
+            build_parody_messages(build_parody_group_prompt(group, current_date), []),
+            max_retries=5, base_delay=3, system=PARODY_SYSTEM,
+            caller=f"group-{first + 1}", max_tokens=max_tokens_for('group', len(group)),
+            stop_when=stop_after_json_array,
+            **parody_group_request_options()
+        )
+        results = parse_parody_group_response(response.content, group, current_date)
+    except Exception as e:
+        print(f"    ! [{labels}/{total}] 묶음 생성 실패: {e}")
+        return {}
+    for i, parody_data in results.items():
+        journal_parody(i, parody_data)
+    print(f"    - [{labels}/{total}] 묶음 결과 {len(results)}/{len(group)}건 성공")
+    return results
+
+
+def generate_parodies_grouped(jobs, total, current_date, group_size=PARODY_GROUP_SIZE, concurrency=1):
+    """K건씩 묶어 패러디를 생성 (입력 순서 유지)
+
+    누락·검증 실패 항목은 기존 한 건 요청 경로로 다시 생성하고, 마지막에 유사도 검사를 합니다.
+    반환: (패러디 목록, 항목별 성공 여부 목록)
+    """
+    prompts = [build_parody_prompt(i, news, current_date) for i, news in jobs]
+    parody_data_list = [None] * len(jobs)
+    succeeded = [False] * len(jobs)
+    position = {i: k for k, (i, _) in enumerate(jobs)}
+    groups = [jobs[start:start + group_size] for start in range(0, len(jobs), group_size)]
+
+    print(f"  - 묶음 생성 모드: 요청당 {group_size}건, 총 {len(groups)}회 요청")
+
+    def collect(results):
+        for i, parody_data in results.items():
+            parody_data_list[position[i]] = parody_data
+            succeeded[position[i]] = True
+
+    # 첫 묶음으로 공통 지침의 프롬프트 캐시를 만든 뒤 나머지를 보냄
+    collect(generate_parody_group(groups[0], total, current_date))
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for future in as_completed([executor.submit(generate_parody_group, g, total, current_date) for g in groups[1:]]):
+            collect(future.result())
+
+    missing = [k for k in range(len(jobs)) if not succeeded[k]]
+    if missing:
+        print(f"  - 묶음에서 빠지거나 검증 실패한 {len(missing)}건을 개별 요청으로 다시 생성합니다.")
+        _run_parody_jobs(missing, jobs, prompts, {}, parody_data_list, succeeded, total, current_date, max(1, concurrency))
+    resolve_duplicate_parodies(jobs, prompts, parody_data_list, succeeded, total, current_date, max(1, concurrency))
+    return parody_data_list, succeeded
+
+
+def _batch_custom_id(k):
+    return f"parody-{k:03d}"
+
+
+def submit_parody_batch(client, prompts):
+    """패러디 프롬프트({jobs 인덱스: prompt})를 Message Batches 요청 하나로 제출하고 batch 객체를 반환"""
+    requests_payload = [
+        {
+            "custom_id": _batch_custom_id(k),
+            "params": {
+                "model": CLAUDE_MODEL,
+                "max_tokens": max_tokens_for('parody'),
+                "temperature": CLAUDE_TEMPERATURE,
+                "system": PARODY_SYSTEM,
+                "messages": build_parody_messages(prompt, []),
+                **parody_request_options(),
+            },
+        }
+        for k, prompt in prompts.items()
+    ]
+    return client.messages.batches.create(requests=requests_payload)
+
+
+def wait_for_parody_batch(client, batch_id, poll_interval=None, timeout=None):
+    """batch가 끝날 때까지 주기적으로 상태를 확인 (시간 초과 시 취소 요청 후 False)"""
+    poll_interval = PARODY_BATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+    timeout = PARODY_BATCH_TIMEOUT if timeout is None else timeout
+    started = time.time()
+    while True:
+        batch = client.messages.batches.retrieve(batch_id)
+        counts = getattr(batch, 'request_counts', None)
+        if counts is not None:
+            print(f"  - 배치 상태: {batch.processing_status} (처리중 {counts.processing}, 성공 {counts.succeeded}, 오류 {counts.errored})")
+        else:
+            print(f"  - 배치 상태: {batch.processing_status}")
+        if batch.processing_status == 'ended':
+            return True
+        if time.time() - started > timeout:
+            print(f"  ! 배치 대기 시간 초과 ({timeout:.0f}초). 배치를 취소합니다.")
+            try:
+                client.messages.batches.cancel(batch_id)
+            except Exception as e:
+                print(f"  ! 배치 취소 실패: {e}")
+            return False
+        time.sleep(poll_interval)
+
+
+def generate_parodies_with_batch(jobs, total, current_date, concurrency=1):
+    """Message Batches API로 패러디를 일괄 생성 (입력 순서 유지)
+
+    결과는 custom_id로 원래 뉴스에 매핑하고, 실패·미완료·파싱 실패 항목은 기존 동기 호출(safe_api_call) 경로로 다시 생성합니다.
+    반환: (패러디 목록, 항목별 성공 여부 목록)
+    """
+    client = get_claude_batch_client()
+    prompts = [build_parody_prompt(i, news, current_date) for i, news in jobs]
+    parody_data_list = [None] * len(jobs)
+    succeeded = [False] * len(jobs)
+    cache_keys = [
+        LLMResponseCache.make_key(
+            CLAUDE_MODEL, CLAUDE_TEMPERATURE, max_tokens_for('parody'), PARODY_SYSTEM,
+            build_parody_messages(prompt, []), **parody_request_options()
+        )
+        for prompt in prompts
+    ]
+
+    # 캐시에 있는 항목은 배치에 넣지 않음
+    pending = []
+    for k, (i, news) in enumerate(jobs):
+        cached = llm_cache.get(cache_keys[k])
+        if cached is not None:
+            try:
+                parody_data_list[k] = parody_from_blocks(cached.content, news, current_date)
+                succeeded[k] = True
+                journal_parody(i, parody_data_list[k])
+                print(f"    - [{i+1}/{total}] LLM 캐시 히트")
+                continue
+            except Exception:
+                pass
+        pending.append(k)
+    index_by_custom_id = {_batch_custom_id(k): k for k in pending}
+
+    if not pending:
+        print("  - 모든 항목이 LLM 캐시에 있어 배치를 제출하지 않습니다.")
+    else:
+        batch = None
+        try:
+            batch = submit_parody_batch(client, {k: prompts[k] for k in pending})
+            print(f"  - 배치 제출 완료: {batch.id} ({len(pending)}건)")
+            if wait_for_parody_batch(client, batch.id):
+                for result in client.messages.batches.results(batch.id):
+                    k = index_by_custom_id.get(result.custom_id)
+                    if k is None:
+                        continue
+                    i, news = jobs[k]
+                    if result.result.type != 'succeeded':
+                        print(f"    ! [{i+1}/{total}] 배치 항목 실패 ({result.result.type})")
+                        continue
+                    try:
+                        parody_data_list[k] = parody_from_blocks(result.result.message.content, news, current_date)
+                        succeeded[k] = True
+                        journal_parody(i, parody_data_list[k])
+                        llm_cache.put(cache_keys[k], result.result.message)
+                        prompt_cache_stats.record(result.result.message, f"{i+1}/{total}")
+                        llm_telemetry.record(f"parody-{i+1}", 'ok', None, result.result.message, batch=True)
+                        print(f"    - [{i+1}/{total}] 배치 결과 성공!")
+                    except Exception as e:
+                        print(f"    ! [{i+1}/{total}] 배치 결과 파싱 실패: {e}")
+        except Exception as e:
+            print(f"  ! 배치 처리 실패: {e}")
+            # 동기 호출로 다시 만들 항목이 배치에서도 계속 처리·과금되지 않도록 취소
+            if batch is not None:
                 try:
-                    retry_context = None
-                    if attempt > 0:
-                        retry_context = {"malformed_json": response_text, "error_message": str(error)}
-                    
-                    # API 호출 전 잠시 대기 (API 부하 분산)
-                    if attempt > 0:
-                        time.sleep(2)
-                    
-                    parody_result_blocks = create_parody_with_claude(
-                        news_content, parody_prompt, existing_content, retry_context
-                    )
-                    response_block = parody_result_blocks[0]
-                    response_text = getattr(response_block, 'text', None) or getattr(response_block, 'content', None) or str(response_block)
-                    
-                    # JSON 파싱 개선
-                    json_match = re.search(r'```json\n(\{.*?\})\n```', response_text, re.DOTALL)
-                    if not json_match:
-                        start_index = response_text.find('{')
-                        end_index = response_text.rfind('}')
-                        if start_index != -1 and end_index != -1 and start_index < end_index:
-                            json_text = response_text[start_index:end_index+1]
-                        else:
-                            # JSON이 없는 경우 기본 구조 생성 (날짜는 오늘 날짜로 강제 설정)
-                            json_text = f'{{"date": "{current_date}", "original_title": "{original_title_safe}", "parody_title": "API 오류로 인한 기본 제목", "setup": "API 호출 중 오류가 발생했습니다.", "punchline": "다시 시도해주세요.", "humor_lesson": "API 서버가 과부하 상태일 수 있습니다.", "disclaimer": "면책조항:패러디/특정기관,개인과 무관/투자조언아님/재미목적", "source_url": "{news_link}"}}'
-                    else:
-                        json_text = json_match.group(1)
-                    
-                    parody_data = json.loads(json_text)
-                    # 날짜를 강제로 오늘 날짜로 설정 (수집 일자 통일)
-                    parody_data['date'] = current_date
-                    parody_data_list.append(parody_data)
-                    existing_content.append(parody_data)  # 전체 콘텐츠 추가
-                    print("    - 성공!")
-                    break
-                except Exception as e:
-                    error = e
-                    print(f"    ! 패러디 생성 실패 (시도 {attempt + 1}/3): {e}")
-                    if attempt == 2:  # 마지막 시도
-                        print(f"    - 최종 실패: {e}")
-                        # 기본 패러디 데이터 생성 (날짜는 오늘 날짜로 강제 설정)
-                        default_parody = {
-                            'date': current_date,  # 수집 일자 (오늘)
-                            'original_title': original_title_safe,
-                            'parody_title': f"API 오류 - {news_title[:20]}...",
-                            'setup': "API 서버 과부하로 인한 기본 설정",
-                            'punchline': "서버가 복구되면 다시 시도해주세요",
-                            'humor_lesson': "투자보다 중요한 것은 인내심입니다",
-                            'disclaimer': "면책조항:패러디/특정기관,개인과 무관/투자조언아님/재미목적",
-                            'source_url': news_link
-                        }
-                        parody_data_list.append(default_parody)
-                        existing_content.append(default_parody)
-                        print("    - 기본 패러디 데이터로 대체")
+                    client.messages.batches.cancel(batch.id)
+                    print(f"  - 배치 취소 요청: {batch.id}")
+                except Exception as cancel_error:
+                    print(f"  ! 배치 취소 실패: {cancel_error}")
+
+    failed = [k for k in range(len(jobs)) if not succeeded[k]]
+    if failed:
+        print(f"  - 배치 미완료/실패 {len(failed)}건을 동기 호출로 다시 생성합니다.")
+        _run_parody_jobs(failed, jobs, prompts, {}, parody_data_list, succeeded, total, current_date, concurrency)
+
+    resolve_duplicate_parodies(jobs, prompts, parody_data_list, succeeded, total, current_date, concurrency)
+    return parody_data_list, succeeded
+
+def run_collection_stage(resume=False):
+    """1단계: 뉴스 수집 → 랭킹 → 패러디 생성 → 저장까지 실행하고 parody_data_list를 반환
+
+    실패하면 기존처럼 sys.exit(1)로 종료합니다 (in-process 실행기는 SystemExit를 실패로 처리).
+    """
+    try:
+        print("[1/5] 연합뉴스 증권 RSS에서 중요도 순으로 뉴스 선별 중...")
+        raw_config = parse_rawdata()
+        if not raw_config:
+            print("[오류] 설정 파일(asset/rawdata.txt)을 읽을 수 없습니다. 프로그램을 종료합니다.")
+            sys.exit(1)
+        
+        # 카드뉴스 개수 설정 가져오기
+        card_count_config = raw_config.get('카드뉴스개수', ['카드뉴스 개수 : 최대 20개.'])
+        card_count_str = card_count_config[0] if isinstance(card_count_config, list) else card_count_config
+        card_count = 20  # 기본값
+        
+        # "카드뉴스 개수 : 최대 X개." 형식에서 숫자 추출
+        import re
+        count_match = re.search(r'최대 (\d+)개', card_count_str)
+        if count_match:
+            card_count = int(count_match.group(1))
+            print(f"[설정] 카드뉴스 개수: {card_count}개")
+        else:
+            print(f"[설정] 카드뉴스 개수 파싱 실패, 기본값 {card_count}개 사용")
+        
+        rss_urls = raw_config.get('RSS_URL 지정', [])
+        if isinstance(rss_urls, str):
+            rss_urls = [rss_urls]
+        if not rss_urls:
+            print("[오류] asset/rawdata.txt 파일에서 'RSS_URL 지정'을 찾을 수 없습니다.")
+            sys.exit(1)
+        today_str = get_today_kst().strftime('%Y-%m-%d')
+        history = ParodyHistoryStore()
+        
+        # 실행 저널: --resume이면 중단된 실행의 랭킹과 완료된 패러디를 이어서 사용
+        global run_journal
+        run_journal = RunJournal(today_str)
+        run_journal.start(resume=resume)
+        
+        if run_journal.ranking is not None:
+            top_news = run_journal.ranking[:card_count]
+            print(f"\n[2/5] 저널에서 이전 실행의 뉴스 {len(top_news)}개 선정 결과를 불러왔습니다. (RSS 수집·랭킹 건너뜀)")
+        else:
+            try:
+                all_news = fetch_news(rss_urls, min_news=5, history=history)
+            except RuntimeError as e:
+                print(f"\n[오류] 연합뉴스 RSS 수집 실패: {e}")
+                sys.exit(1)
+            if not all_news:
+                print("\n[오류] 연합뉴스 RSS에서 뉴스를 가져오지 못했습니다. 프로그램을 종료합니다.")
+                sys.exit(1)
+            print(f"\n[2/5] Claude 4.0 Sonnet이 독자들이 가장 관심을 가질 만한 뉴스 {card_count}개를 직접 선정합니다...")
+            ranked_news = rank_news_by_importance_with_claude(all_news, card_count)
+            top_news = ranked_news[:card_count]
+            run_journal.record_ranking(top_news)
+        print(f"\n[2.5/5] 총 {len(top_news)}개 뉴스 선별 완료! 패러디 생성을 시작합니다.")
+        print(f"\n[3/5] Claude 4.0 Sonnet이 중요도 상위 {len(top_news)}개 뉴스로 패러디 생성 중...")
+        processed_titles = set()  # 처리된 제목 추적
+        jobs = []  # (top_news 내 순번, news)
+        
+        for i, news in enumerate(top_news):
+            # 중복 뉴스 제목 체크
+            if news['title'] in processed_titles:
+                print(f"  - [{i+1}/{len(top_news)}] 중복 뉴스 건너뜀: {news['title'][:30]}...")
+                continue
+                
+            processed_titles.add(news['title'])
+            jobs.append((i, news))
+        
+        # 저널에 이미 완료된 뉴스는 건너뛰고 나머지만 생성
+        results = {i: run_journal.parodies[i] for i, _ in jobs if i in run_journal.parodies}
+        pending_jobs = [(i, news) for i, news in jobs if i not in results]
+        if results:
+            print(f"  - 저널에서 완료된 패러디 {len(results)}개를 재사용하고 {len(pending_jobs)}개만 생성합니다.")
+        
+        # 저널에서 복원한 항목은 이미 성공한 패러디
+        succeeded_ids = set(results)
+        if not pending_jobs:
+            new_parodies, new_succeeded = [], []
+        elif PARODY_BATCH:
+            new_parodies, new_succeeded = generate_parodies_with_batch(pending_jobs, len(top_news), today_str, PARODY_CONCURRENCY)
+        elif PARODY_GROUP_SIZE > 1 and len(pending_jobs) > 1:
+            new_parodies, new_succeeded = generate_parodies_grouped(pending_jobs, len(top_news), today_str, PARODY_GROUP_SIZE, PARODY_CONCURRENCY)
+        elif PARODY_CONCURRENCY > 1 and len(pending_jobs) > 1:
+            new_parodies, new_succeeded = generate_parodies_concurrently(pending_jobs, len(top_news), today_str, PARODY_CONCURRENCY)
+        else:
+            new_parodies, new_succeeded = [], []
+            similarity_index = ParodySimilarityIndex()  # 당일 생성 콘텐츠 유사도 인덱스
+            for parody_data in results.values():
+                similarity_index.add(parody_data)
+            for i, news in pending_jobs:
+                parody_prompt = build_parody_prompt(i, news, today_str)
+                parody_data, succeeded = generate_unique_parody(i, len(top_news), news, parody_prompt, similarity_index, today_str)
+                new_parodies.append(parody_data)
+                new_succeeded.append(succeeded)
+        for (i, _), parody_data, succeeded in zip(pending_jobs, new_parodies, new_succeeded):
+            results[i] = parody_data
+            if succeeded:
+                succeeded_ids.add(i)
+        parody_data_list = [results[i] for i, _ in jobs if i in results]
         if not parody_data_list:
             print("\n[오류] 패러디 생성에 실패했습니다. 프로그램을 종료합니다.")
             sys.exit(1)
         print(f"\n[4/5] Claude 4.0 Sonnet이 총 {len(parody_data_list)}개 패러디 생성 완료!")
         
         # 구글 시트 저장 (필수 절차)
-        print(f"\n[5/5] Claude 4.0 Sonnet이 생성한 패러디 데이터를 구글 시트에 저장 중...")
-        
-        # 저장 전 확인
-        print("🔍 구글 시트 연결 상태 확인 중...")
-        try:
-            test_sheet = get_gsheet(SHEET_ID, WORKSHEET_NAME)
-            print(f"✅ 구글 시트 연결 성공: {test_sheet.title} (탭: {WORKSHEET_NAME})")
-        except Exception as e:
-            print(f"❌ 구글 시트 연결 실패: {e}")
-            print("💡 service_account.json 파일과 GSHEET_ID를 확인해주세요.")
-            sys.exit(1)
+        storage = get_parody_storage()
+        print(f"\n[5/5] Claude 4.0 Sonnet이 생성한 패러디 데이터를 저장 중... (저장소: {storage.name})")
         
         # 실제 저장 실행
-        gsheet_success = save_to_gsheet(parody_data_list)
+        storage_success = save_parody_rows(storage, parody_data_list)
         
-        if not gsheet_success:
-            print("❌ 구글 시트 저장 실패로 프로그램을 중단합니다.")
-            print("💡 다음 사항을 확인해주세요:")
-            print("   1. service_account.json 파일이 프로젝트 루트에 있는지")
-            print("   2. GSHEET_ID가 올바른지")
-            print("   3. 구글 시트에 서비스 계정이 편집 권한을 가지고 있는지")
-            print("   4. 인터넷 연결 상태를 확인해주세요")
+        if not storage_success:
+            print(f"❌ {storage.name} 저장소 저장 실패로 프로그램을 중단합니다.")
+            if storage.name == 'gsheet':
+                print("💡 다음 사항을 확인해주세요:")
+                print("   1. service_account.json 파일이 프로젝트 루트에 있는지")
+                print("   2. GSHEET_ID가 올바른지")
+                print("   3. 구글 시트에 서비스 계정이 편집 권한을 가지고 있는지")
+                print("   4. 인터넷 연결 상태를 확인해주세요")
             sys.exit(1)
         
-        # 저장 후 최종 확인
-        print("🔍 구글 시트 저장 결과 최종 확인 중...")
-        try:
-            final_sheet = get_gsheet(SHEET_ID, WORKSHEET_NAME)
-            final_rows = final_sheet.get_all_values()
-            if len(final_rows) >= len(parody_data_list) + 1:
-                print(f"✅ 최종 확인 완료: {len(final_rows)-1}개 패러디 데이터가 구글 시트에 저장되었습니다.")
-                print(f"📊 구글 시트 URL: https://docs.google.com/spreadsheets/d/{SHEET_ID}/edit?gid=461862373#gid=461862373")
-            else:
-                print(f"⚠️ 최종 확인 실패: 예상 {len(parody_data_list)}개, 실제 {len(final_rows)-1}개")
-        except Exception as e:
-            print(f"⚠️ 최종 확인 중 오류: {e}")
+        if storage.name == 'gsheet':
+            print(f"📊 구글 시트 URL: https://docs.google.com/spreadsheets/d/{SHEET_ID}/edit?gid=461862373#gid=461862373")
+        
+        run_journal.record_done()
         
-        # CSV 파일 저장 (로컬만, Google Drive 업로드 안함)
-        csv_path = save_to_csv(parody_data_list)
+        # 다음 실행에서 같은 기사를 다시 고르지 않도록 이력 기록 (생성기가 성공으로 표시한 패러디만)
+        succeeded_parodies = [results[i] for i, _ in jobs if i in succeeded_ids]
+        history.record(succeeded_parodies)
+        history.compact()
+        history.close()
+        
+        # CSV 파일 저장 (로컬만, Google Drive 업로드 안함). CSV 저장소면 이미 저장됨
+        csv_path = storage.last_path if storage.name == 'csv' else save_to_csv(parody_data_list)
         if csv_path:
             print(f"📄 Claude 4.0 Sonnet이 생성한 패러디 CSV 파일이 생성되었습니다: {csv_path}")
             print(f"📁 파일 경로: {os.path.abspath(csv_path)}")
@@ -759,11 +2930,26 @@ Punchline: "나: (속마음) '이제 월급보다 주식이 더 중요해...'"
                 print(f"Lesson: {data.get('humor_lesson', 'N/A')}")
                 print(f"원본: {data.get('original_title', 'N/A')}")
         
+        print(llm_cache.summary())
+        print(prompt_cache_stats.summary())
+        print(parody_parse_stats.summary())
+        print(input_token_stats.summary())
+        print(request_hedger.summary())
+        print(llm_telemetry.summary())
+        print(f"[레이트 리미터] 한도 RPM {claude_rate_limiter.requests.capacity:.0f}, ITPM {claude_rate_limiter.input_tokens.capacity:.0f}, 대기 합계 {claude_rate_limiter.waited:.1f}s")
+        gsheet_timings = get_gsheet_timings()
+        print(f"[구글 시트] 인증 {gsheet_timings['auth_count']}회 {gsheet_timings['auth_seconds']:.2f}s, "
+              f"열기 {gsheet_timings['open_count']}회 {gsheet_timings['open_seconds']:.2f}s, "
+              f"캐시 재사용 {gsheet_timings['cache_hits']}회")
         print("프로그램을 종료합니다.")
+        return parody_data_list
     except Exception as e:
         print(f"\n[치명적 오류] 프로그램 실행 중 예상치 못한 오류가 발생했습니다: {e}")
         print("프로그램을 종료합니다.")
         sys.exit(1)
 
+def main():
+    run_collection_stage(resume='--resume' in sys.argv[1:])
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,15 +1,14 @@
 import os
 import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image, ImageDraw, ImageFont
-import pandas as pd
-from common_utils import get_gsheet, get_today_kst
+from common_utils import get_parody_storage, get_today_kst
 from datetime import datetime
 import sys
 from dotenv import load_dotenv
 load_dotenv()
 
-print("1. 초기화 시작...")
-
 # --- 카드 디자인 상수 ---
 CARD_WIDTH = 1080
 CARD_HEIGHT = 1920
@@ -35,8 +34,6 @@ GREEN_COLOR = (0, 60, 200, 255) # 짙은 파란색(RGBA)
 BLACK_COLOR = (34, 34, 34)
 GRAY_COLOR = (120, 120, 120)
 
-print("2. 폰트 로드 시작...")
-
 # 폰트 경로 설정
 KOR_FONT_PATH = os.path.join("asset", "Pretendard-Regular.otf")
 KOR_FONT_BOLD_PATH = os.path.join("asset", "Pretendard-Bold.otf")
@@ -54,40 +51,52 @@ def load_font(path, size):
         print(f"[실패] 폰트 로드 ({path}): {str(e)}")
         return ImageFont.load_default()
 
-# 폰트 로드
-try:
-    date_font = load_font(KOR_FONT_PATH, DATE_FONT_SIZE)
-    parody_title_font = load_font(KOR_FONT_BOLD_PATH, PARODY_TITLE_FONT_SIZE)
-    setup_font = load_font(KOR_FONT_PATH, SETUP_FONT_SIZE)
-    punchline_font = load_font(KOR_FONT_PATH, PUNCHLINE_FONT_SIZE)
-    lesson_label_font = load_font(KOR_FONT_PATH, LESSON_LABEL_FONT_SIZE)
-    lesson_font = load_font(KOR_FONT_BOLD_PATH, LESSON_FONT_SIZE)
-    disclaimer_font = load_font(KOR_FONT_PATH, DISCLAIMER_FONT_SIZE)
-    source_font = load_font(KOR_FONT_PATH, SOURCE_FONT_SIZE)
-except Exception as e:
-    print(f"[치명적 오류] 폰트 로드 중 예외 발생: {e}")
-    sys.exit(1)
-
-# asset 리소스 체크
-asset_files = [KOR_FONT_PATH, KOR_FONT_BOLD_PATH, os.path.join("asset", "card_1080x1920.png"), os.path.join("asset", "bgm.mp3"), os.path.join("asset", "intro_OU_stock.jpg")]
-for af in asset_files:
-    if not os.path.exists(af):
-        print(f"[경고] 리소스 파일 누락: {af}")
-
-print("3. 구글 시트 연결 시작...")
-
-# 구글 시트에서 데이터 가져오기
-try:
-    sheet = get_gsheet(os.getenv('GSHEET_ID'), 'today_stock_parody')
-    data = sheet.get_all_records()
-    df = pd.DataFrame(data)
-    print(f"불러온 데이터 수: {len(df)}")
-except Exception as e:
-    print(f"구글 시트 데이터 로드 실패: {e}")
-    df = pd.DataFrame()
+_fonts = None
+
+def load_fonts():
+    """카드에 쓰는 폰트를 한 번만 로드해 용도별 dict로 반환"""
+    global _fonts
+    if _fonts is None:
+        _fonts = {
+            'date': load_font(KOR_FONT_PATH, DATE_FONT_SIZE),
+            'parody_title': load_font(KOR_FONT_BOLD_PATH, PARODY_TITLE_FONT_SIZE),
+            'setup': load_font(KOR_FONT_PATH, SETUP_FONT_SIZE),
+            'punchline': load_font(KOR_FONT_PATH, PUNCHLINE_FONT_SIZE),
+            'lesson_label': load_font(KOR_FONT_PATH, LESSON_LABEL_FONT_SIZE),
+            'lesson': load_font(KOR_FONT_BOLD_PATH, LESSON_FONT_SIZE),
+            'disclaimer': load_font(KOR_FONT_PATH, DISCLAIMER_FONT_SIZE),
+            'source': load_font(KOR_FONT_PATH, SOURCE_FONT_SIZE),
+        }
+    return _fonts
+
+def check_assets():
+    """asset 리소스 체크 (누락 시 경고만 출력)"""
+    asset_files = [KOR_FONT_PATH, KOR_FONT_BOLD_PATH, os.path.join("asset", "card_1080x1920.png"), os.path.join("asset", "bgm.mp3"), os.path.join("asset", "intro_OU_stock.jpg")]
+    for af in asset_files:
+        if not os.path.exists(af):
+            print(f"[경고] 리소스 파일 누락: {af}")
+
+def load_parody_rows():
+    """PARODY_STORAGE 설정(gsheet/csv/sqlite)에 맞는 저장소에서 패러디 행을 가져옴 (실패 시 빈 목록)"""
+    storage = get_parody_storage()
+    print(f"3. 패러디 데이터 불러오기 시작... (저장소: {storage.name})")
+    try:
+        rows = list(storage.load())
+        print(f"불러온 데이터 수: {len(rows)}")
+        return rows
+    except Exception as e:
+        print(f"패러디 데이터 로드 실패 ({storage.name}): {e}")
+        return []
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# 카드 렌더링 프로세스 수: auto(기본, 사용 가능한 코어 수) / 1(직렬) / N
+CARD_RENDER_WORKERS = os.getenv('CARD_RENDER_WORKERS', 'auto').strip().lower()
+
+def has_value(row, key):
+    """행(dict)에 key 값이 있는지 확인 (None이면 없음으로 처리)"""
+    return row.get(key) is not None
+
 def draw_text(draw, position, text, font, fill, max_width, line_spacing_ratio=1.5, align='left', spacing=0):
     """주어진 위치에 텍스트를 그리는 함수 (줄바꿈 및 정렬 지원)"""
     x, y = position
@@ -123,152 +132,261 @@ def draw_text(draw, position, text, font, fill, max_width, line_spacing_ratio=1.
         
     return y
 
-print("4. 출력 폴더 생성...")
+_card_template = None
+
+def load_card_template():
+    """카드 배경 템플릿을 한 번만 열어 둠 (카드마다 copy()해서 사용)"""
+    global _card_template
+    if _card_template is None:
+        card_path = os.path.join(BASE_DIR, "asset", "card_1080x1920.png")
+        _card_template = Image.open(card_path).convert("RGBA")
+        _card_template.load()
+    return _card_template
+
+def draw_card(row, index, total):
+    """패러디 행 하나를 카드 이미지(RGBA)로 그려 반환 (저장하지 않음)"""
+    fonts = load_fonts()
+    date_font, parody_title_font = fonts['date'], fonts['parody_title']
+    setup_font, punchline_font = fonts['setup'], fonts['punchline']
+    lesson_label_font, lesson_font = fonts['lesson_label'], fonts['lesson']
+    disclaimer_font, source_font = fonts['disclaimer'], fonts['source']
+
+    card = load_card_template().copy()
+    
+    draw = ImageDraw.Draw(card)
+    max_text_width = CARD_WIDTH - LEFT_MARGIN - RIGHT_MARGIN
 
-# 출력 폴더 생성 및 정리
-os.makedirs('parody_card', exist_ok=True)
-for f in glob.glob('parody_card/*.png'):
-    os.remove(f)
+    # --- 상단부터 순서대로 그리는 텍스트 ---
+    y = TOP_MARGIN
 
-print("5. 카드 생성 시작...")
+    # [오늘의 유머] 및 페이지 번호 추가
+    total_pages = total
+    page_info_text = f"[오늘의 유머 {index+1}/{total_pages}]"
+    draw.text((LEFT_MARGIN, y), page_info_text, font=date_font, fill=GRAY_COLOR, spacing=-3)
+    y += DATE_FONT_SIZE + 20
 
-if df.empty:
-    print("[경고] 구글 시트에서 불러온 데이터가 없습니다. 카드 생성 작업을 건너뜁니다.")
-else:
-    # 각 패러디 데이터에 대해 카드 생성
-    for idx_int, (idx, row) in enumerate(df.iterrows()):
+    if has_value(row, 'date'):
+        date_str = str(row['date'])
         try:
-            print(f"\n[{idx_int+1}/{len(df)}] 카드 생성 중...")
-            
-            card_path = os.path.join(BASE_DIR, "asset", "card_1080x1920.png")
-            try:
-                card = Image.open(card_path).convert("RGBA")
-            except Exception as e:
-                print(f"  - 템플릿 로드 실패: {str(e)}")
-                continue
-                
-            draw = ImageDraw.Draw(card)
-            max_text_width = CARD_WIDTH - LEFT_MARGIN - RIGHT_MARGIN
-
-            # --- 상단부터 순서대로 그리는 텍스트 ---
-            y = TOP_MARGIN
-
-            # [오늘의 유머] 및 페이지 번호 추가
-            total_pages = len(df)
-            page_info_text = f"[오늘의 유머 {idx_int+1}/{total_pages}]"
-            draw.text((LEFT_MARGIN, y), page_info_text, font=date_font, fill=GRAY_COLOR, spacing=-3)
-            y += DATE_FONT_SIZE + 20
-
-            if 'date' in row and bool(pd.notna(row['date'])):
-                date_str = str(row['date'])
-                try:
-                    # 날짜 문자열을 datetime 객체로 변환
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                    # 영어 요일 약어 (e.g., Fri)
-                    day_of_week = date_obj.strftime('%a')
-                    # 최종 날짜 문자열 형식 지정 (예: 2025-06-20.Fri.)
-                    formatted_date = f"{date_str}.{day_of_week}."
-                except ValueError:
-                    # 날짜 형식이 잘못된 경우를 대비한 예외 처리
-                    formatted_date = date_str
-
-                draw.text((LEFT_MARGIN, y), formatted_date, font=date_font, fill=GRAY_COLOR, spacing=-3)
-                y += DATE_FONT_SIZE + SECTION_GAP
-
-            # setup 위에 original_title 추가
-            if 'original_title' in row and bool(pd.notna(row['original_title'])):
-                y = draw_text(draw, (LEFT_MARGIN, y), str(row['original_title']), 
-                                        setup_font, BLACK_COLOR, 
-                                        max_text_width, line_spacing_ratio=LINE_SPACING_RATIO, spacing=-3)
-                y += int(SECTION_GAP * 0.7)
-            if 'setup' in row and bool(pd.notna(row['setup'])):
-                y = draw_text(draw, (LEFT_MARGIN, y), str(row['setup']), 
-                                        setup_font, BLACK_COLOR, 
-                                        max_text_width, line_spacing_ratio=LINE_SPACING_RATIO, spacing=-3)
-                y += SECTION_GAP
-                
-            if 'punchline' in row and bool(pd.notna(row['punchline'])):
-                y = draw_text(draw, (LEFT_MARGIN, y), str(row['punchline']), 
-                                        punchline_font, BLACK_COLOR, 
-                                        max_text_width, line_spacing_ratio=LINE_SPACING_RATIO, spacing=-3)
-                # 펀치라인 아래 2줄 간격 추가
-                y += int(PUNCHLINE_FONT_SIZE * 2)
-                # parody_title 블록 ([오유_제목] + parody_title)
-                if 'parody_title' in row and bool(pd.notna(row['parody_title'])):
-                    # [오유_제목] 라벨 ([오유_교훈]과 동일한 폰트/색상/크기)
-                    oyutitle_label = "[오유_제목]"
-                    y = draw_text(draw, (LEFT_MARGIN, y), oyutitle_label, lesson_label_font, GREEN_COLOR, max_text_width, line_spacing_ratio=1.5, align='left', spacing=-4)
-                    # parody_title (기존 폰트/색상/크기)
-                    y = draw_text(draw, (LEFT_MARGIN, y), str(row['parody_title']), parody_title_font, GREEN_COLOR, max_text_width, line_spacing_ratio=LINE_SPACING_RATIO, spacing=-3)
-                    y += SECTION_GAP * 1.5
-
-            # 오유-교훈(유머레슨) 블록을 펀치라인 바로 아래에 출력
-            if 'humor_lesson' in row and bool(pd.notna(row['humor_lesson'])):
-                lesson_label_text = "[오유_교훈]"
-                lesson_content_text = str(row['humor_lesson'])
-                # 라벨
-                y = draw_text(draw, (LEFT_MARGIN, y), lesson_label_text, lesson_label_font, GREEN_COLOR, max_text_width, line_spacing_ratio=1.5, align='left', spacing=-4)
-                # 내용
-                y = draw_text(draw, (LEFT_MARGIN, y), lesson_content_text, lesson_font, GREEN_COLOR, max_text_width, line_spacing_ratio=1.5, align='left', spacing=-4)
-
-            # --- 하단부터 역순으로 그리는 텍스트 ---
-            bottom_y = CARD_HEIGHT - BOTTOM_MARGIN
-
-            # 출처
-            if 'original_title' in row and bool(pd.notna(row['original_title'])):
-                title_part = str(row['original_title'])
-                url_part = ""
-                if 'source_url' in row and bool(pd.notna(row['source_url'])):
-                    url_part = f",{str(row['source_url'])}"
-
-                source_text = f"출처: {title_part}{url_part}"
-
-                # 텍스트가 너무 길면 줄여서 표시
-                if len(source_text) > 80:
-                    source_text = source_text[:80] + "..."
-
-                source_y_start = bottom_y - SOURCE_FONT_SIZE
-                draw.text((LEFT_MARGIN, source_y_start), source_text, font=source_font, fill=GRAY_COLOR, spacing=-3)
-                bottom_y = source_y_start - 20
-
-            # 면책조항
-            if 'disclaimer' in row and bool(pd.notna(row['disclaimer'])):
-                disclaimer_text = str(row['disclaimer'])
-                # "면책조항:" 접두어가 없는 경우를 대비해 추가
-                if not disclaimer_text.startswith("면책조항:"):
-                    disclaimer_text = f"면책조항:{disclaimer_text}"
-
-                # 높이를 추정하여 아래에서부터 그리기
-                words = disclaimer_text.split()
-                lines_for_height_calc = []
-                if words:
-                    current_line = words[0]
-                    for word in words[1:]:
-                        if disclaimer_font.getlength(current_line + ' ' + word) <= max_text_width:
-                            current_line += ' ' + word
-                        else:
-                            lines_for_height_calc.append(current_line)
-                            current_line = word
+            # 날짜 문자열을 datetime 객체로 변환
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+            # 영어 요일 약어 (e.g., Fri)
+            day_of_week = date_obj.strftime('%a')
+            # 최종 날짜 문자열 형식 지정 (예: 2025-06-20.Fri.)
+            formatted_date = f"{date_str}.{day_of_week}."
+        except ValueError:
+            # 날짜 형식이 잘못된 경우를 대비한 예외 처리
+            formatted_date = date_str
+
+        draw.text((LEFT_MARGIN, y), formatted_date, font=date_font, fill=GRAY_COLOR, spacing=-3)
+        y += DATE_FONT_SIZE + SECTION_GAP
+
+    # setup 위에 original_title 추가
+    if has_value(row, 'original_title'):
+        y = draw_text(draw, (LEFT_MARGIN, y), str(row['original_title']), 
+                                setup_font, BLACK_COLOR, 
+                                max_text_width, line_spacing_ratio=LINE_SPACING_RATIO, spacing=-3)
+        y += int(SECTION_GAP * 0.7)
+    if has_value(row, 'setup'):
+        y = draw_text(draw, (LEFT_MARGIN, y), str(row['setup']), 
+                                setup_font, BLACK_COLOR, 
+                                max_text_width, line_spacing_ratio=LINE_SPACING_RATIO, spacing=-3)
+        y += SECTION_GAP
+    
+    if has_value(row, 'punchline'):
+        y = draw_text(draw, (LEFT_MARGIN, y), str(row['punchline']), 
+                                punchline_font, BLACK_COLOR, 
+                                max_text_width, line_spacing_ratio=LINE_SPACING_RATIO, spacing=-3)
+        # 펀치라인 아래 2줄 간격 추가
+        y += int(PUNCHLINE_FONT_SIZE * 2)
+        # parody_title 블록 ([오유_제목] + parody_title)
+        if has_value(row, 'parody_title'):
+            # [오유_제목] 라벨 ([오유_교훈]과 동일한 폰트/색상/크기)
+            oyutitle_label = "[오유_제목]"
+            y = draw_text(draw, (LEFT_MARGIN, y), oyutitle_label, lesson_label_font, GREEN_COLOR, max_text_width, line_spacing_ratio=1.5, align='left', spacing=-4)
+            # parody_title (기존 폰트/색상/크기)
+            y = draw_text(draw, (LEFT_MARGIN, y), str(row['parody_title']), parody_title_font, GREEN_COLOR, max_text_width, line_spacing_ratio=LINE_SPACING_RATIO, spacing=-3)
+            y += SECTION_GAP * 1.5
+
+    # 오유-교훈(유머레슨) 블록을 펀치라인 바로 아래에 출력
+    if has_value(row, 'humor_lesson'):
+        lesson_label_text = "[오유_교훈]"
+        lesson_content_text = str(row['humor_lesson'])
+        # 라벨
+        y = draw_text(draw, (LEFT_MARGIN, y), lesson_label_text, lesson_label_font, GREEN_COLOR, max_text_width, line_spacing_ratio=1.5, align='left', spacing=-4)
+        # 내용
+        y = draw_text(draw, (LEFT_MARGIN, y), lesson_content_text, lesson_font, GREEN_COLOR, max_text_width, line_spacing_ratio=1.5, align='left', spacing=-4)
+
+    # --- 하단부터 역순으로 그리는 텍스트 ---
+    bottom_y = CARD_HEIGHT - BOTTOM_MARGIN
+
+    # 출처
+    if has_value(row, 'original_title'):
+        title_part = str(row['original_title'])
+        url_part = ""
+        if has_value(row, 'source_url'):
+            url_part = f",{str(row['source_url'])}"
+
+        source_text = f"출처: {title_part}{url_part}"
+
+        # 텍스트가 너무 길면 줄여서 표시
+        if len(source_text) > 80:
+            source_text = source_text[:80] + "..."
+
+        source_y_start = bottom_y - SOURCE_FONT_SIZE
+        draw.text((LEFT_MARGIN, source_y_start), source_text, font=source_font, fill=GRAY_COLOR, spacing=-3)
+        bottom_y = source_y_start - 20
+
+    # 면책조항
+    if has_value(row, 'disclaimer'):
+        disclaimer_text = str(row['disclaimer'])
+        # "면책조항:" 접두어가 없는 경우를 대비해 추가
+        if not disclaimer_text.startswith("면책조항:"):
+            disclaimer_text = f"면책조항:{disclaimer_text}"
+
+        # 높이를 추정하여 아래에서부터 그리기
+        words = disclaimer_text.split()
+        lines_for_height_calc = []
+        if words:
+            current_line = words[0]
+            for word in words[1:]:
+                if disclaimer_font.getlength(current_line + ' ' + word) <= max_text_width:
+                    current_line += ' ' + word
+                else:
                     lines_for_height_calc.append(current_line)
-                
-                estimated_height = len(lines_for_height_calc) * int(DISCLAIMER_FONT_SIZE * 1.3)
-                disclaimer_y_start = bottom_y - estimated_height
-                
-                draw_text(draw, (LEFT_MARGIN, disclaimer_y_start), disclaimer_text, 
-                                disclaimer_font, GRAY_COLOR, max_text_width, spacing=-4)
-                bottom_y = disclaimer_y_start - 10
-
-            # 카드 저장
-            out_path = os.path.join('parody_card', f'parody_card_{idx_int+1:02d}.png')
+                    current_line = word
+            lines_for_height_calc.append(current_line)
+    
+        estimated_height = len(lines_for_height_calc) * int(DISCLAIMER_FONT_SIZE * 1.3)
+        disclaimer_y_start = bottom_y - estimated_height
+    
+        draw_text(draw, (LEFT_MARGIN, disclaimer_y_start), disclaimer_text, 
+                        disclaimer_font, GRAY_COLOR, max_text_width, spacing=-4)
+        bottom_y = disclaimer_y_start - 10
+
+    # 카드 저장
+    return card
+
+def card_path(out_dir, index):
+    """index(0부터)번째 카드 파일 경로 (parody_card_01.png부터, 순서·이름은 입력 순서로 고정)"""
+    return os.path.join(out_dir, f'parody_card_{index+1:02d}.png')
+
+def render_card(row, index, total, out_dir='parody_card', timings=None):
+    """패러디 행 하나를 카드로 그려 card_path(out_dir, index)에 저장하고 경로를 반환
+
+    timings(dict)를 넘기면 'draw'(그리기)와 'save'(PNG 저장) 소요 시간(초)을 채웁니다.
+    """
+    start = time.perf_counter()
+    card = draw_card(row, index, total)
+    drawn = time.perf_counter()
+    out_path = card_path(out_dir, index)
+    card.save(out_path)
+    if timings is not None:
+        timings['draw'] = drawn - start
+        timings['save'] = time.perf_counter() - drawn
+    return out_path
+
+def _render_card_timed(row, index, total, out_dir):
+    """카드 하나를 렌더링하고 (경로, 그리기 초, PNG 저장 초, 오류)를 반환 (프로세스 풀 작업 단위)"""
+    timings = {}
+    try:
+        out_path = render_card(row, index, total, out_dir, timings)
+        return out_path, timings['draw'], timings['save'], None
+    except Exception as e:
+        return None, 0.0, 0.0, str(e)
+
+def _init_render_worker():
+    """워커 프로세스마다 폰트와 템플릿을 한 번만 로드"""
+    load_fonts()
+    load_card_template()
+
+def card_render_workers(card_count):
+    """CARD_RENDER_WORKERS 설정과 사용 가능한 코어 수로 렌더링 프로세스 수 결정"""
+    if CARD_RENDER_WORKERS in ('', 'auto', '0'):
+        try:
+            workers = len(os.sched_getaffinity(0))
+        except AttributeError:  # Windows/macOS
+            workers = os.cpu_count() or 1
+    else:
+        try:
+            workers = int(CARD_RENDER_WORKERS)
+        except ValueError:
+            workers = 1
+    return max(1, min(workers, card_count))
+
+def render_cards(rows, out_dir='parody_card'):
+    """패러디 행 목록으로 카드 이미지를 만들어 out_dir에 저장하고 저장된 경로 목록을 반환"""
+    card_paths = []
+
+    print("4. 출력 폴더 생성...")
+
+    # 출력 폴더 생성 및 정리
+    os.makedirs(out_dir, exist_ok=True)
+    for f in glob.glob(os.path.join(out_dir, '*.png')):
+        os.remove(f)
+
+    print("5. 카드 생성 시작...")
+
+    if not rows:
+        print("[경고] 구글 시트에서 불러온 데이터가 없습니다. 카드 생성 작업을 건너뜁니다.")
+    else:
+        total = len(rows)
+        workers = card_render_workers(total)
+        start = time.perf_counter()
+        results = None
+        if workers > 1:
+            print(f"   - 병렬 렌더링: 프로세스 {workers}개")
             try:
-                card.save(out_path)
-                print(f"  - 카드 저장 완료: {out_path}")
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as executor:
+                    # map은 입력 순서대로 결과를 돌려주므로 출력 순서·파일명이 직렬과 같음
+                    results = list(executor.map(
+                        _render_card_timed, rows, range(total), [total] * total, [out_dir] * total
+                    ))
             except Exception as e:
-                print(f"  - 카드 저장 실패: {str(e)}")
-        except Exception as e:
-            print(f"[오류] 카드 생성 실패 (index={idx_int}, title={row.get('original_title', '')}): {e}")
-
-if not df.empty:
-    print(f"\n6. 모든 작업 완료! 생성된 카드: {len(df)}장")
-else:
-    print("\n데이터가 없어 작업을 완료할 수 없습니다.") 
\ No newline at end of file
+                print(f"[경고] 병렬 렌더링 실패, 직렬로 다시 생성합니다: {e}")
+        if results is None:
+            results = [_render_card_timed(row, idx_int, total, out_dir) for idx_int, row in enumerate(rows)]
+        elapsed = time.perf_counter() - start
+
+        # 각 패러디 데이터의 카드 생성 결과 (카드별 소요 시간)
+        for idx_int, (row, (out_path, draw_s, save_s, error)) in enumerate(zip(rows, results)):
+            if error:
+                print(f"[오류] 카드 생성 실패 (index={idx_int}, title={row.get('original_title', '')}): {error}")
+                continue
+            card_paths.append(out_path)
+            print(f"[{idx_int+1}/{total}] 카드 저장 완료: {out_path} "
+                  f"(그리기 {draw_s * 1000:.0f}ms, PNG 저장 {save_s * 1000:.0f}ms)")
+
+        draw_total = sum(r[1] for r in results)
+        save_total = sum(r[2] for r in results)
+        print(f"[카드 렌더링] {len(card_paths)}/{total}장, 프로세스 {workers}개, 전체 {elapsed:.2f}s "
+              f"(카드 합계: 그리기 {draw_total:.2f}s, PNG 저장 {save_total:.2f}s)")
+
+    if rows:
+        print(f"\n6. 모든 작업 완료! 생성된 카드: {len(card_paths)}장")
+    else:
+        print("\n데이터가 없어 작업을 완료할 수 없습니다.")
+    return card_paths
+
+def run_card_stage(rows=None):
+    """2단계: 패러디 행으로 카드 이미지 생성 후 경로 목록 반환
+
+    rows가 None이면 저장소(PARODY_STORAGE)에서 불러오고, 1단계 결과를 직접 넘기면 저장소를 거치지 않습니다.
+    """
+    print("1. 초기화 시작...")
+    print("2. 폰트 로드 시작...")
+    try:
+        load_fonts()
+    except Exception as e:
+        print(f"[치명적 오류] 폰트 로드 중 예외 발생: {e}")
+        sys.exit(1)
+    check_assets()
+
+    if rows is None:
+        rows = load_parody_rows()
+    else:
+        print(f"3. 패러디 데이터 전달받음: {len(rows)}건")
+    return render_cards(rows)
+
+if __name__ == "__main__":
+    run_card_stage() 
\ No newline at end of file
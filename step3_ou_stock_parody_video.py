@@ -64,9 +64,6 @@ OUTRO_DURATION = 5 # 엔딩 인트로 이미지의 노출 시간 (초)
 WIDTH, HEIGHT = 1080, 1920 # 동영상 해상도
 
 # --- 경로 설정 ---
-now_dt = get_today_kst()
-now_str = now_dt.strftime('%Y-%m-%d')
-now_time_str = now_dt.strftime('%H-%M')
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 CARD_IMG_DIR = os.path.join(BASE_DIR, 'parody_card')
@@ -76,28 +73,6 @@ SINGLE_CLIP_DIR = os.path.join(VIDEO_OUT_DIR, 'single_clips')
 INTRO_IMG_PATH = os.path.join(BASE_DIR, 'asset', 'intro_OU_stock.jpg')
 BGM_PATH = os.path.join(BASE_DIR, 'asset', 'bgm.mp3')
 
-INTRO_CLIP_PATH = os.path.join(SINGLE_CLIP_DIR, f'intro_clip_{now_str}.mp4')
-OUTRO_CLIP_PATH = os.path.join(SINGLE_CLIP_DIR, f'outro_clip_{now_str}.mp4')
-MERGED_CLIP_PATH = os.path.join(VIDEO_OUT_DIR, f'merged_parody_{now_str}.mp4')
-# 최종 동영상 파일명에 YYYY-MM-DD_HH-MM 형식 적용
-FINAL_VIDEO_PATH = os.path.join(VIDEO_OUT_DIR, f'ou_stock_parody_final_{now_str}_{now_time_str}.mp4')
-
-# --- 폴더 생성 ---
-os.makedirs(VIDEO_OUT_DIR, exist_ok=True)
-os.makedirs(SINGLE_CLIP_DIR, exist_ok=True)
-
-# asset 리소스 체크
-asset_files = [INTRO_IMG_PATH, BGM_PATH]
-for af in asset_files:
-    if not os.path.exists(af):
-        print(f"[경고] 리소스 파일 누락: {af}")
-
-# parody_card 폴더에 이미지가 없을 때 안내
-card_images = sorted(glob.glob(os.path.join(CARD_IMG_DIR, '*.png')))
-if not card_images:
-    print("[경고] 'parody_card' 폴더에 카드 이미지 파일이 없습니다. 동영상 제작을 건너뜁니다.")
-    sys.exit(0)
-
 def create_intro_video(img_path, out_path, duration):
     """인트로 이미지를 사용하여 줌 효과가 적용된 비디오 클립을 생성합니다."""
     if not os.path.exists(img_path):
@@ -119,14 +94,14 @@ def create_intro_video(img_path, out_path, duration):
         print(f"[오류] 인트로 영상 제작 실패(FFmpeg 문제 가능): {e.stderr}")
         return None
 
-def create_card_videos(card_img_paths, duration):
+def create_card_videos(card_img_paths, duration, date_str):
     """카드 이미지들을 개별 비디오 클립으로 변환합니다."""
     video_clips = []
     total_cards = len(card_img_paths)
     print(f"2. 총 {total_cards}개의 카드 이미지로 영상 제작 중...")
 
     for idx, img_path in enumerate(card_img_paths):
-        out_path = os.path.join(SINGLE_CLIP_DIR, f'card_{idx+1:02d}_{now_str}.mp4')
+        out_path = os.path.join(SINGLE_CLIP_DIR, f'card_{idx+1:02d}_{date_str}.mp4')
         cmd = [
             "ffmpeg", "-y", "-loop", "1", "-i", img_path,
             "-t", str(duration),
@@ -213,14 +188,45 @@ def cleanup(temp_dirs, temp_files):
             except Exception as e:
                 print(f"[경고] 임시 파일 삭제 중 예외 발생: {f} ({e}) (수동 삭제 필요)")
 
-if __name__ == "__main__":
+def run_video_stage(card_images=None):
+    """3단계: 카드 이미지로 최종 동영상을 만들고 경로를 반환 (카드가 없거나 실패하면 None)
+
+    card_images가 None이면 parody_card 폴더의 PNG를 사용하고, 2단계가 반환한 경로를 직접 넘길 수도 있습니다.
+    """
+    # --- 실행 시각 기준 경로 ---
+    now_dt = get_today_kst()
+    now_str = now_dt.strftime('%Y-%m-%d')
+    now_time_str = now_dt.strftime('%H-%M')
+    INTRO_CLIP_PATH = os.path.join(SINGLE_CLIP_DIR, f'intro_clip_{now_str}.mp4')
+    OUTRO_CLIP_PATH = os.path.join(SINGLE_CLIP_DIR, f'outro_clip_{now_str}.mp4')
+    MERGED_CLIP_PATH = os.path.join(VIDEO_OUT_DIR, f'merged_parody_{now_str}.mp4')
+    # 최종 동영상 파일명에 YYYY-MM-DD_HH-MM 형식 적용
+    FINAL_VIDEO_PATH = os.path.join(VIDEO_OUT_DIR, f'ou_stock_parody_final_{now_str}_{now_time_str}.mp4')
+
+    # --- 폴더 생성 ---
+    os.makedirs(VIDEO_OUT_DIR, exist_ok=True)
+    os.makedirs(SINGLE_CLIP_DIR, exist_ok=True)
+
+    # asset 리소스 체크
+    asset_files = [INTRO_IMG_PATH, BGM_PATH]
+    for af in asset_files:
+        if not os.path.exists(af):
+            print(f"[경고] 리소스 파일 누락: {af}")
+
+    # 카드 이미지가 없을 때 안내
+    if card_images is None:
+        card_images = sorted(glob.glob(os.path.join(CARD_IMG_DIR, '*.png')))
+    if not card_images:
+        print("[경고] 'parody_card' 폴더에 카드 이미지 파일이 없습니다. 동영상 제작을 건너뜁니다.")
+        return None
+
     # 1. 인트로 영상 생성 (앞)
     intro_clip = create_intro_video(INTRO_IMG_PATH, INTRO_CLIP_PATH, INTRO_DURATION)
     # 1-2. 엔딩 인트로 영상 생성 (뒤)
     outro_clip = create_intro_video(INTRO_IMG_PATH, OUTRO_CLIP_PATH, INTRO_DURATION)  # 엔딩도 4초로 고정
     
     # 2. 카드 영상 생성
-    card_clips = create_card_videos(card_images, CARD_DURATION)
+    card_clips = create_card_videos(card_images, CARD_DURATION, now_str)
     
     # 3. 모든 클립 목록 결합 (인트로 + 카드 + 엔딩인트로)
     all_clips = ([intro_clip] if intro_clip else []) + card_clips + ([outro_clip] if outro_clip else [])
@@ -273,4 +279,10 @@ if __name__ == "__main__":
         print(f"   - 정리 완료: {deleted_count}개 파일 삭제됨")
         print(f"\n모든 작업 완료! 최종 영상은 다음 경로에 저장되었습니다:\n{FINAL_VIDEO_PATH}")
     else:
-        print("[오류] 생성된 영상 클립이 없어 동영상 제작을 중단합니다.") 
\ No newline at end of file
+        print("[오류] 생성된 영상 클립이 없어 동영상 제작을 중단합니다.")
+        return None
+    return FINAL_VIDEO_PATH
+
+if __name__ == "__main__":
+    run_video_stage()
+ 
\ No newline at end of file
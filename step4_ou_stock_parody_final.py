@@ -5,6 +5,9 @@ from datetime import datetime
 import glob
 from common_utils import get_today_kst
 
+# 실행 방식: subprocess(기본, 단계별 프로세스 격리) / inprocess(한 인터프리터에서 단계 함수 직접 호출)
+PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'subprocess').strip().lower()
+
 def run_script(script_name):
     """지정된 파이썬 스크립트를 실행하고 성공 여부를 반환합니다."""
     print(f"--- [시작] {script_name} ---")
@@ -53,8 +56,90 @@ def run_script(script_name):
         print(str(e))
         return False
 
+def run_stage(stage_name, stage_fn, *args):
+    """단계 함수를 현재 인터프리터에서 실행하고 (성공 여부, 반환값)을 반환합니다.
+
+    단계 내부의 sys.exit()는 종료 코드로 성공/실패를 판단해 subprocess 모드와 같게 처리합니다.
+    """
+    print(f"--- [시작] {stage_name} ---")
+    try:
+        result = stage_fn(*args)
+    except SystemExit as e:
+        if e.code in (None, 0):
+            print(f"--- [성공] {stage_name} ---")
+            return True, None
+        print(f"--- [실패] {stage_name} (종료 코드: {e.code}) ---")
+        return False, None
+    except Exception as e:
+        print(f"--- [치명적 오류] {stage_name} 실행 중 예상치 못한 오류 발생 ---")
+        print(str(e))
+        return False, None
+    print(f"--- [성공] {stage_name} ---")
+    return True, result
+
+def run_subprocess_stages():
+    """각 단계 스크립트를 별도 프로세스로 실행 (단계 간 데이터는 저장소·parody_card 폴더로 전달)"""
+    scripts_to_run = [
+        "step1_ou_stock_parody_collection.py",
+        "step2_ou_stock_parody_card.py",
+        "step3_ou_stock_parody_video.py"
+    ]
+
+    for script in scripts_to_run:
+        print("\n" + "="*50)
+        if not os.path.exists(script):
+            print(f"[오류] 실행 파일 없음: {script}")
+            return False
+        success = run_script(script)
+        if not success:
+            print(f"\n[파이프라인 중단] '{script}' 실행에 실패하여 이후 단계를 중단합니다.")
+            return False
+    return True
+
+def run_in_process_stages():
+    """1~3단계를 한 인터프리터에서 실행하고 결과를 다음 단계에 직접 전달
+
+    parody_data_list는 저장소를 다시 읽지 않고 카드 렌더러로, 카드 경로는 폴더 glob 없이 영상 제작으로 넘깁니다.
+    """
+    # 단계 모듈은 필요한 시점에 import (import 실패도 단계 실패로 처리)
+    def collection_stage():
+        from step1_ou_stock_parody_collection import run_collection_stage
+        return run_collection_stage(resume='--resume' in sys.argv[1:])
+
+    def card_stage(parody_data_list):
+        from step2_ou_stock_parody_card import run_card_stage
+        return run_card_stage(parody_data_list)
+
+    def video_stage(card_paths):
+        from step3_ou_stock_parody_video import run_video_stage
+        return run_video_stage(card_paths)
+
+    print("\n" + "="*50)
+    success, parody_data_list = run_stage("1단계: 뉴스 수집·패러디 생성", collection_stage)
+    if not success:
+        print("\n[파이프라인 중단] 1단계 실행에 실패하여 이후 단계를 중단합니다.")
+        return False
+
+    print("\n" + "="*50)
+    success, card_paths = run_stage("2단계: 카드 이미지 생성", card_stage, parody_data_list or [])
+    if not success:
+        print("\n[파이프라인 중단] 2단계 실행에 실패하여 이후 단계를 중단합니다.")
+        return False
+
+    print("\n" + "="*50)
+    success, final_video_path = run_stage("3단계: 동영상 제작", video_stage, card_paths or [])
+    if not success:
+        print("\n[파이프라인 중단] 3단계 실행에 실패했습니다.")
+        return False
+    if final_video_path:
+        print(f"[최종 영상] {final_video_path}")
+    return True
+
 def main():
-    """전체 패러디 뉴스 생성 파이프라인을 실행합니다."""
+    """전체 패러디 뉴스 생성 파이프라인을 실행합니다.
+
+    --in-process 인자 또는 PIPELINE_MODE=inprocess이면 한 인터프리터에서 실행하고, 기본은 단계별 subprocess 실행입니다.
+    """
     start_time = get_today_kst()
     print(f"=== O_U Stock Parody 자동 생성 파이프라인 시작 ({start_time.strftime('%Y-%m-%d %H:%M:%S')}) ===")
     
@@ -68,24 +153,9 @@ def main():
             print(f"[오류] 파일 삭제 실패: {file_path} ({e})")
     # -----------------------------------------
 
-    scripts_to_run = [
-        "step1_ou_stock_parody_collection.py",
-        "step2_ou_stock_parody_card.py",
-        "step3_ou_stock_parody_video.py"
-    ]
-    
-    all_success = True
-    for script in scripts_to_run:
-        print("\n" + "="*50)
-        if not os.path.exists(script):
-            print(f"[오류] 실행 파일 없음: {script}")
-            all_success = False
-            break
-        success = run_script(script)
-        if not success:
-            print(f"\n[파이프라인 중단] '{script}' 실행에 실패하여 이후 단계를 중단합니다.")
-            all_success = False
-            break
+    in_process = '--in-process' in sys.argv[1:] or PIPELINE_MODE in ('inprocess', 'in-process', 'in_process')
+    print(f"[실행 방식] {'in-process (한 인터프리터)' if in_process else 'subprocess (단계별 프로세스)'}")
+    all_success = run_in_process_stages() if in_process else run_subprocess_stages()
     
     end_time = get_today_kst()
     print("\n" + "="*50)
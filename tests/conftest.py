@@ -0,0 +1,11 @@
+"""테스트 공통 설정: 저장소 루트를 import 경로에 넣고, 모듈 import 시 필요한 환경 변수를 더미 값으로 채움"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# step1은 import 시 키 유무만 확인함 (테스트는 API를 호출하지 않음)
+os.environ.setdefault('CLAUDE_API_KEY', 'test-key')
+os.environ.setdefault('GSHEET_ID', 'test-sheet')
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+pytest.importorskip('PIL')
+
+from PIL import Image  # noqa: E402
+
+import step2_ou_stock_parody_card as step2  # noqa: E402
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample_row(i):
+    return {
+        'date': '2026-10-16', 'original_title': f'코스피 {i}% 상승', 'parody_title': f'패러디 {i}',
+        'setup': '점심시간에 주식 앱을 켰다.', 'punchline': '나: 오늘은 치킨이다!', 'humor_lesson': '장기 투자가 답',
+        'disclaimer': '본 콘텐츠는 재미로만 봐주세요.', 'source_url': 'https://www.yna.co.kr/',
+    }
+
+
+@pytest.fixture(autouse=True)
+def run_from_repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT_DIR)  # 폰트·템플릿 경로가 저장소 루트 기준
+
+
+def test_card_path_naming():
+    assert step2.card_path('out', 0) == os.path.join('out', 'parody_card_01.png')
+    assert step2.card_path('out', 11) == os.path.join('out', 'parody_card_12.png')
+
+
+def test_render_card_saves_png_and_reports_timings(tmp_path):
+    timings = {}
+    path = step2.render_card(sample_row(1), 6, 10, str(tmp_path), timings)
+    assert path == step2.card_path(str(tmp_path), 6)
+    with Image.open(path) as image:
+        assert image.size == (step2.CARD_WIDTH, step2.CARD_HEIGHT)
+    assert timings['draw'] >= 0 and timings['save'] > 0
+
+
+def test_parallel_render_matches_serial(tmp_path, monkeypatch):
+    rows = [sample_row(i) for i in range(3)]
+    outputs = {}
+    for workers in ('1', '2'):
+        monkeypatch.setattr(step2, 'CARD_RENDER_WORKERS', workers)
+        out_dir = tmp_path / f'workers_{workers}'
+        paths = step2.render_cards(rows, out_dir=str(out_dir))
+        assert paths == [step2.card_path(str(out_dir), i) for i in range(3)]
+        outputs[workers] = [open(p, 'rb').read() for p in paths]
+    assert outputs['1'] == outputs['2']
+
+
+def test_failed_card_is_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(step2, 'CARD_RENDER_WORKERS', '1')
+    original_draw = step2.draw_card
+
+    def draw_card(row, index, total):
+        if index == 1:
+            raise ValueError('그리기 실패')
+        return original_draw(row, index, total)
+
+    monkeypatch.setattr(step2, 'draw_card', draw_card)
+    paths = step2.render_cards([sample_row(i) for i in range(3)], out_dir=str(tmp_path))
+    assert paths == [step2.card_path(str(tmp_path), 0), step2.card_path(str(tmp_path), 2)]
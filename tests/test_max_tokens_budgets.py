@@ -0,0 +1,70 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import step1_ou_stock_parody_collection as step1
+
+
+def write_telemetry(path, records):
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records), encoding='utf-8')
+
+
+def test_early_stopped_calls_are_not_budget_samples(tmp_path):
+    telemetry = tmp_path / 'telemetry.jsonl'
+    write_telemetry(telemetry, [
+        {'caller': 'parody-1', 'status': 'ok', 'output_tokens': 1, 'early_stop': True},
+        {'caller': 'parody-2', 'status': 'ok', 'output_tokens': 420, 'early_stop': False},
+    ])
+    samples = step1._measured_telemetry('output_tokens', path=str(telemetry), skip_early_stop=True)
+    assert samples == {'parody': [420]}
+    assert len(step1._measured_telemetry('output_tokens', path=str(telemetry))['parody']) == 2
+
+
+def test_budgets_are_fixed_for_the_day(tmp_path, monkeypatch):
+    path = str(tmp_path / 'budgets.json')
+    measured = iter([{'ranking': 256, 'parody': 640, 'group': 640}, {'ranking': 128, 'parody': 128, 'group': 128}])
+    monkeypatch.setattr(step1, '_measure_max_tokens_budgets', lambda: next(measured))
+
+    first = step1.load_max_tokens_budgets('2026-10-16', path)
+    assert step1.load_max_tokens_budgets('2026-10-16', path) == first
+    assert step1.load_max_tokens_budgets('2026-10-17', path)['parody'] == 128
+
+
+class FakeStream:
+    def __init__(self, events):
+        self.events = events
+        self.response = SimpleNamespace(headers={})
+        self.current_message_snapshot = SimpleNamespace(usage=SimpleNamespace(output_tokens=1))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def get_final_message(self):
+        return 'final'
+
+
+def text_events(chunks):
+    return [SimpleNamespace(type='text', text=chunk) for chunk in chunks]
+
+
+def test_early_stop_estimates_output_tokens():
+    chunks = ['{"parody_title": "개미들의 ', '점심시간 대반란"}', ' 뒤에 오는 설명']
+    client = SimpleNamespace(messages=SimpleNamespace(stream=lambda **request: FakeStream(text_events(chunks))))
+    message, _, _, early_stop = step1.stream_message(client, step1.stop_after_json_object)
+    assert early_stop
+    assert message.usage.output_tokens == step1.estimate_tokens(''.join(chunks[:2])) > 1
+
+
+def test_cancel_event_stops_tool_use_stream():
+    events = [SimpleNamespace(type='input_json', partial_json='{"parodies": [')] * 3
+    client = SimpleNamespace(messages=SimpleNamespace(stream=lambda **request: FakeStream(events)))
+    cancel = threading.Event()
+    assert step1.stream_message(client, None)[0] == 'final'
+    cancel.set()
+    assert step1.stream_message(client, None, cancel)[3] is True
@@ -0,0 +1,15 @@
+import step1_ou_stock_parody_collection as step1
+
+
+def test_strip_title_variants():
+    assert step1.strip_title_variants('코스피 2% 급등(종합2보)') == '코스피 2% 급등'
+    assert step1.strip_title_variants('[속보] 한은 기준금리 동결') == '한은 기준금리 동결'
+
+
+def test_comprehensive_marker_bonus_only_for_bracketed_marker():
+    marked = {'title': '코스피 2% 급등(종합)', 'summary': ''}
+    marked_update = {'title': '코스피 2% 급등(종합2보)', 'summary': ''}
+    body_word = {'title': '종합소득세 신고 시작', 'summary': ''}
+    assert step1._news_completeness(marked) >= 1000
+    assert step1._news_completeness(marked_update) >= 1000
+    assert step1._news_completeness(body_word) < 1000
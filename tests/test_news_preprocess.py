@@ -0,0 +1,48 @@
+import step1_ou_stock_parody_collection as step1
+
+
+def test_dateline_only_keeps_article_text():
+    text = "(서울=연합뉴스) 유가증권시장에서 외국인이 순매수했다. 코스피는 올랐다."
+    assert step1.clean_news_text(text) == "유가증권시장에서 외국인이 순매수했다. 코스피는 올랐다."
+
+
+def test_dateline_before_subject_particle():
+    assert step1.clean_news_text("(서울=연합뉴스) 한국은행이 기준금리를 동결했다.") == "한국은행이 기준금리를 동결했다."
+
+
+def test_dateline_with_byline():
+    assert step1.clean_news_text("(서울=연합뉴스) 홍길동 기자 = 코스피가 올랐다.") == "코스피가 올랐다."
+    assert step1.clean_news_text("(뉴욕=연합뉴스) 김철수 특파원 = 뉴욕증시가 내렸다.") == "뉴욕증시가 내렸다."
+
+
+def test_photo_caption_with_byline_and_email():
+    text = "[연합뉴스 자료사진] 홍길동 기자 hong@yna.co.kr 코스피가 올랐다."
+    assert step1.clean_news_text(text) == "코스피가 올랐다."
+
+
+def test_reporter_word_in_body_is_kept():
+    text = "기자회견에서 금융위원장이 공매도 재개를 밝혔다."
+    assert step1.clean_news_text(text) == text
+
+
+def test_html_and_copyright_removed():
+    text = "<p>코스피&amp;코스닥 동반 상승</p> <저작권자(c) 연합뉴스, 무단 전재-재배포, AI 학습 및 활용 금지>"
+    assert step1.clean_news_text(text) == "코스피&코스닥 동반 상승"
+
+
+def test_truncate_keeps_ellipsis_within_budget():
+    for budget in (1, 10, 150):
+        cut = step1.truncate_to_tokens('가' * 400, budget)
+        assert cut.endswith('…')
+        assert step1.estimate_tokens(cut) <= budget
+
+
+def test_truncate_prefers_sentence_boundary():
+    text = "코스피가 올랐다. " * 30
+    cut = step1.truncate_to_tokens(text, 40)
+    assert cut.endswith('다.…')
+    assert step1.estimate_tokens(cut) <= 40
+
+
+def test_short_text_unchanged():
+    assert step1.truncate_to_tokens("코스피 상승", 150) == "코스피 상승"
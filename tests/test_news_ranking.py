@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import pytest
+
+import step1_ou_stock_parody_collection as step1
+
+
+def keyword_weights(title):
+    return [weight for pattern, weight in step1.NEWS_KEYWORD_PATTERNS if pattern.search(title)]
+
+
+@pytest.mark.parametrize('title', [
+    '경기도 아파트 분양 시작',
+    'OpenAI 새 모델 공개',
+    '유가증권시장 신규 상장',
+    '최고경영자 전격 교체',
+    '기관지염 환자 급증',
+])
+def test_keywords_do_not_match_inside_other_words(title):
+    assert keyword_weights(title) == []
+
+
+@pytest.mark.parametrize('title, weight', [
+    ('경기 둔화 우려 확산', 2.0),
+    ('경기가 식는다', 2.0),
+    ('경기회복 기대감', 2.0),
+    ('AI가 바꾼 일상', 2.5),
+    ('AI株 강세', 2.5),
+    ('SK하이닉스 HBM3E 양산', 2.5),
+    ('美연준 금리인하 시사', 3.0),
+    ('S&P500 사상 최고치', 1.5),
+])
+def test_keywords_match_whole_words_with_particles(title, weight):
+    assert weight in keyword_weights(title)
+
+
+def test_score_prefers_keyword_titles():
+    now = 1_800_000_000
+    relevant = {'title': '기준금리 동결에 코스피 2% 상승', 'published_ts': now}
+    unrelated = {'title': '경기도 도서관 리모델링 완료 행사', 'published_ts': now}
+    assert step1.score_news_locally(relevant, now) > step1.score_news_locally(unrelated, now)
+
+
+def test_early_stopped_ranking_reply_is_used(monkeypatch):
+    news_list = [{'title': f'뉴스 {i}', 'published_ts': 1_800_000_000 - i} for i in range(5)]
+    locally_ranked = step1.rank_news_locally(news_list)
+    response = SimpleNamespace(content=[SimpleNamespace(text='3, 1, 0,')])
+    monkeypatch.setattr(step1, 'get_claude_client', lambda: None)
+    monkeypatch.setattr(step1, 'safe_api_call', lambda *args, **kwargs: response)
+
+    ranked = step1.rank_news_by_importance_with_claude(news_list, card_count=3)
+    assert ranked[:3] == [locally_ranked[3], locally_ranked[1], locally_ranked[0]]
+    assert len(ranked) == len(news_list)
@@ -0,0 +1,65 @@
+import step1_ou_stock_parody_collection as step1
+
+
+NEWS = {'title': '코스피 2% 급등…외국인 순매수', 'link': 'https://www.yna.co.kr/view/AKR20261016000100002'}
+
+
+def parody_for(news, title='개미들의 환호'):
+    return {
+        'date': '2026-10-16', 'original_title': news['title'], 'parody_title': title,
+        'setup': '셋업', 'punchline': '펀치라인', 'humor_lesson': '교훈',
+        'disclaimer': step1.DISCLAIMER_TEXT, 'source_url': news['link'],
+    }
+
+
+def test_recorded_story_is_covered_on_later_days(tmp_path):
+    path = str(tmp_path / 'history.sqlite3')
+    store = step1.ParodyHistoryStore(path=path, today='2026-10-16')
+    store.record([parody_for(NEWS)])
+    store.close()
+
+    same_day = step1.ParodyHistoryStore(path=path, today='2026-10-16')
+    assert not same_day.is_covered(NEWS['title'], NEWS['link'])
+    same_day.close()
+
+    next_day = step1.ParodyHistoryStore(path=path, today='2026-10-17')
+    assert next_day.is_covered(NEWS['title'], NEWS['link'])
+    next_day.close()
+
+
+def test_fallback_parodies_are_not_recorded(tmp_path):
+    path = str(tmp_path / 'history.sqlite3')
+    other = {'title': '한국은행 기준금리 동결', 'link': 'https://www.yna.co.kr/view/AKR20261016000200002'}
+    store = step1.ParodyHistoryStore(path=path, today='2026-10-16')
+    store.record([
+        step1.build_default_parody(NEWS, '2026-10-16'),
+        parody_for(other, title='API 오류로 인한 기본 제목'),
+    ])
+    store.close()
+
+    next_day = step1.ParodyHistoryStore(path=path, today='2026-10-17')
+    assert not next_day.is_covered(NEWS['title'], NEWS['link'])
+    assert not next_day.is_covered(other['title'], other['link'])
+    next_day.close()
+
+
+def test_is_fallback_parody():
+    assert step1.is_fallback_parody(step1.build_default_parody(NEWS, '2026-10-16'))
+    assert not step1.is_fallback_parody(parody_for(NEWS))
+
+
+def test_batch_cache_hits_are_journaled_and_marked_succeeded(monkeypatch):
+    import json
+    from types import SimpleNamespace
+
+    creative = {'parody_title': '캐시된 패러디', 'setup': '셋업', 'punchline': '펀치라인', 'humor_lesson': '교훈'}
+    cached = SimpleNamespace(content=[SimpleNamespace(type='text', text=json.dumps(creative, ensure_ascii=False))])
+    journaled = {}
+    monkeypatch.setattr(step1, 'get_claude_batch_client', lambda: None)
+    monkeypatch.setattr(step1.llm_cache, 'get', lambda key: cached)
+    monkeypatch.setattr(step1, 'run_journal', SimpleNamespace(record_parody=journaled.__setitem__))
+
+    parodies, succeeded = step1.generate_parodies_with_batch([(0, {**NEWS, 'summary': '외국인 매수세에 지수 상승'})], 1, '2026-10-16')
+    assert succeeded == [True]
+    assert journaled[0] == parodies[0]
+    assert parodies[0]['parody_title'] == '캐시된 패러디'
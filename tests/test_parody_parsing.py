@@ -0,0 +1,75 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import step1_ou_stock_parody_collection as step1
+
+NEWS = {'title': '코스피 "2%" 급등', 'link': 'https://www.yna.co.kr/view/AKR20261016000100002'}
+TODAY = '2026-10-16'
+CREATIVE = {'parody_title': '개미 환호', 'setup': '점심시간', 'punchline': '치킨이다', 'humor_lesson': '인내'}
+
+
+def text_block(text):
+    return SimpleNamespace(type='text', text=text)
+
+
+@pytest.mark.parametrize('broken', [
+    '설명입니다.\n```json\n{"parody_title": "개미 환호", "setup": "점심시간",}\n```',
+    '{“parody_title”: “개미 환호”, “setup”: “점심시간”}',
+    '{"parody_title": "개미 "환호"", "setup": "점심시간"}',
+    '{"parody_title": "개미\n환호", "setup": "점심시간"}',
+    '{"parody_title": "개미 환호", "setup": "점심',
+    '{"parody_title": "개미 환호", "setup":',
+])
+def test_repair_json_text_produces_valid_json(broken):
+    data = json.loads(step1.repair_json_text(broken))
+    assert data['parody_title'].replace('"', '').replace('\n', ' ') in ('개미 환호', '개미  환호')
+
+
+def test_repair_json_text_keeps_valid_json():
+    text = json.dumps(CREATIVE, ensure_ascii=False)
+    assert json.loads(step1.repair_json_text(text)) == CREATIVE
+
+
+def test_parse_parody_response_fills_fixed_fields():
+    text = '```json\n' + json.dumps({**CREATIVE, 'date': '2000-01-01'}, ensure_ascii=False) + '\n```'
+    parody = step1.parse_parody_response(text, NEWS, TODAY)
+    assert parody['date'] == TODAY
+    assert parody['original_title'] == "코스피 '2%' 급등"
+    assert parody['source_url'] == NEWS['link']
+    assert parody['disclaimer'] == step1.DISCLAIMER_TEXT
+
+
+def test_parse_parody_response_rejects_missing_creative_fields():
+    with pytest.raises(ValueError):
+        step1.parse_parody_response(json.dumps({'parody_title': '제목'}, ensure_ascii=False), NEWS, TODAY)
+
+
+def test_first_complete_json_waits_for_closing_brace():
+    assert step1.first_complete_json('앞말 {"a": "}"') is None
+    assert step1.first_complete_json('앞말 {"a": "}"} 뒷말') == {'a': '}'}
+    assert step1.first_complete_json('[1, [2, 3]] 끝', '[') == [1, [2, 3]]
+    assert not step1.stop_after_json_array('[{"a": 1},')
+    assert step1.stop_after_ids(3)('4, 1, 7,')
+    assert not step1.stop_after_ids(3)('4, 1, 7')
+
+
+def test_group_response_keeps_valid_items_only():
+    group = [(0, NEWS), (1, {'title': '환율 급등', 'link': 'https://www.yna.co.kr/view/AKR2'})]
+    items = [
+        {'story_id': 1, **CREATIVE},
+        {'story_id': 0, 'parody_title': '빈 셋업', 'setup': '', 'punchline': 'p', 'humor_lesson': 'l'},
+        {'story_id': 9, **CREATIVE},
+        {'parody_title': 'story_id 없음'},
+    ]
+    blocks = [text_block('```json\n' + json.dumps(items, ensure_ascii=False) + '\n```')]
+    results = step1.parse_parody_group_response(blocks, group, TODAY)
+    assert list(results) == [1]
+    assert results[1]['source_url'] == 'https://www.yna.co.kr/view/AKR2'
+
+
+def test_group_response_prefers_tool_input():
+    group = [(0, NEWS)]
+    blocks = [SimpleNamespace(type='tool_use', input={'parodies': [{'story_id': 0, **CREATIVE}]})]
+    assert step1.parse_parody_group_response(blocks, group, TODAY)[0]['parody_title'] == '개미 환호'
@@ -0,0 +1,22 @@
+import step1_ou_stock_parody_collection as step1
+
+
+def test_static_bans_are_in_cached_system_prompt():
+    system_text = step1.PARODY_SYSTEM[0]['text']
+    assert step1.PARODY_SYSTEM[0]['cache_control'] == {'type': 'ephemeral'}
+    assert '절대 금지 패턴' in system_text
+    assert '필수 다양화 요구사항' in system_text
+
+
+def test_messages_without_collision_are_prompt_only():
+    messages = step1.build_parody_messages('요청', [])
+    assert len(messages) == 1
+    assert messages[0]['content'] == '요청'
+
+
+def test_colliding_examples_are_sent_only_on_collision():
+    existing = [{'parody_title': '겹친 제목', 'setup': '셋업', 'punchline': '펀치', 'humor_lesson': '교훈'}]
+    content = step1.build_parody_messages('요청', existing)[0]['content']
+    assert content.startswith('요청')
+    assert '겹친 제목' in content
+    assert '절대 금지 패턴' not in content
@@ -0,0 +1,109 @@
+import sys
+
+import pytest
+
+import common_utils
+import step1_ou_stock_parody_collection as step1
+from common_utils import (
+    PARODY_COLUMNS, CsvParodyStorage, GSheetParodyStorage, SqliteParodyStorage,
+    build_sheet_sync_updates, get_parody_storage, parody_to_row, sheet_values_to_records,
+)
+
+
+def sample_rows():
+    return [
+        {
+            'date': '2026-10-16', 'original_title': '삼성전자 005930 급등', 'parody_title': '007',
+            'setup': '0123', 'punchline': '1e3', 'humor_lesson': '교훈',
+            'disclaimer': '면책', 'source_url': 'https://www.yna.co.kr/view/AKR20261016000100002',
+        },
+        {
+            'date': '2026-10-16', 'original_title': '코스닥 하락', 'parody_title': '제목',
+            'setup': '셋업', 'punchline': '펀치', 'humor_lesson': '', 'disclaimer': '면책', 'source_url': '',
+        },
+    ]
+
+
+@pytest.mark.parametrize('storage_cls, kwargs_for', [
+    (CsvParodyStorage, lambda tmp_path: {'csv_dir': str(tmp_path / 'csv')}),
+    (SqliteParodyStorage, lambda tmp_path: {'path': str(tmp_path / 'rows.sqlite3')}),
+])
+def test_local_storage_round_trip_keeps_strings(tmp_path, storage_cls, kwargs_for):
+    storage = storage_cls(**kwargs_for(tmp_path))
+    assert storage.save(sample_rows())
+    assert storage.load() == sample_rows()
+
+
+def test_csv_storage_keeps_only_latest_file(tmp_path):
+    storage = CsvParodyStorage(csv_dir=str(tmp_path))
+    storage.save(sample_rows()[:1])
+    storage.save(sample_rows())
+    assert len(list(tmp_path.glob('*.csv'))) == 1
+    assert storage.load() == sample_rows()
+
+
+def test_sqlite_save_replaces_previous_rows(tmp_path):
+    storage = SqliteParodyStorage(path=str(tmp_path / 'rows.sqlite3'))
+    storage.save(sample_rows())
+    storage.save(sample_rows()[1:])
+    assert storage.load() == sample_rows()[1:]
+
+
+def test_missing_local_data_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        CsvParodyStorage(csv_dir=str(tmp_path)).load()
+    with pytest.raises(FileNotFoundError):
+        SqliteParodyStorage(path=str(tmp_path / 'missing.sqlite3')).load()
+
+
+class FakeWorksheet:
+    def __init__(self, values):
+        self.values = values
+
+    def get_all_values(self):
+        return self.values
+
+    def get_all_records(self):
+        raise AssertionError("get_all_records()는 숫자처럼 보이는 셀을 변환하므로 쓰지 않음")
+
+
+def test_gsheet_load_reads_raw_strings(monkeypatch):
+    values = [PARODY_COLUMNS] + [parody_to_row(p) for p in sample_rows()]
+    values[2] = values[2][:7]  # API는 행 끝의 빈 셀을 생략함
+    values.append([''] * len(PARODY_COLUMNS))  # 지난 실행의 꼬리를 비운 행
+    monkeypatch.setattr(common_utils, 'get_gsheet', lambda sheet_id, worksheet_name=None: FakeWorksheet(values))
+    assert GSheetParodyStorage('sheet').load() == sample_rows()
+
+
+def test_sheet_values_to_records_empty():
+    assert sheet_values_to_records([]) == []
+    assert sheet_values_to_records([PARODY_COLUMNS]) == []
+
+
+def test_sheet_sync_sends_only_changed_cells():
+    current = [PARODY_COLUMNS] + [parody_to_row(p) for p in sample_rows()]
+    new_rows = sample_rows()
+    new_rows[0]['parody_title'] = '새 제목'
+    new_values = [PARODY_COLUMNS] + [parody_to_row(p) for p in new_rows]
+    updates, cells = build_sheet_sync_updates(current, new_values)
+    assert updates == [{'range': 'C2:C2', 'values': [['새 제목']]}]
+    assert cells == 1
+
+
+def test_sheet_sync_clears_stale_rows():
+    current = [PARODY_COLUMNS] + [parody_to_row(p) for p in sample_rows()]
+    new_values = current[:2]
+    updates, cells = build_sheet_sync_updates(current, new_values)
+    assert updates == [{'range': 'A3:H3', 'values': [[''] * len(PARODY_COLUMNS)]}]
+    assert cells == len(PARODY_COLUMNS)
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        get_parody_storage('excel')
+
+
+def test_drive_upload_returns_none_when_google_client_is_missing(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'googleapiclient', None)  # import 시 ImportError
+    monkeypatch.setitem(sys.modules, 'googleapiclient.discovery', None)
+    assert step1.upload_to_google_drive('missing.csv', 'folder') is None
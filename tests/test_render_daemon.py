@@ -0,0 +1,23 @@
+import sys
+from types import SimpleNamespace
+
+import common_utils
+import render_daemon
+
+
+def test_card_without_row_reloads_storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stored = [{'parody_title': '원래 제목'}, {'parody_title': '수정 전'}]
+    rendered = []
+    monkeypatch.setattr(common_utils, 'get_parody_storage', lambda: SimpleNamespace(load=lambda: [dict(r) for r in stored]))
+    fake_step2 = SimpleNamespace(render_card=lambda row, index, total: rendered.append((row, index, total)) or f'card_{index}.png')
+    monkeypatch.setitem(sys.modules, 'step2_ou_stock_parody_card', fake_step2)
+
+    service = render_daemon.RenderService()
+    service.rows = [dict(r) for r in stored]  # 워밍업 때 읽어 둔 행
+    stored[1]['parody_title'] = '당일 수정'  # 시트에서 고침
+
+    result = service.render_card(2)
+    assert result == {'card_path': 'card_1.png'}
+    assert rendered == [({'parody_title': '당일 수정'}, 1, 2)]
+    assert service.rows[1]['parody_title'] == '당일 수정'
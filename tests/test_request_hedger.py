@@ -0,0 +1,79 @@
+import threading
+import time
+
+import step1_ou_stock_parody_collection as step1
+
+
+def make_hedger(delay_samples):
+    hedger = step1.RequestHedger(enabled=True)
+    hedger.samples = {'parody': list(delay_samples)}  # 텔레메트리 파일을 읽지 않도록 표본을 직접 지정
+    hedger.requests = 10  # 헤지 예산 확보
+    return hedger
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_hedge_win_cancels_primary_and_estimates_saving():
+    hedger = make_hedger([0.05] * 9 + [0.6])
+    calls = []
+
+    def request_fn(cancel_event):
+        calls.append(cancel_event)
+        slow = len(calls) == 1
+        for _ in range(200 if slow else 1):
+            if cancel_event.is_set():
+                return 'cancelled'
+            time.sleep(0.01)
+        return 'primary' if slow else 'backup'
+
+    started = time.perf_counter()
+    result, hedged = hedger.run('parody', request_fn)
+    assert (result, hedged) == ('backup', True)
+    assert calls[0].is_set()  # 진 원래 요청은 끊음
+    assert wait_until(lambda: len(hedger.samples['parody']) == 11)
+    elapsed = time.perf_counter() - started
+    # 끊은 시점까지의 시간이 원래 요청 지연의 하한으로 한 번만 들어감
+    assert hedger.samples['parody'][-1] <= elapsed < 1.0
+    assert hedger.won == 1
+    # 더 느렸던 과거 표본(0.6s) 기준 추정 절감
+    assert 0.3 < hedger.saved_seconds < 0.6
+
+
+def test_saving_is_zero_without_slower_samples():
+    hedger = make_hedger([0.05] * 5)
+    assert hedger.estimate_saving('parody', 1.0) == 0.0
+
+
+def test_fast_primary_is_sampled_without_hedging():
+    hedger = make_hedger([1.0] * 5)
+    result, hedged = hedger.run('parody', lambda cancel_event: 'ok')
+    assert (result, hedged) == ('ok', False)
+    assert wait_until(lambda: len(hedger.samples['parody']) == 6)
+    assert hedger.fired == 0
+
+
+def test_primary_win_cancels_backup():
+    hedger = make_hedger([0.02] * 5)
+    events = []
+    lock = threading.Lock()
+
+    def request_fn(cancel_event):
+        with lock:
+            events.append(cancel_event)
+            first = len(events) == 1
+        if first:
+            time.sleep(0.08)
+            return 'primary'
+        while not cancel_event.is_set():
+            time.sleep(0.01)
+        return 'backup-cancelled'
+
+    result, hedged = hedger.run('parody', request_fn)
+    assert (result, hedged) == ('primary', True)
+    assert wait_until(lambda: events[1].is_set())
+    assert hedger.won == 0
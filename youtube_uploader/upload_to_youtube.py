@@ -1,20 +1,17 @@
 import os
 import glob
-import random
-import gspread
 import sys
 from datetime import datetime
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 import time
-import httplib2
 from googleapiclient.errors import HttpError
 
 # 상위 폴더의 common_utils 모듈을 import하기 위한 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # from common_utils import get_gspread_client  # 삭제
-from common_utils import get_gsheet  # 추가
+from common_utils import get_parody_storage, GSheetParodyStorage
 
 # 유튜브 업로드를 위한 권한 범위
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
@@ -23,17 +20,20 @@ SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 
 COUPANG_NOTICE = "이 포스팅은 쿠팡파트너스 활동으로 일정보수를 지급받습니다."
 
-# 오늘의 parody_title을 구글 시트에서 가져오는 함수만 남김
+# GSHEET_ID가 없을 때 쓰는 기본 시트
+DEFAULT_SHEET_ID = '1tEmq2HIEg9CWyrU8vtoM9mo3CW9XWfa4iWasOiK4Z2A'
+
+# 오늘의 parody_title을 저장소(PARODY_STORAGE)에서 가져오는 함수만 남김
 
 def get_today_parody_title_and_keyword():
-    """구글 시트에서 C열 2행(parody_title)과 B열 2행(original_title)을 간단하게 반환."""
-    SHEET_ID = '1tEmq2HIEg9CWyrU8vtoM9mo3CW9XWfa4iWasOiK4Z2A'
-    SHEET_NAME = 'today_stock_parody'
-    worksheet = get_gsheet(SHEET_ID, SHEET_NAME)
-    all_values = worksheet.get_all_values()
-    parody_title = all_values[1][2]
-    keyword = all_values[1][1]
-    return parody_title, keyword
+    """저장소의 첫 번째 패러디 행에서 parody_title과 original_title을 간단하게 반환."""
+    storage = get_parody_storage()
+    if isinstance(storage, GSheetParodyStorage):
+        storage = GSheetParodyStorage(os.getenv('GSHEET_ID') or DEFAULT_SHEET_ID)
+    rows = storage.load()
+    if not rows:
+        return '', ''
+    return rows[0].get('parody_title', ''), rows[0].get('original_title', '')
 
 # 태그 고정 리스트
 FIXED_TAGS = [